@@ -1,303 +1,289 @@
 # Requires Python 3.10
+#
+# Entry point of the Z3 type generator. The configuration of the generator
+# lives in generate_types_config.py; this script only parses arguments and
+# dispatches to a mode, importing the generator modules a mode needs once it
+# runs, so --help and --client start quickly.
 
 import argparse
-import re
+import functools
+import os
+import runpy
+import subprocess
 import sys
+import time
 
 from pathlib import Path
-from typing import Iterable, Sequence
-
-from pycparser import c_ast
-from utils.converters.default_symbol_name_formatter import DefaultSymbolNameFormatter
-from utils.converters.symbol_name_formatter import SymbolNameFormatter
-from utils.data.swift_decl_lookup import SwiftDeclLookup
-from utils.data.swift_decls import (
-    CDeclKind,
-    SwiftDecl,
-    SwiftExtensionDecl,
-    SwiftMemberVarDecl,
-)
-from utils.data.swift_file import SwiftFile
-from utils.directory_structure.directory_structure_manager import (
-    DirectoryStructureEntry,
-    DirectoryStructureManager,
-)
-from utils.doccomment.doccomment_block import DoccommentBlock
-from utils.doccomment.doccomment_formatter import DoccommentFormatter
-from utils.doccomment.doccomment_list_picker import DoccommentListPicker
-from utils.doccomment.doccomment_lookup import DoccommentLookup
-from utils.generator.known_conformance_generators import get_conformance_generator
-from utils.generator.swift_decl_generator import SwiftDeclGenerator
-from utils.generator.symbol_generator_filter import SymbolGeneratorFilter
-from utils.generator.symbol_name_generator import SymbolNameGenerator
-from utils.data.compound_symbol_name import ComponentCase, CompoundSymbolName
-
-from utils.generator.type_generator import (
-    DeclGeneratorTarget,
-    DeclFileGeneratorStdoutTarget,
-    DeclFileGeneratorDiskTarget,
-    TypeGeneratorRequest,
-    generate_types,
-)
+from typing import TYPE_CHECKING, Callable
+
+from utils.cli.cli_printing import print_stage_name
+from utils.cli.console_color import ConsoleColor
+from utils.generator.type_generator_client import OUTPUT_MODES, GeneratorJob, send_request
 from utils.paths import paths
 
-FILE_NAME = "z3.h"
-
-Z3_PREFIXES = [
-    "Z3",
-]
-"""
-List of prefixes from Z3 declarations to convert
-
-Will also be used as a list of terms to remove the prefix of in final declaration names.
-"""
-
-STRUCT_CONFORMANCES: list[tuple[str | re.Pattern, list[str]]] = [
-    #
-    ("Z3_error_code", ["Error"]),
-]
-"""
-List of pattern matching to apply to C struct declarations along with a list of
-conformances that should be appended, in case the struct matches the pattern.
-"""
-
-
-class Z3DeclGenerator(SwiftDeclGenerator):
-    def propose_conformances(self, decl: SwiftExtensionDecl) -> list[str] | None:
-        result = []
-
-        # Match required protocols
-        for req in STRUCT_CONFORMANCES:
-            c_name = decl.original_name.to_string()
-            match req[0]:
-                case re.Pattern():
-                    if not req[0].match(c_name):
-                        continue
-                case str():
-                    if req[0] != c_name:
-                        continue
-            
-            result.extend(req[1])
-        
-        return list(set(result))
-    
-    def post_merge(self, decls: list[SwiftDecl]) -> list[SwiftDecl]:
-        result = super().post_merge(decls)
-
-        # Use proposed conformances to generate required members
-        for decl in decls:
-            if conformances := self.propose_conformances(decl):
-                decl.conformances.extend(conformances)
-
-            if not isinstance(decl, SwiftExtensionDecl):
-                continue
-            if not isinstance(decl.original_node, c_ast.Struct):
-                continue
-
-            for conformance in sorted(decl.conformances):
-                if gen := get_conformance_generator(conformance):
-                    decl.members.extend(
-                        gen.generate_members(decl, decl.original_node)
-                    )
-
-        return result
-
-
-class Z3SymbolFilter(SymbolGeneratorFilter):
-    def should_gen_enum_extension(
-        self, node: c_ast.Enum, decl: SwiftExtensionDecl
-    ) -> bool:
-        return super().should_gen_enum_extension(node, decl)
-
-    def should_gen_enum_var_member(
-        self, node: c_ast.Enumerator, decl: SwiftMemberVarDecl
-    ) -> bool:
-        return super().should_gen_enum_var_member(node, decl)
-
-
-class Z3NameGenerator(SymbolNameGenerator):
-    formatter: SymbolNameFormatter
-
-    def __init__(self):
-        self.formatter = DefaultSymbolNameFormatter(
-            words_to_split=[
-                re.compile(r"(l)(bool)$", flags=re.IGNORECASE)
-            ],
-        )
+if TYPE_CHECKING:
+    from utils.generator.type_generator import TypeGeneratorRequest
+    from utils.profiling.memory_report import MemoryReport
+
+CONFIG_FILE_PATH = paths.srcroot_path("generate_types_config.py")
+"Module holding the configuration classes of the generator."
 
-    def format_enum_case_name(self, name: CompoundSymbolName) -> CompoundSymbolName:
-        """
-        Fixes some wonky enum case name capitalizations.
-        """
-        name = self.formatter.format(name)
-        result: list[CompoundSymbolName.Component] = name.components
+CLIENT_RETRY_COUNT = 20
+"Number of attempts --client makes to reach a server, e.g. while it restarts."
 
-        for i, comp in enumerate(result):
-            if comp.string.startswith("Uint"):
-                result[i] = comp.replacing_in_string("Uint", "UInt").with_string_case(
-                    ComponentCase.AS_IS
-                )
+CLIENT_RETRY_INTERVAL = 0.25
+"Seconds to wait between attempts to reach a server."
+
+
+def reloading_request_factory(args: argparse.Namespace) -> Callable[[], "TypeGeneratorRequest"]:
+    """
+    Returns a function that creates generator requests after reloading the
+    configuration classes in the configuration module.
+    """
 
-        return CompoundSymbolName(result)
+    job_request_factory = reloading_job_request_factory(args)
 
-    def generate(self, name: str) -> CompoundSymbolName:
-        return CompoundSymbolName.from_snake_case(name)
+    def request_factory() -> "TypeGeneratorRequest":
+        return job_request_factory(GeneratorJob())
 
-    def generate_struct_name(self, name: str) -> CompoundSymbolName:
-        return self.formatter.format(self.generate(name)).pascal_cased()
+    return request_factory
 
-    def generate_enum_name(self, name: str) -> CompoundSymbolName:
-        return self.formatter.format(self.generate(name)).pascal_cased()
 
-    def generate_enum_case(
-        self, enum_name: CompoundSymbolName, enum_original_name: str, case_name: str
-    ) -> CompoundSymbolName:
-        name = CompoundSymbolName.from_snake_case(case_name)
+def reloading_job_request_factory(args: argparse.Namespace) -> Callable[[GeneratorJob], "TypeGeneratorRequest"]:
+    """
+    Returns a function that creates generator requests for jobs sent to a
+    generator server, after reloading the configuration classes in the
+    configuration module.
+    """
 
-        orig_enum_name = CompoundSymbolName.from_snake_case(enum_original_name)
+    def request_factory(job: GeneratorJob) -> "TypeGeneratorRequest":
+        config = runpy.run_path(str(CONFIG_FILE_PATH), run_name="generate_types_config")
+        return config["make_request"](args, job=job)
 
-        (new_name, prefix) = name.removing_common(orig_enum_name, case_sensitive=False)
-        new_name = new_name.camel_cased()
+    return request_factory
 
-        if prefix is not None:
-            prefix = prefix.camel_cased()
-            new_name[0].joint_to_prev = "_"
 
-            new_name = CompoundSymbolName(
-                components=prefix.components + new_name.components
-            )
+def watch(args: argparse.Namespace) -> int:
+    """
+    Generates types, then regenerates them whenever the header files or the
+    configuration module change, reloading the configuration classes before
+    every run.
+    """
+    from utils.generator.type_generator_watcher import TypeGeneratorWatcher
+
+    watcher = TypeGeneratorWatcher(
+        reloading_request_factory(args),
+        config_files=[CONFIG_FILE_PATH],
+        restart_files=sorted(paths.SCRIPTS_ROOT_PATH.rglob("*.py")),
+    )
+    watcher.run()
+
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    "Serves generator requests over a Unix domain socket until shut down."
+    from utils.generator.type_generator_server import TypeGeneratorServer
+
+    server = TypeGeneratorServer(
+        args.socket,
+        reloading_job_request_factory(args),
+        config_files=[CONFIG_FILE_PATH],
+        restart_files=sorted(paths.SCRIPTS_ROOT_PATH.rglob("*.py")),
+    )
+    server.serve()
+
+    return 0
+
+
+def batch(args: argparse.Namespace) -> int:
+    "Generates types for every target passed with --batch."
+    from generate_types_config import cache_folder_path, make_request
+    from utils.generator.batch_generator import (
+        BatchTarget,
+        generate_batch,
+        preprocess_batch,
+        print_batch_results,
+    )
+
+    targets: list[BatchTarget] = []
+    for entry in args.batch:
+        if len(entry) < 2:
+            print("Error: Expected '--batch HEADER DESTINATION [ALLOWLIST...]'.")
+            return 1
 
-        return self.format_enum_case_name(new_name)
+        (header, destination) = (Path(entry[0]).resolve(), Path(entry[1]).resolve())
+        if not header.is_file():
+            print(f"Error: No header file with name '{header}' found.")
+            return 1
+        if not destination.is_dir():
+            print(f"Error: No target directory with name '{destination}' found.")
+            return 1
 
-    def generate_original_enum_name(self, name: str) -> CompoundSymbolName:
-        return self.generate(name)
+        allowlist = [Path(p).resolve() for p in entry[2:]]
+        targets.append(BatchTarget(header, destination, allowlist or None))
 
-    def generate_original_enum_case(self, case_name: str) -> CompoundSymbolName:
-        return self.generate(case_name)
+    jobs = args.jobs or min(len(targets), os.cpu_count() or 1)
 
-    def generate_original_struct_name(self, name: str) -> CompoundSymbolName:
-        return self.generate(name)
+    preprocessed_output: bytes | None = None
+    if args.batch_preprocess:
+        from utils.cache.preprocessor_cache import PreprocessorCache
 
-class Z3DoccommentLookup(DoccommentLookup):
-    def populate_doc_comments(self, decls: Sequence[SwiftDecl]) -> list[SwiftDecl]:
-        result = super().populate_doc_comments(decls)
+        cache_folder = cache_folder_path(args)
+        cache = PreprocessorCache(cache_folder) if cache_folder is not None else None
 
-        # Extract markdown bullet-point style lists from parent descriptions into
-        # child declarations
-        for decl in result:
-            if not isinstance(decl, SwiftExtensionDecl):
-                continue
-            if decl.doccomment is None:
-                continue
+        print_stage_name(f"Preprocessing {len(targets)} target(s) as a single translation unit...")
+        try:
+            preprocessed_output = preprocess_batch(
+                targets, paths.scripts_path(".temp", "batch"), cache
+            )
+        except subprocess.CalledProcessError:
+            print(ConsoleColor.YELLOW("Warning: Preprocessing targets together failed; preprocessing each target separately."))
 
-            picker = DoccommentListPicker(decl.doccomment)
-            
-            for member in decl.members:
-                c_name = member.original_name.to_string()
-                if doc := picker.pick(c_name):
-                    member.doccomment = DoccommentBlock.merge(
-                        member.doccomment,
-                        doc
-                    )
+    print_stage_name(f"Generating {len(targets)} target(s) with {jobs} worker(s)...")
+    results = generate_batch(
+        targets, functools.partial(make_request, args), jobs, preprocessed_output
+    )
+    print_batch_results(results)
 
-            decl.doccomment = picker.result_comment()
+    return 0 if all(r.exit_code == 0 for r in results) else 1
 
-        return result
 
-class Z3DoccommentFormatter(DoccommentFormatter):
+def check(args: argparse.Namespace) -> int:
     """
-    Formats doc comments from Z3 to be more Swifty, including renaming \
-    referenced C symbol names to the converted Swift names.
+    Verifies that the generated files on disk are up to date, without writing
+    to them. Returns a non-zero exit code if any file is stale, missing or
+    should be removed.
     """
+    from generate_types_config import make_request
+    from utils.generator.type_generator import check_types
+
+    request = make_request(args)
+    result = check_types(request)
+
+    def print_paths(title: str, paths: list[Path]):
+        for path in paths:
+            print(f"{ConsoleColor.RED(title)}: {ConsoleColor.MAGENTA(path.relative_to(request.destination))}")
+
+    print_paths("Stale", result.stale_paths)
+    print_paths("Missing", result.missing_paths)
+    print_paths("Extra", result.extra_paths)
+
+    if request.profiler is not None:
+        request.profiler.print_summary()
+
+    if not result.is_up_to_date():
+        count = len(result.stale_paths) + len(result.missing_paths) + len(result.extra_paths)
+        print(ConsoleColor.RED(f"{count} generated file(s) are out of date; run generate_types.py to update them."))
+        return 1
+
+    print(ConsoleColor.GREEN("Up to date!"))
+
+    return 0
+
+
+def run_client(args: argparse.Namespace) -> int:
+    "Sends a generation request to a running server and prints its reply."
 
-    def __init__(self):
-        self.remove_regex = re.compile(r"\\(brief|ingroup)\s+", re.IGNORECASE)
-        self.ref_regex = re.compile(r"\\(?:ref|c) (\w+(?:\(\))?)", re.IGNORECASE)
-        self.backtick_regex = re.compile(r"`([^`]+)`")
-        self.backtick_word_regex = re.compile(r"\w+")
-        self.backtick_cpp_member_regex = re.compile(r"(\w+)::(\w+)")
-
-    def replace_refs(self, comment: str) -> str:
-        return self.ref_regex.sub(
-            lambda match: f"`{''.join(match.groups())}`",
-            comment
+    job = GeneratorJob(destination=None if args.path is None else args.path.resolve())
+    if args.batch is not None:
+        if len(args.batch) != 1 or len(args.batch[0]) < 2:
+            print("Error: Expected a single '--batch HEADER DESTINATION [ALLOWLIST...]' with --client.")
+            return 1
+
+        entry = args.batch[0]
+        job = GeneratorJob(
+            header_file=Path(entry[0]).resolve(),
+            destination=Path(entry[1]).resolve(),
+            slice_allowlist=tuple(Path(p).resolve() for p in entry[2:]) or None,
         )
 
-    def convert_refs(self, comment: str, lookup: SwiftDeclLookup) -> str:
-        def convert_word_match(match: re.Match[str]) -> str:
-            name = match.group()
-            swift_name = lookup.lookup_c_symbol(name)
-            if swift_name is not None:
-                return swift_name
+    message = {"command": "generate", "output": args.client, **job.to_message()}
 
-            return name
+    # Retry while the server restarts after its sources changed
+    for attempt in range(CLIENT_RETRY_COUNT):
+        try:
+            response = send_request(args.socket, message)
+        except (ConnectionError, FileNotFoundError) as error:
+            if attempt == CLIENT_RETRY_COUNT - 1:
+                print(ConsoleColor.RED(f"Error: Could not reach a generator server at '{args.socket}': {error}"))
+                return 1
 
-        def convert_backtick_match(match: re.Match[str]) -> str:
-            replaced = self.backtick_word_regex.sub(
-                convert_word_match,
-                match.group(),
-            )
-            # Perform C++ symbol rewriting (Type::member)
-            replaced = self.backtick_cpp_member_regex.sub(
-                lambda m: f"{m.group(1)}.{m.group(2)}",
-                replaced
+            time.sleep(CLIENT_RETRY_INTERVAL)
+            continue
+
+        if response["ok"] or "restarting" not in response.get("error", ""):
+            break
+
+        time.sleep(CLIENT_RETRY_INTERVAL)
+
+    if not response["ok"]:
+        print(ConsoleColor.RED(f"Error: {response['error']}"))
+        return 1
+
+    match args.client:
+        case "files":
+            for (path, contents) in response["files"].items():
+                print(f"// {path}")
+                print(contents, end="")
+
+        case "diff":
+            if len(response["changed"]) > 0:
+                print(response["diff"], end="")
+                print(ConsoleColor.YELLOW(f"{len(response['changed'])} file(s) differ from the generated output."))
+                return 1
+
+            print(ConsoleColor.GREEN("Up to date!"))
+
+        case "write":
+            print(
+                f"Wrote {ConsoleColor.CYAN(len(response['written']))} file(s), "
+                f"{ConsoleColor.CYAN(response['unchanged'])} unchanged, "
+                f"removed {ConsoleColor.CYAN(len(response['removed']))} stale file(s) "
+                f"in {response['elapsed_ms']:.1f} ms"
             )
-            
-            return replaced
 
-        return self.backtick_regex.sub(convert_backtick_match, comment)
+    return 0
 
-    def format_doccomment(
-        self, comment: DoccommentBlock | None, decl: SwiftDecl, lookup: SwiftDeclLookup
-    ) -> DoccommentBlock | None:
-        if comment is None:
-            return None
-        
-        new_comments = comment.comment_contents
-        
-        # Remove '\ingroup*', '\brief*', and other Doxygen-specific tags
-        new_comments = self.remove_regex.sub("", new_comments)
 
-        # Reword '\note' to '- note'
-        new_comments = new_comments.replace("\\note", "- note:")
+def generate(args: argparse.Namespace) -> int:
+    "Generates types once, optionally tracing the run."
+    from generate_types_config import make_request
+    from utils.generator.type_generator import generate_types
+    from utils.profiling.pipeline_hooks import ChromeTraceRecorder, PipelineHook, subscribed
 
-        # Replace "\ref <symbol>" or "\c <symbol>" with "`<symbol>`"
-        new_comments = self.replace_refs(new_comments)
+    request = make_request(args)
 
-        # Convert C symbol references to Swift symbols
-        new_comments = self.convert_refs(new_comments, lookup)
+    hooks: list[PipelineHook] = []
 
-        return super().format_doccomment(comment.with_contents(new_comments), decl, lookup)
+    recorder: ChromeTraceRecorder | None = None
+    if args.trace is not None:
+        recorder = ChromeTraceRecorder()
+        hooks.append(recorder)
 
+    report: "MemoryReport | None" = None
+    if args.memory:
+        from utils.profiling import memory_report
 
-class Z3DirectoryStructureManager(DirectoryStructureManager):
-    def file_name_for_decl(self, decl: SwiftDecl) -> str:
-        # For struct conformances, append a "+Ext.swift" to the suffix of the
-        # filename
-        if decl.c_kind == CDeclKind.STRUCT and isinstance(decl, SwiftExtensionDecl) and len(decl.conformances) > 0:
-            return f"{decl.name.to_string()}+Ext.swift"
+        report = memory_report.MemoryReport()
+        report.start()
+        hooks.append(report)
 
-        return super().file_name_for_decl(decl)
+    try:
+        with subscribed(*hooks):
+            result = generate_types(request)
+    finally:
+        if report is not None:
+            report.stop()
 
-    def make_declaration_files(self, decls: Iterable[SwiftDecl]) -> list[SwiftFile]:
-        result = super().make_declaration_files(decls)
-        for file in result:
-            file.header_lines.append(
-                f"// Generated by {Path(__file__).relative_to(paths.SOURCE_ROOT_PATH)}"
-            )
+    if report is not None:
+        report.print_summary()
 
-        return result
+    if recorder is not None:
+        recorder.write(args.trace)
+        print(f"Wrote trace to {ConsoleColor.MAGENTA(args.trace)}")
 
-    def path_matchers(self) -> list[DirectoryStructureEntry]:
-        # Array of tuples containing:
-        # tuple.0: An array of path components (min 1, must not have special characters);
-        # tuple.1: Either a regular expression, OR a list of regular expression/exact
-        #          strings that file names will be tested against.
-        # Matches are made against full file names, with no directory information,
-        # e.g.: "BLContext.swift", "BLFillRule.swift", "BLResultCode.swift", etc.
-        return [
-            
-        ]
+    return result
 
 
 def main() -> int:
@@ -317,53 +303,123 @@ def main() -> int:
         type=Path,
         help="Path to put generated files on",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignores and does not record generator caches, forcing a full regeneration.",
+    )
+
+    parser.add_argument(
+        "--keep-preprocessed",
+        action="store_true",
+        help="Writes the preprocessor output next to the header file, as a .i file, for debugging.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Records wall and CPU time per pipeline stage and prints a summary table at the end.",
+    )
+    parser.add_argument(
+        "--profile-pstats",
+        dest="profile_pstats",
+        type=Path,
+        help="Together with --profile, dumps a cProfile .pstats file for each stage to a given folder.",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        help="Writes a Chrome trace-event JSON file of the run to a given path, viewable in Perfetto or chrome://tracing.",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Traces memory allocations and prints per-stage memory usage, peak RSS and the top allocation sites at the end. Slows down generation considerably.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Streams the pipeline to keep peak memory flat on large headers: parses the header in chunks, and formats, renders and writes files one at a time.",
+    )
+    parser.add_argument(
+        "--batch-preprocess",
+        action="store_true",
+        help="Together with --batch, preprocesses every target with a single preprocessor invocation, through an umbrella header that includes each header file, and splits the output back into targets along its #line directives. Targets share a translation unit, so their headers must be compatible with each other.",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=["pycparser", "libclang"],
+        default="pycparser",
+        help="Parser backend used to read the header files. 'libclang' requires the optional libclang Python package, and falls back to 'pycparser' if it is not installed or fails to parse the headers. Defaults to 'pycparser'.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Verifies that the generated files are up to date without writing them, exiting with a non-zero status and listing stale, missing and extra files otherwise.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keeps running after generating types, and regenerates them whenever the header files or this script change.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serves generation requests over a Unix domain socket, keeping parsed headers and generated files in memory between requests.",
+    )
+    parser.add_argument(
+        "--client",
+        choices=OUTPUT_MODES,
+        help="Requests generation from a server started with --serve instead of generating in-process. 'files' prints the generated files, 'diff' prints a diff against the files on disk, 'write' writes changed files. -o, or a single --batch entry, selects the destination, header file and allowlist of the request.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=paths.scripts_path(".temp", "generate_types.sock"),
+        help="Path of the Unix domain socket used by --serve and --client. Defaults to utils/.temp/generate_types.sock.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of worker processes to use for parallelizable stages, such as parsing. Defaults to 1, or to one per target (up to the CPU count) with --batch.",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        action="append",
+        metavar="PATH",
+        help="Generates types for a header file into a destination folder, as '--batch HEADER DESTINATION [ALLOWLIST...]'. Declarations are only generated from the files and folders in ALLOWLIST, which defaults to the header file itself. Can be repeated; targets are generated concurrently.",
+    )
 
     args = parser.parse_args()
 
+    # Clients only talk to the server, so they skip loading the generator
+    if args.client is not None:
+        return run_client(args)
+
+    if args.batch is not None:
+        return batch(args)
+
+    from generate_types_config import FILE_NAME, destination_path
+
     input_path = paths.scripts_path(FILE_NAME)
     if not input_path.exists() or not input_path.is_file():
         print("Error: Expected path to an existing header file within utils\\.")
         return 1
 
-    swift_target_path = (
-        args.path
-        if args.path is not None
-        else paths.srcroot_path("Sources", "SwiftZ3", "Generated")
-    )
+    swift_target_path = destination_path(args)
     if not swift_target_path.exists() or not swift_target_path.is_dir():
         print(f"Error: No target directory with name '{swift_target_path}' found.")
         return 1
 
-    destination_path = swift_target_path
-
-    target: DeclGeneratorTarget
-
-    if args.stdout:
-        target = DeclFileGeneratorStdoutTarget()
-    else:
-        target = DeclFileGeneratorDiskTarget(destination_path, rm_folder=True)
-
-    symbol_filter = Z3SymbolFilter()
-    symbol_name_generator = Z3NameGenerator()
-    request = TypeGeneratorRequest(
-        header_file=input_path,
-        destination=destination_path,
-        prefixes=Z3_PREFIXES,
-        target=target,
-        includes=["CZ3"],
-        swift_decl_generator=Z3DeclGenerator(
-            prefixes=Z3_PREFIXES,
-            symbol_filter=symbol_filter,
-            symbol_name_generator=symbol_name_generator,
-        ),
-        symbol_filter=symbol_filter,
-        symbol_name_generator=symbol_name_generator,
-        doccomment_lookup=Z3DoccommentLookup(),
-        doccomment_formatter=Z3DoccommentFormatter(),
-        directory_manager=Z3DirectoryStructureManager(destination_path),
-    )
+    if args.check:
+        return check(args)
+    if args.serve:
+        return serve(args)
+    if args.watch:
+        return watch(args)
 
-    generate_types(request)
+    return generate(args)
 
 
 if __name__ == "__main__":
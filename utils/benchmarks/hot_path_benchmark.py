@@ -0,0 +1,384 @@
+# Micro-benchmarks and regression gate for the naming and doc comment hot paths.
+# Usage, from the repository root:
+#
+#     python -m utils.benchmarks.hot_path_benchmark [--check] [--threshold 0.25]
+#     python -m utils.benchmarks.hot_path_benchmark --update-baseline
+#     python -m utils.benchmarks.hot_path_benchmark --extract-corpus
+#
+# Benchmarks CompoundSymbolName, DefaultSymbolNameFormatter,
+# _split_doccomment_lines and DoccommentListPicker over a fixed corpus of the
+# enum names and doc comments found in Z3's z3_api.h.
+#
+# Timings are normalized by a fixed pure-Python calibration workload before
+# being compared to the committed baseline, so the baseline remains usable on
+# machines faster or slower than the one that recorded it. With --check, the
+# script exits with a non-zero status if any benchmark is slower than its
+# baseline by more than the threshold. Benchmarks that appear to regress are
+# measured again before failing, and the best measurement is kept, so a single
+# noisy run does not fail the check.
+
+import argparse
+import json
+import re
+import sys
+import timeit
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from generate_types_config import Z3NameGenerator
+from utils.cli.console_color import ConsoleColor
+from utils.data.compound_symbol_name import CompoundSymbolName
+from utils.doccomment.doccomment_block import DoccommentBlock
+from utils.doccomment.doccomment_list_picker import DoccommentListPicker
+from utils.doccomment.doccomment_lookup import DoccommentLookup, _split_doccomment_lines
+from utils.files.atomic_write import write_text_atomic
+from utils.paths import paths
+
+BENCHMARKS_PATH = Path(__file__).parent
+
+CORPUS_PATH = BENCHMARKS_PATH.joinpath("corpus", "z3_api_corpus.json")
+"Path of the committed corpus of Z3 enum names and doc comments."
+
+BASELINE_PATH = BENCHMARKS_PATH.joinpath("hot_path_baseline.json")
+"Path of the committed baseline results."
+
+DEFAULT_THRESHOLD = 0.25
+"Default relative slowdown over the baseline that fails a --check run."
+
+DEFAULT_CONFIRM_ATTEMPTS = 3
+"Default number of times benchmarks that appear to regress are measured again."
+
+_ENUM_REGEX = re.compile(
+    r"/\*\*((?:(?!\*/).)*?)\*/\s*typedef\s+enum\s*(?:\w+\s*)?\{(.*?)\}\s*(\w+)\s*;",
+    re.DOTALL,
+)
+_COMMENT_REGEX = re.compile(r"/\*.*?\*/|//[^\n]*", re.DOTALL)
+_IDENTIFIER_REGEX = re.compile(r"[A-Za-z_]\w*")
+
+
+@dataclass
+class Corpus:
+    header_text: str
+    "Source text of every documented enum of the header, including doc comments."
+
+    enums: list[tuple[str, list[str], str]]
+    "List of `(enum name, enumerator names, doc comment contents)`."
+
+
+@dataclass
+class Benchmark:
+    name: str
+    "Name of the benchmark, as stored in the baseline."
+
+    function: Callable[[], Any]
+    "Function that runs one iteration of the benchmark."
+
+
+def extract_corpus(header_path: Path) -> dict[str, Any]:
+    "Extracts the documented enums from a Z3 API header into a corpus dictionary."
+
+    text = header_path.read_text(encoding="utf-8")
+
+    regions: list[str] = []
+    enums: list[dict[str, Any]] = []
+    for match in _ENUM_REGEX.finditer(text):
+        body = _COMMENT_REGEX.sub("", match.group(2))
+        cases = []
+        for entry in body.split(","):
+            if identifier := _IDENTIFIER_REGEX.search(entry):
+                cases.append(identifier.group())
+
+        regions.append(match.group())
+        enums.append(
+            {
+                "name": match.group(3),
+                "cases": cases,
+                "doccomment": match.group(1),
+            }
+        )
+
+    return {
+        "source": header_path.relative_to(paths.SOURCE_ROOT_PATH).as_posix(),
+        "header_text": "\n\n".join(regions),
+        "enums": enums,
+    }
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> Corpus:
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+
+    return Corpus(
+        header_text=data["header_text"],
+        enums=[(e["name"], e["cases"], e["doccomment"]) for e in data["enums"]],
+    )
+
+
+def make_benchmarks(corpus: Corpus) -> list[Benchmark]:
+    name_generator = Z3NameGenerator()
+    formatter = name_generator.formatter
+    patterns = DoccommentLookup().doccomment_patterns
+    header_path = Path("z3_api.h")
+
+    symbol_names = [name for (name, _, _) in corpus.enums]
+    symbol_names.extend(case for (_, cases, _) in corpus.enums for case in cases)
+
+    case_pairs = [
+        (CompoundSymbolName.from_snake_case(enum_name), CompoundSymbolName.from_snake_case(case))
+        for (enum_name, cases, _) in corpus.enums
+        for case in cases
+    ]
+    parsed_names = [CompoundSymbolName.from_snake_case(name) for name in symbol_names]
+    doccomments = [
+        (DoccommentBlock(header_path, 1, 1, doccomment), cases)
+        for (_, cases, doccomment) in corpus.enums
+    ]
+
+    def compound_symbol_name():
+        for name in symbol_names:
+            symbol = CompoundSymbolName.from_snake_case(name)
+            symbol.camel_cased().to_string()
+            symbol.pascal_cased().to_string()
+
+        for (enum_name, case_name) in case_pairs:
+            case_name.removing_common(enum_name, case_sensitive=False)
+
+    def default_symbol_name_formatter():
+        for name in parsed_names:
+            formatter.format(name)
+
+    def split_doccomment_lines():
+        _split_doccomment_lines(header_path, corpus.header_text, patterns)
+
+    def doccomment_list_picker():
+        for (doccomment, cases) in doccomments:
+            picker = DoccommentListPicker(doccomment)
+            for case in cases:
+                picker.pick(case)
+            picker.result_comment()
+
+    return [
+        Benchmark("CompoundSymbolName", compound_symbol_name),
+        Benchmark("DefaultSymbolNameFormatter.format", default_symbol_name_formatter),
+        Benchmark("_split_doccomment_lines", split_doccomment_lines),
+        Benchmark("DoccommentListPicker", doccomment_list_picker),
+    ]
+
+
+def _calibration_workload():
+    # A fixed mix of the operations the hot paths are made of: string slicing
+    # and case changes, regex-free scanning, list and dict manipulation.
+    words: dict[str, int] = {}
+    for i in range(20_000):
+        word = f"Z3_OP_CALIBRATION_{i % 97}".lower()
+        parts = word.split("_")
+        joined = "".join(p.capitalize() for p in parts)
+        words[joined] = words.get(joined, 0) + len(joined[1:-1])
+
+
+def measure(function: Callable[[], Any], repeat: int) -> tuple[float, float]:
+    """
+    Returns the best time of a function, in seconds, out of `repeat` timing
+    rounds, along with the best time of the calibration workload.
+
+    Rounds of the function and of the calibration workload are interleaved, so
+    both are equally affected by changes in the load of the machine. Both run
+    once before timing, to warm up caches and lazily initialized state.
+    """
+
+    function()
+    _calibration_workload()
+
+    timer = timeit.Timer(function)
+    calibration_timer = timeit.Timer(_calibration_workload)
+    (number, _) = timer.autorange()
+
+    times: list[float] = []
+    calibration_times: list[float] = []
+    for _ in range(repeat):
+        calibration_times.append(calibration_timer.timeit(number=1))
+        times.append(timer.timeit(number=number) / number)
+
+    return (min(times), min(calibration_times))
+
+
+def run_benchmarks(repeat: int, names: list[str] | None = None) -> dict[str, Any]:
+    """
+    Runs the benchmarks, or only the ones in `names` if provided. Results do
+    not record the machine they were measured on, as baselines are shared
+    between machines.
+    """
+    benchmarks = make_benchmarks(load_corpus())
+
+    results: dict[str, Any] = {}
+    for benchmark in benchmarks:
+        if names is not None and benchmark.name not in names:
+            continue
+
+        (time, calibration) = measure(benchmark.function, repeat)
+        results[benchmark.name] = {
+            "time": time,
+            "calibration": calibration,
+            "normalized": time / calibration,
+        }
+
+    return {
+        "python": sys.version,
+        "benchmarks": results,
+    }
+
+
+def regression_ratio(result: dict[str, Any], base: dict[str, Any]) -> float:
+    "Returns the normalized time of a result relative to its baseline."
+    return result["normalized"] / base["normalized"]
+
+
+def find_regressions(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    "Returns the names of the benchmarks that regressed past the threshold."
+
+    base_benchmarks = baseline["benchmarks"]
+
+    return [
+        name
+        for (name, result) in results["benchmarks"].items()
+        if name in base_benchmarks
+        and regression_ratio(result, base_benchmarks[name]) > 1 + threshold
+    ]
+
+
+def confirm_regressions(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+    repeat: int,
+    attempts: int,
+):
+    """
+    Measures benchmarks that regressed past the threshold again, up to
+    `attempts` times, keeping the best result of each in `results`.
+    """
+
+    for _ in range(attempts):
+        regressions = find_regressions(results, baseline, threshold)
+        if len(regressions) == 0:
+            return
+
+        rerun = run_benchmarks(repeat, names=regressions)
+        for (name, result) in rerun["benchmarks"].items():
+            if result["normalized"] < results["benchmarks"][name]["normalized"]:
+                results["benchmarks"][name] = result
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Prints the results compared to a baseline, and returns the names of the
+    benchmarks that regressed past the threshold.
+    """
+
+    base_benchmarks = baseline["benchmarks"]
+    regressions = find_regressions(results, baseline, threshold)
+
+    for (name, result) in results["benchmarks"].items():
+        line = f"  {name:<36} {result['time'] * 1000:>9.3f} ms"
+
+        base = base_benchmarks.get(name)
+        if base is None:
+            print(f"{line}  {ConsoleColor.YELLOW('(no baseline)')}")
+            continue
+
+        ratio = regression_ratio(result, base)
+        text = f"{ratio:.2f}x baseline"
+
+        if name in regressions:
+            text = ConsoleColor.RED(text)
+        elif ratio < 1 - threshold:
+            text = ConsoleColor.GREEN(text)
+
+        print(f"{line}  {text}")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the naming and doc comment hot paths against a committed baseline."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exits with a non-zero status if a benchmark regressed past the threshold.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Relative slowdown, after calibration, that counts as a regression. Defaults to {DEFAULT_THRESHOLD}.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=10,
+        help="Number of timing rounds per benchmark; the best is kept. Defaults to 10.",
+    )
+    parser.add_argument(
+        "--confirm-attempts",
+        dest="confirm_attempts",
+        type=int,
+        default=DEFAULT_CONFIRM_ATTEMPTS,
+        help=f"Number of times benchmarks that appear to regress are measured again before counting as regressions; the best measurement is kept. Defaults to {DEFAULT_CONFIRM_ATTEMPTS}.",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        dest="update_baseline",
+        action="store_true",
+        help=f"Records the results as the new baseline in {BASELINE_PATH.name}.",
+    )
+    parser.add_argument(
+        "--extract-corpus",
+        dest="extract_corpus",
+        action="store_true",
+        help=f"Re-extracts the benchmark corpus from z3_api.h into {CORPUS_PATH.name} and exits.",
+    )
+
+    args = parser.parse_args()
+
+    if args.extract_corpus:
+        corpus = extract_corpus(paths.srcroot_path("Sources", "CZ3", "api", "z3_api.h"))
+        write_text_atomic(CORPUS_PATH, json.dumps(corpus, indent=2) + "\n")
+        print(f"Wrote corpus with {ConsoleColor.CYAN(len(corpus['enums']))} enum(s) to {ConsoleColor.MAGENTA(CORPUS_PATH)}")
+        return 0
+
+    results = run_benchmarks(max(1, args.repeat))
+
+    if args.update_baseline:
+        write_text_atomic(BASELINE_PATH, json.dumps(results, indent=2) + "\n")
+        print(f"Wrote baseline to {ConsoleColor.MAGENTA(BASELINE_PATH)}")
+
+    baseline: dict[str, Any] = {"benchmarks": {}}
+    if BASELINE_PATH.exists():
+        with open(BASELINE_PATH) as file:
+            baseline = json.load(file)
+
+    if not args.update_baseline:
+        confirm_regressions(
+            results, baseline, args.threshold, max(1, args.repeat), max(0, args.confirm_attempts)
+        )
+
+    regressions = compare(results, baseline, args.threshold)
+
+    if len(regressions) > 0:
+        print(ConsoleColor.RED(f"{len(regressions)} benchmark(s) regressed past {args.threshold:.0%}: {', '.join(regressions)}"))
+        return 1 if args.check else 0
+
+    print(ConsoleColor.GREEN("No regressions."))
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,342 @@
+# End-to-end benchmark of the type generator over synthetic headers.
+# Usage, from the repository root:
+#
+#     python -m utils.benchmarks.pipeline_benchmark [--sizes N ...] [--repeat N]
+#         [--output results.json] [--compare baseline.json]
+#
+# Writes synthetic C headers shaped like z3_api.h, with large enums, structs
+# with many fields and Doxygen-style doc comments, and runs each one through
+# generate_types with the Z3 configuration and a target that discards the
+# generated files. Reports time per stage and throughput for each header size,
+# optionally writing the results as JSON so runs on different commits can be
+# compared with --compare.
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any
+
+from generate_types_config import (
+    Z3_PREFIXES,
+    Z3DeclGenerator,
+    Z3DirectoryStructureManager,
+    Z3DoccommentFormatter,
+    Z3DoccommentLookup,
+    Z3NameGenerator,
+    Z3SymbolFilter,
+)
+from utils.cli.console_color import ConsoleColor
+from utils.files.atomic_write import write_text_atomic
+from utils.generator.type_generator import (
+    DeclFileGeneratorNullTarget,
+    TypeGeneratorRequest,
+    generate_types,
+)
+from utils.paths import paths
+from utils.profiling.stage_profiler import StageProfiler
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+"Default number of declarations (enumerators and struct fields) per synthetic header."
+
+MAX_ENUM_CASES = 2_000
+"Maximum number of enumerators per synthetic enum."
+
+STRUCT_FIELDS = 32
+"Number of fields per synthetic struct."
+
+STRUCT_RATIO = 0.1
+"Fraction of the declarations of a header that are struct fields."
+
+RESULTS_VERSION = 1
+"Version of the JSON results format."
+
+
+def _enum_source(index: int, case_count: int) -> str:
+    enum_name = f"Z3_bench_kind_{index}"
+    case_names = [f"Z3_BENCH_KIND_{index}_CASE_{i}" for i in range(case_count)]
+    previous = f"Z3_bench_kind_{index - 1}" if index > 0 else "Z3_bench_kind_0"
+
+    lines = [
+        "/**",
+        f"   \\brief Kinds of synthetic objects of group {index}.",
+        "",
+        f"   Values of this enumeration are accepted wherever a \\c {previous} is",
+        "   expected, and are reported by the solver when inspecting benchmark terms.",
+        "",
+    ]
+    for (i, case_name) in enumerate(case_names):
+        lines.append(
+            f"   - {case_name}: Synthetic case {i} of \\c {enum_name}. The result"
+        )
+        lines.append(f"     is unspecified unless \\ref {case_names[i - 1]} is set.")
+    lines.extend(
+        [
+            "",
+            f"   \\sa {previous}",
+            "*/",
+            "typedef enum",
+            "{",
+        ]
+    )
+    for (i, case_name) in enumerate(case_names):
+        if i == 0:
+            lines.append(f"    {case_name} = {index * MAX_ENUM_CASES},")
+        else:
+            lines.append(f"    {case_name},")
+    lines.append(f"}} {enum_name};")
+    lines.append("")
+
+    return "\n".join(lines)
+
+
+def _struct_source(index: int, field_count: int) -> str:
+    struct_name = f"Z3_bench_config_{index}"
+
+    lines = [
+        "/**",
+        f"   \\brief Synthetic configuration record {index}.",
+        "*/",
+        f"typedef struct {struct_name}",
+        "{",
+    ]
+    for i in range(field_count):
+        lines.append(f"    /** \\brief Setting {i} of \\c {struct_name}, in milliseconds. */")
+        lines.append(f"    unsigned int field_{i};")
+    lines.append(f"}} {struct_name};")
+    lines.append("")
+
+    return "\n".join(lines)
+
+
+def make_synthetic_header(decl_count: int) -> str:
+    """
+    Returns the contents of a synthetic header with `decl_count` declarations,
+    counting enumerators and struct fields.
+    """
+
+    struct_decls = int(decl_count * STRUCT_RATIO)
+    enum_decls = decl_count - struct_decls
+
+    parts = ["#ifndef Z3_BENCH_H_", "#define Z3_BENCH_H_", ""]
+
+    index = 0
+    while enum_decls > 0:
+        count = min(MAX_ENUM_CASES, enum_decls)
+        parts.append(_enum_source(index, count))
+        enum_decls -= count
+        index += 1
+
+    index = 0
+    while struct_decls > 0:
+        count = min(STRUCT_FIELDS, struct_decls)
+        parts.append(_struct_source(index, count))
+        struct_decls -= count
+        index += 1
+
+    parts.append("#endif")
+
+    return "\n".join(parts)
+
+
+def run_generator(header_path: Path, destination: Path) -> StageProfiler:
+    "Runs the generator over a header and returns the profiler with its stage timings."
+
+    profiler = StageProfiler()
+    symbol_filter = Z3SymbolFilter()
+    symbol_name_generator = Z3NameGenerator()
+    request = TypeGeneratorRequest(
+        header_file=header_path,
+        destination=destination,
+        prefixes=Z3_PREFIXES,
+        target=DeclFileGeneratorNullTarget(),
+        includes=["CZ3"],
+        swift_decl_generator=Z3DeclGenerator(
+            prefixes=Z3_PREFIXES,
+            symbol_filter=symbol_filter,
+            symbol_name_generator=symbol_name_generator,
+        ),
+        symbol_filter=symbol_filter,
+        symbol_name_generator=symbol_name_generator,
+        doccomment_lookup=Z3DoccommentLookup(),
+        doccomment_formatter=Z3DoccommentFormatter(),
+        directory_manager=Z3DirectoryStructureManager(destination),
+        slice_allowlist=[header_path.parent],
+        profiler=profiler,
+    )
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        generate_types(request)
+
+    return profiler
+
+
+def benchmark_size(decl_count: int, repeat: int, folder: Path) -> dict[str, Any]:
+    "Benchmarks a synthetic header of a given size, keeping the fastest of `repeat` runs."
+
+    header_path = folder.joinpath(f"bench_{decl_count}.h")
+    header = make_synthetic_header(decl_count)
+    write_text_atomic(header_path, header)
+
+    best: StageProfiler | None = None
+    for _ in range(repeat):
+        profiler = run_generator(header_path, folder.joinpath("Generated"))
+        if best is None or profiler.total_wall_time() < best.total_wall_time():
+            best = profiler
+
+    assert best is not None
+    wall_time = best.total_wall_time()
+
+    return {
+        "decls": decl_count,
+        "header_bytes": len(header.encode("utf-8")),
+        "wall_time": wall_time,
+        "cpu_time": best.total_cpu_time(),
+        "decls_per_second": decl_count / wall_time if wall_time > 0 else None,
+        "stages": [
+            {
+                "name": stage.name.rstrip("."),
+                "wall_time": stage.wall_time,
+                "cpu_time": stage.cpu_time,
+                "decl_count": stage.decl_count,
+                "file_count": stage.file_count,
+            }
+            for stage in best.stages
+        ],
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=paths.SCRIPTS_ROOT_PATH,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.decode().strip()
+
+
+def print_results(results: dict[str, Any], baseline: dict[str, Any] | None):
+    baseline_runs = {}
+    if baseline is not None:
+        baseline_runs = {run["decls"]: run for run in baseline["runs"]}
+
+    for run in results["runs"]:
+        print(
+            f"{ConsoleColor.CYAN(run['decls'])} declaration(s), "
+            f"{run['header_bytes'] / 1024:.0f} KiB header: "
+            f"{run['wall_time'] * 1000:.1f} ms, "
+            f"{run['decls_per_second']:.0f} decls/s"
+        )
+
+        base_run = baseline_runs.get(run["decls"])
+        base_stages = {}
+        if base_run is not None:
+            base_stages = {stage["name"]: stage for stage in base_run["stages"]}
+
+        for stage in run["stages"]:
+            line = f"  {stage['name']:<45} {stage['wall_time'] * 1000:>10.1f} ms"
+
+            if (base_stage := base_stages.get(stage["name"])) is not None:
+                line += "  " + _format_ratio(stage["wall_time"], base_stage["wall_time"])
+
+            print(line)
+
+        if base_run is not None:
+            print(
+                f"  {'Total':<45} {run['wall_time'] * 1000:>10.1f} ms  "
+                + _format_ratio(run["wall_time"], base_run["wall_time"])
+            )
+
+
+def _format_ratio(time: float, baseline_time: float) -> str:
+    if baseline_time <= 0:
+        return ""
+
+    ratio = time / baseline_time
+    text = f"{ratio:.2f}x baseline"
+    if ratio > 1.1:
+        return ConsoleColor.RED(text)
+    if ratio < 0.9:
+        return ConsoleColor.GREEN(text)
+
+    return text
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the type generator end-to-end over synthetic headers of increasing size."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Number of declarations of each synthetic header. Defaults to 100 1000 10000 100000.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of runs per size; the fastest is reported. Defaults to 1.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Writes the results as JSON to a given path.",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        help="JSON results of a previous run to compare stage timings against.",
+    )
+
+    args = parser.parse_args()
+
+    baseline: dict[str, Any] | None = None
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+    results: dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "revision": _git_revision(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "runs": [],
+    }
+
+    # Synthetic headers are written next to the generator scripts, as the C
+    # preprocessor is invoked from there.
+    temp_root = paths.scripts_path(".temp")
+    temp_root.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=temp_root) as folder:
+        for size in args.sizes:
+            print(f"Benchmarking {ConsoleColor.CYAN(size)} declaration(s)...")
+            results["runs"].append(benchmark_size(size, max(1, args.repeat), Path(folder)))
+
+    print_results(results, baseline)
+
+    if args.output is not None:
+        write_text_atomic(args.output, json.dumps(results, indent=2))
+        print(f"Wrote results to {ConsoleColor.MAGENTA(args.output)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
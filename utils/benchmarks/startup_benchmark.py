@@ -0,0 +1,258 @@
+# Startup budget for the generate_types.py entry point.
+# Usage, from the repository root:
+#
+#     python -m utils.benchmarks.startup_benchmark [--check] [--repeat N]
+#
+# Runs generate_types.py under `python -X importtime` in modes that should
+# start without loading the generator's heavy dependencies, such as --help, and
+# --check while the run cache is up to date, and reports the time spent
+# importing modules in each. Modules imported by a bare interpreter are not
+# counted, so results only cover what the script itself imports.
+#
+# Budgets are relative to the time a bare interpreter takes to import a fixed
+# set of standard library modules, measured in rounds interleaved with the
+# modes, so they hold across machines of different speeds.
+#
+# With --check, the script exits with a non-zero status if a mode imports a
+# module it should only load once a pipeline stage runs, or if its import time
+# exceeds its budget.
+
+import argparse
+import subprocess
+import sys
+
+from dataclasses import dataclass
+from typing import Sequence
+
+from utils.cli.console_color import ConsoleColor
+from utils.paths import paths
+
+DEFAULT_REPEAT = 5
+"Default number of runs per mode; the fastest is kept."
+
+
+@dataclass
+class StartupScenario:
+    """
+    A mode of generate_types.py whose startup is measured.
+    """
+
+    name: str
+
+    args: list[str]
+    "Arguments passed to generate_types.py."
+
+    budget_ratio: float
+    """
+    Maximum time the mode may spend importing modules, relative to the time
+    spent importing `CALIBRATION_MODULES`.
+    """
+
+    forbidden_modules: list[str]
+    "Modules, and their submodules, that the mode must not import."
+
+    warm_up: bool = False
+    """
+    Whether to run the mode once before measuring it, e.g. to record the run
+    cache.
+    """
+
+
+HEAVY_MODULES = [
+    "pycparser",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "utils.generator.libclang_backend",
+]
+"Modules that are only needed once the parsing or parallel stages run."
+
+CALIBRATION_MODULES = ["argparse", "dataclasses", "json", "pathlib", "subprocess", "typing"]
+"Standard library modules whose import time budgets are relative to."
+
+SCENARIOS = [
+    StartupScenario(
+        "help",
+        ["--help"],
+        budget_ratio=2.0,
+        forbidden_modules=HEAVY_MODULES + ["utils.generator.type_generator", "generate_types_config"],
+    ),
+    StartupScenario(
+        "cached check",
+        ["--check"],
+        budget_ratio=4.0,
+        forbidden_modules=HEAVY_MODULES,
+        warm_up=True,
+    ),
+]
+
+
+@dataclass
+class StartupResult:
+    scenario: StartupScenario
+
+    exit_code: int
+    "Exit code of the last measured run."
+
+    import_ms: float
+    "Time spent importing modules not imported by a bare interpreter."
+
+    calibration_ms: float
+    "Time spent importing `CALIBRATION_MODULES` in the same rounds."
+
+    forbidden_imports: list[str]
+    "Forbidden modules that were imported."
+
+    def ratio(self) -> float:
+        "Returns the import time relative to the calibration import time."
+        return self.import_ms / self.calibration_ms
+
+    def is_within_budget(self) -> bool:
+        return (
+            self.exit_code == 0
+            and self.ratio() <= self.scenario.budget_ratio
+            and len(self.forbidden_imports) == 0
+        )
+
+
+def import_times(args: Sequence[str]) -> tuple[int, dict[str, float]]:
+    """
+    Runs the interpreter with a set of arguments under `-X importtime`, and
+    returns its exit code along with the time spent importing each module,
+    excluding its submodules, in milliseconds.
+    """
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=paths.SOURCE_ROOT_PATH,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    result: dict[str, float] = dict()
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+
+        result[fields[2].strip()] = int(fields[0]) / 1000
+
+    return (process.returncode, result)
+
+
+def is_submodule(module: str, parent: str) -> bool:
+    return module == parent or module.startswith(f"{parent}.")
+
+
+def added_import_ms(times: dict[str, float], interpreter_modules: set[str]) -> float:
+    "Returns the time spent importing modules not imported by a bare interpreter."
+    return sum(t for (m, t) in times.items() if m not in interpreter_modules)
+
+
+def measure(scenario: StartupScenario, interpreter_modules: set[str], repeat: int) -> StartupResult:
+    """
+    Returns the fastest of `repeat` runs of a mode, along with the fastest
+    import of the calibration modules.
+
+    Runs of the mode and of the calibration imports are interleaved, so both
+    are equally affected by changes in the load of the machine.
+    """
+
+    args = [str(paths.srcroot_path("generate_types.py")), *scenario.args]
+    calibration_args = ["-c", f"import {', '.join(CALIBRATION_MODULES)}"]
+
+    if scenario.warm_up:
+        import_times(args)
+
+    best: StartupResult | None = None
+    calibration_ms: list[float] = []
+    for _ in range(repeat):
+        (_, calibration_times) = import_times(calibration_args)
+        calibration_ms.append(added_import_ms(calibration_times, interpreter_modules))
+
+        (exit_code, times) = import_times(args)
+
+        result = StartupResult(
+            scenario=scenario,
+            exit_code=exit_code,
+            import_ms=added_import_ms(times, interpreter_modules),
+            calibration_ms=0.0,
+            forbidden_imports=sorted(
+                module
+                for module in times
+                if any(is_submodule(module, f) for f in scenario.forbidden_modules)
+            ),
+        )
+
+        if best is None or result.import_ms < best.import_ms:
+            best = result
+
+    assert best is not None
+    best.calibration_ms = min(calibration_ms)
+
+    return best
+
+
+def print_results(results: list[StartupResult]):
+    width = max(len(r.scenario.name) for r in results)
+
+    print(ConsoleColor.YELLOW("Startup import times:"))
+    for result in results:
+        status = ConsoleColor.GREEN("ok") if result.is_within_budget() else ConsoleColor.RED("over budget")
+
+        print(
+            f"  {result.scenario.name.ljust(width)}  "
+            f"{result.import_ms:7.1f} ms, {result.ratio():5.2f}x calibration "
+            f"(budget {result.scenario.budget_ratio:.2f}x)  {status}"
+        )
+
+        if result.exit_code != 0:
+            print(f"    {ConsoleColor.RED('Exited with status')} {result.exit_code}")
+        if len(result.forbidden_imports) > 0:
+            print(f"    {ConsoleColor.RED('Imported')}: {', '.join(result.forbidden_imports)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measures the import time of generate_types.py entry points against a startup budget."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exits with a non-zero status if a mode is over its budget or imports a forbidden module.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Number of runs per mode; the fastest is kept. Defaults to {DEFAULT_REPEAT}.",
+    )
+
+    args = parser.parse_args()
+
+    (_, interpreter_times) = import_times(["-c", "pass"])
+    interpreter_modules = set(interpreter_times.keys())
+
+    results = [
+        measure(scenario, interpreter_modules, max(1, args.repeat))
+        for scenario in SCENARIOS
+    ]
+
+    print_results(results)
+
+    if not all(r.is_within_budget() for r in results):
+        return 1 if args.check else 0
+
+    print(ConsoleColor.GREEN("Within budget."))
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
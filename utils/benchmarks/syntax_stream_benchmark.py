@@ -0,0 +1,150 @@
+# Micro-benchmark comparing write-through and buffered SyntaxStream rendering.
+# Usage, from the repository root:
+#
+#     python -m utils.benchmarks.syntax_stream_benchmark [--members N] [--repeat N]
+#
+# Renders a large synthetic SwiftExtensionDecl, with doc comments and accessor
+# blocks on every member, into an in-memory destination with each stream kind
+# and reports the best time out of a number of repetitions.
+
+import argparse
+import sys
+import timeit
+
+from io import StringIO
+from pathlib import Path
+
+from utils.cli.console_color import ConsoleColor
+from utils.converters.syntax_stream import BufferedSyntaxStream, SyntaxStream
+from utils.data.compound_symbol_name import CompoundSymbolName
+from utils.data.swift_decls import (
+    CDeclKind,
+    SwiftExtensionDecl,
+    SwiftMemberDecl,
+    SwiftMemberFunctionDecl,
+    SwiftMemberVarDecl,
+)
+from utils.doccomment.doccomment_block import DoccommentBlock
+
+
+def make_synthetic_decl(member_count: int) -> SwiftExtensionDecl:
+    "Creates an extension declaration shaped like a large generated enum."
+
+    doc = DoccommentBlock(
+        file=Path("synthetic.h"),
+        line=1,
+        column=1,
+        comment_contents="\n".join(
+            [
+                "A synthetic member used for benchmarking rendering.",
+                "",
+                "- note: Spans multiple lines, like most Z3 doc comments do.",
+            ]
+        ),
+    )
+
+    members: list[SwiftMemberDecl] = []
+    for i in range(member_count):
+        name = CompoundSymbolName.from_snake_case(f"synthetic_case_{i}")
+
+        if i % 4 == 0:
+            members.append(
+                SwiftMemberFunctionDecl(
+                    name,
+                    original_name=name,
+                    origin=None,
+                    original_descriptor=None,
+                    c_kind=CDeclKind.NONE,
+                    doccomment=doc,
+                    arguments=[(None, "lhs", "Self"), (None, "rhs", "Self")],
+                    return_type="Bool",
+                    body=[f"lhs.field{i} == rhs.field{i}"],
+                )
+            )
+        else:
+            members.append(
+                SwiftMemberVarDecl(
+                    name,
+                    original_name=name,
+                    origin=None,
+                    original_descriptor=None,
+                    c_kind=CDeclKind.ENUM_CASE,
+                    doccomment=doc,
+                    is_static=True,
+                    var_type="SyntheticEnum",
+                    initial_value=None if i % 4 == 1 else f"SYNTHETIC_CASE_{i}",
+                    accessor_block=[f"SYNTHETIC_CASE_{i}"] if i % 4 == 1 else None,
+                )
+            )
+
+    return SwiftExtensionDecl(
+        CompoundSymbolName.from_pascal_case("SyntheticEnum"),
+        original_name=CompoundSymbolName.from_snake_case("synthetic_enum"),
+        origin=None,
+        original_descriptor=None,
+        c_kind=CDeclKind.ENUM,
+        doccomment=doc,
+        members=members,
+        conformances=["Equatable"],
+    )
+
+
+def render_write_through(decl: SwiftExtensionDecl) -> str:
+    buffer = StringIO()
+    decl.write(SyntaxStream(buffer))
+
+    return buffer.getvalue()
+
+
+def render_buffered(decl: SwiftExtensionDecl) -> str:
+    stream = BufferedSyntaxStream()
+    decl.write(stream)
+
+    return stream.getvalue()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compares write-through and buffered SyntaxStream rendering of a large synthetic declaration."
+    )
+    parser.add_argument(
+        "--members",
+        type=int,
+        default=20_000,
+        help="Number of members of the synthetic declaration. Defaults to 20000.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of repetitions; the best time is reported. Defaults to 5.",
+    )
+
+    args = parser.parse_args()
+
+    decl = make_synthetic_decl(args.members)
+
+    if render_write_through(decl) != render_buffered(decl):
+        print(ConsoleColor.RED("Error: Buffered rendering produced different output."))
+        return 1
+
+    write_through = min(
+        timeit.repeat(lambda: render_write_through(decl), number=1, repeat=args.repeat)
+    )
+    buffered = min(
+        timeit.repeat(lambda: render_buffered(decl), number=1, repeat=args.repeat)
+    )
+
+    print(f"Rendering extension with {ConsoleColor.CYAN(args.members)} member(s):")
+    print(f"  write-through: {write_through * 1000:.2f} ms")
+    print(f"  buffered:      {buffered * 1000:.2f} ms")
+    print(f"  speedup:       {ConsoleColor.GREEN(f'{write_through / buffered:.2f}x')}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,99 @@
+import pickle
+import sys
+
+from pathlib import Path
+
+import pycparser
+from pycparser import c_ast
+
+from utils.cache.file_digest import digest_files, digest_strings
+from utils.files.atomic_write import write_bytes_atomic
+
+_CACHE_FORMAT_VERSION = 1
+"Bump whenever the layout of cached entries or the collection rules change."
+
+
+def _cache_header() -> tuple[int, str, str, str]:
+    """
+    Header that every cache entry starts with. Entries written by a different
+    pycparser or Python release are never unpickled, since the layout of
+    `c_ast` nodes is not guaranteed to be stable between releases.
+    """
+    return (
+        _CACHE_FORMAT_VERSION,
+        pycparser.__version__,
+        sys.implementation.cache_tag or sys.implementation.name,
+        sys.version,
+    )
+
+
+class AstCache:
+    """
+    On-disk cache of the top-level C declarations collected from a preprocessed
+    translation unit.
+
+    Instead of the full `c_ast.FileAST`, only the nodes kept by
+    `DeclCollectorVisitor` are stored, keyed by a digest of the preprocessed
+    text, a list of strings describing how they were collected, such as the
+    collection prefixes, and the contents of the generator source files that
+    shape the collected nodes, such as the slicer and the collector itself.
+    """
+
+    folder: Path
+
+    source_digest: str | None
+    """
+    Digest of the source files the cache was created with, or None, if any of
+    them could not be read, in which case caching is disabled.
+    """
+
+    def __init__(self, cache_folder: Path, source_files: list[Path]):
+        self.folder = cache_folder.joinpath("ast")
+        self.source_digest = digest_files([], sorted(set(source_files)))
+
+    def lookup(self, text_digest: str, configuration: list[str]) -> list[c_ast.Node] | None:
+        """
+        Returns the cached declarations collected from a preprocessed text with
+        a given digest, or None, if no compatible entry exists.
+        """
+        if self.source_digest is None:
+            return None
+
+        try:
+            with open(self._entry_path(text_digest, configuration), "rb") as file:
+                if pickle.load(file) != _cache_header():
+                    return None
+
+                nodes = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+            return None
+
+        if not isinstance(nodes, list):
+            return None
+
+        return nodes
+
+    def store(self, text_digest: str, configuration: list[str], nodes: list[c_ast.Node]):
+        "Records the declarations collected from a preprocessed text with a given digest."
+
+        if self.source_digest is None:
+            return
+
+        try:
+            data = pickle.dumps(
+                _cache_header(), protocol=pickle.HIGHEST_PROTOCOL
+            ) + pickle.dumps(nodes, protocol=pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            # Pathologically deep expression trees; not worth caching.
+            return
+
+        write_bytes_atomic(self._entry_path(text_digest, configuration), data)
+
+    def _entry_path(self, text_digest: str, configuration: list[str]) -> Path:
+        assert self.source_digest is not None
+
+        key = digest_strings(
+            [text_digest, pycparser.__version__, self.source_digest] + configuration
+        )
+
+        return self.folder.joinpath(f"{key}.pickle")
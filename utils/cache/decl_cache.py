@@ -0,0 +1,170 @@
+import dataclasses
+import json
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.cache.file_digest import digest_strings
+from utils.data.compound_symbol_name import CompoundSymbolName
+from utils.data.swift_decl_lookup import SwiftDeclLookup
+from utils.data.swift_decls import SwiftDecl
+from utils.files.atomic_write import write_text_atomic
+
+_CACHE_FORMAT_VERSION = 2
+"Bump whenever the layout of cache records or the fingerprint scheme changes."
+
+_UNFINGERPRINTED_FIELDS = {"origin", "doccomment", "members"}
+"""
+Fields of Swift declarations that are fingerprinted separately, or not at all.
+Members are fingerprinted through `children()`, while source locations are
+not rendered, so moving a declaration around its header does not invalidate it.
+"""
+
+
+def fingerprint_decl(decl: SwiftDecl) -> str:
+    """
+    Returns a fingerprint of a Swift declaration and its members, as produced
+    by the naming and filtering configuration, covering the descriptors of
+    their original C declarations and their unformatted doc comments.
+    """
+
+    parts: list[str] = []
+    _decl_parts(decl, parts)
+
+    return digest_strings(parts)
+
+
+def _decl_parts(decl: SwiftDecl, parts: list[str]):
+    parts.append(type(decl).__qualname__)
+
+    for field in dataclasses.fields(decl):
+        if field.name in _UNFINGERPRINTED_FIELDS:
+            continue
+
+        value = getattr(decl, field.name)
+        if isinstance(value, CompoundSymbolName):
+            value = value.to_string()
+        elif field.name == "conformances":
+            # Rendered sorted, and merged through an unordered set
+            value = sorted(value)
+
+        # Descriptors of C declarations are dataclasses of plain values, so
+        # their representation covers every one of their fields
+        parts.append(field.name)
+        parts.append(repr(value))
+
+    doccomment = decl.doccomment
+    parts.append("" if doccomment is None else doccomment.comment_contents)
+
+    for child in decl.children():
+        _decl_parts(child, parts)
+
+    parts.append(")")
+
+
+@dataclass
+class DeclCacheEntry:
+    text: str
+    "Rendered text of the declaration."
+
+    lookups: dict[str, str | None]
+    """
+    C symbol lookups made while formatting the doc comments of the declaration,
+    and the Swift names they resolved to.
+    """
+
+
+class DeclCache:
+    """
+    On-disk cache of the rendered text of top-level Swift declarations from the
+    last generator run for a request, keyed by `fingerprint_decl`.
+
+    Entries are only reused if the configuration and source files of the
+    generator match the ones they were recorded with, and every symbol that
+    was looked up while formatting their doc comments still resolves to the
+    same Swift name. Only the entries that were looked up or stored during a
+    run are saved, so records do not grow across runs.
+    """
+
+    record_path: Path
+
+    static_fingerprint: str | None
+    """
+    Fingerprint of the configuration and source files of the generator, or
+    None, if any of them could not be read, in which case nothing is cached.
+    """
+
+    reused_count: int
+    "Number of entries reused by the current run."
+
+    def __init__(self, cache_folder: Path, key: str, static_fingerprint: str | None):
+        self.record_path = cache_folder.joinpath(
+            "decls", f"{digest_strings([key])}.json"
+        )
+        self.static_fingerprint = static_fingerprint
+        self.reused_count = 0
+        self._entries: dict[str, DeclCacheEntry] | None = None
+        self._used: dict[str, DeclCacheEntry] = dict()
+
+    def lookup(self, fingerprint: str, decl_lookup: SwiftDeclLookup) -> str | None:
+        """
+        Returns the rendered text of a declaration with a given fingerprint, or
+        None, if it needs to be formatted and rendered again.
+        """
+
+        entry = self._load_entries().get(fingerprint)
+        if entry is None or not decl_lookup.resolves_to(entry.lookups):
+            return None
+
+        self._used[fingerprint] = entry
+        self.reused_count += 1
+
+        return entry.text
+
+    def store(self, fingerprint: str, text: str, lookups: dict[str, str | None]):
+        "Records the rendered text of a declaration for the next run."
+
+        self._used[fingerprint] = DeclCacheEntry(text, dict(lookups))
+
+    def save(self):
+        "Writes the entries used or stored during the current run to disk."
+
+        if self.static_fingerprint is None:
+            return
+
+        record = {
+            "version": _CACHE_FORMAT_VERSION,
+            "fingerprint": self.static_fingerprint,
+            "entries": {
+                fingerprint: {"text": entry.text, "lookups": entry.lookups}
+                for (fingerprint, entry) in self._used.items()
+            },
+        }
+
+        write_text_atomic(self.record_path, json.dumps(record))
+
+    def _load_entries(self) -> dict[str, DeclCacheEntry]:
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = dict()
+        if self.static_fingerprint is None:
+            return self._entries
+
+        try:
+            with open(self.record_path, "rb") as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            return self._entries
+
+        if (
+            not isinstance(record, dict)
+            or record.get("version") != _CACHE_FORMAT_VERSION
+            or record.get("fingerprint") != self.static_fingerprint
+        ):
+            return self._entries
+
+        for (fingerprint, entry) in record["entries"].items():
+            self._entries[fingerprint] = DeclCacheEntry(entry["text"], entry["lookups"])
+
+        return self._entries
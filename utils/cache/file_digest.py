@@ -0,0 +1,58 @@
+import hashlib
+
+from pathlib import Path
+from typing import Iterable
+
+
+def digest_bytes(data: bytes) -> str:
+    "Returns a hex digest for a given byte string."
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_strings(strings: Iterable[str]) -> str:
+    """
+    Returns a hex digest for a sequence of strings. Each string is length-prefixed
+    so distinct sequences never hash the same when concatenated.
+    """
+
+    hasher = hashlib.sha256()
+    for string in strings:
+        encoded = string.encode("utf-8")
+        hasher.update(len(encoded).to_bytes(8, "little"))
+        hasher.update(encoded)
+
+    return hasher.hexdigest()
+
+
+def digest_file(path: Path) -> str | None:
+    """
+    Returns a hex digest of the contents of the file at a given path, or None,
+    if the path does not point to a readable file.
+    """
+
+    try:
+        with open(path, "rb") as file:
+            return digest_bytes(file.read())
+    except OSError:
+        return None
+
+
+def digest_files(prefix: Iterable[str], files: Iterable[Path]) -> str | None:
+    """
+    Returns a hex digest for a sequence of strings followed by the paths and
+    contents of a sequence of files, or None, if any of the files can no longer
+    be read.
+    """
+
+    parts = list(prefix)
+
+    for path in files:
+        digest = digest_file(path)
+        if digest is None:
+            return None
+
+        parts.append(str(path))
+        parts.append(digest)
+
+    return digest_strings(parts)
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import sys
+
+from pathlib import Path
+from typing import Sequence
+
+from utils.cache.file_digest import digest_bytes, digest_file, digest_strings
+from utils.files.atomic_write import write_bytes_atomic, write_text_atomic
+from utils.preprocessor.line_markers import include_closure
+
+_ENTRY_FORMAT_VERSION = 1
+"Bump whenever the layout of cache entries changes."
+
+
+class PreprocessorCache:
+    """
+    On-disk cache of C preprocessor output.
+
+    Entries are keyed by the identity of the compiler binary, the full list of
+    compiler arguments, the working directory and the target platform. Each
+    entry also records a content digest of every file in the include closure of
+    the preprocessed output, and is only reused while all of those files remain
+    unchanged.
+    """
+
+    folder: Path
+
+    def __init__(self, cache_folder: Path):
+        self.folder = cache_folder.joinpath("preprocessor")
+
+    def lookup(self, args: Sequence[str | os.PathLike], cwd: Path) -> bytes | None:
+        """
+        Returns the cached output of invoking the preprocessor with a given set
+        of arguments, or None, if no valid entry exists.
+        """
+        key = self._key(args, cwd)
+        if key is None:
+            return None
+
+        try:
+            with open(self._entry_path(key), "rb") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(entry, dict) or entry.get("version") != _ENTRY_FORMAT_VERSION:
+            return None
+
+        for (path, digest) in entry["closure"]:
+            if digest_file(Path(path)) != digest:
+                return None
+
+        try:
+            with open(self._output_path(key), "rb") as file:
+                output = file.read()
+        except OSError:
+            return None
+
+        # Guard against entries and outputs written by different runs
+        if digest_bytes(output) != entry["output"]:
+            return None
+
+        return output
+
+    def store(self, args: Sequence[str | os.PathLike], cwd: Path, output: bytes):
+        "Records the output of invoking the preprocessor with a given set of arguments."
+
+        key = self._key(args, cwd)
+        if key is None:
+            return
+
+        closure: list[tuple[str, str]] = []
+        for path in include_closure(output.decode("utf-8", errors="replace"), cwd):
+            digest = digest_file(path)
+            if digest is None:
+                # Cannot validate entries that depend on unreadable files
+                return
+
+            closure.append((str(path), digest))
+
+        entry = {
+            "version": _ENTRY_FORMAT_VERSION,
+            "closure": closure,
+            "output": digest_bytes(output),
+        }
+
+        write_bytes_atomic(self._output_path(key), output)
+        write_text_atomic(self._entry_path(key), json.dumps(entry, indent=1))
+
+    def _key(self, args: Sequence[str | os.PathLike], cwd: Path) -> str | None:
+        compiler = shutil.which(args[0])
+        if compiler is None:
+            return None
+
+        try:
+            stat = os.stat(compiler)
+        except OSError:
+            return None
+
+        return digest_strings(
+            [
+                sys.platform,
+                str(Path(compiler).resolve()),
+                str(stat.st_size),
+                str(stat.st_mtime_ns),
+                str(cwd),
+            ]
+            + list(map(str, args[1:]))
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.folder.joinpath(f"{key}.json")
+
+    def _output_path(self, key: str) -> Path:
+        return self.folder.joinpath(f"{key}.i")
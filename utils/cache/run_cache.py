@@ -0,0 +1,139 @@
+import json
+
+from pathlib import Path
+
+from utils.cache.file_digest import digest_file, digest_files, digest_strings
+from utils.files.atomic_write import write_text_atomic
+
+_RECORD_FORMAT_VERSION = 1
+"Bump whenever the layout of run records or the fingerprint scheme changes."
+
+
+class RunCache:
+    """
+    Content-addressed record of the last successful generator run for a request.
+
+    A run is fingerprinted by the contents of every file in the header's include
+    closure, the request's configuration and the source files of the generator
+    itself. When the fingerprint of a new run matches the recorded one, and every
+    file the recorded run produced is still present and unchanged, the run can
+    be skipped entirely.
+    """
+
+    record_path: Path
+    configuration: list[str]
+    source_files: list[Path]
+
+    _static_fingerprint: str | None
+
+    output_folder: Path | None
+    """
+    Folder the outputs of a run are written to. If provided, a run is also out
+    of date when files matching `output_pattern` are added to this folder.
+    """
+    output_pattern: str
+
+    def __init__(
+        self,
+        cache_folder: Path,
+        key: str,
+        configuration: list[str],
+        source_files: list[Path],
+        output_folder: Path | None = None,
+        output_pattern: str = "*",
+    ):
+        self.record_path = cache_folder.joinpath(
+            "runs", f"{digest_strings([key])}.json"
+        )
+        self.configuration = configuration
+        self.source_files = source_files
+        self.output_folder = output_folder
+        self.output_pattern = output_pattern
+        self._static_fingerprint = None
+
+    def static_fingerprint(self) -> str | None:
+        """
+        Returns the fingerprint of the inputs that do not depend on the header,
+        namely the configuration and the generator's source files. Computed once
+        per instance, so a run stores the fingerprint it started with.
+        """
+        if self._static_fingerprint is not None:
+            return self._static_fingerprint
+
+        fingerprint = digest_files(
+            [str(_RECORD_FORMAT_VERSION)] + self.configuration,
+            sorted(set(self.source_files)),
+        )
+        self._static_fingerprint = fingerprint
+
+        return fingerprint
+
+    def fingerprint(self, inputs: list[Path]) -> str | None:
+        """
+        Returns the fingerprint of a run that consumed a given include closure,
+        or None, if any of the files involved can no longer be read.
+        """
+        static = self.static_fingerprint()
+        if static is None:
+            return None
+
+        return digest_files([static], inputs)
+
+    def is_up_to_date(self) -> bool:
+        """
+        Returns True if the recorded run is still valid for the current inputs,
+        and its outputs have not been modified or removed since.
+        """
+        record = self._load_record()
+        if record is None:
+            return False
+
+        inputs = list(map(Path, record["inputs"]))
+        if self.fingerprint(inputs) != record["fingerprint"]:
+            return False
+
+        for (path, digest) in record["outputs"].items():
+            if digest_file(Path(path)) != digest:
+                return False
+
+        if self.output_folder is not None:
+            outputs = set(map(str, self.output_folder.rglob(self.output_pattern)))
+            if outputs != set(record["outputs"].keys()):
+                return False
+
+        return True
+
+    def store(self, inputs: list[Path], outputs: list[Path]):
+        """
+        Records a successful run that consumed a given include closure and
+        produced a given list of output files.
+        """
+        fingerprint = self.fingerprint(inputs)
+        if fingerprint is None:
+            return
+
+        record = {
+            "version": _RECORD_FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "inputs": list(map(str, inputs)),
+            "outputs": {str(path): digest_file(path) for path in outputs},
+        }
+
+        write_text_atomic(self.record_path, json.dumps(record, indent=1))
+
+    def invalidate(self):
+        "Removes the recorded run, if any."
+
+        self.record_path.unlink(missing_ok=True)
+
+    def _load_record(self) -> dict | None:
+        try:
+            with open(self.record_path, "rb") as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(record, dict) or record.get("version") != _RECORD_FORMAT_VERSION:
+            return None
+
+        return record
@@ -0,0 +1,130 @@
+import sys
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO, Iterator
+
+from utils.cli.console_color import ConsoleColor
+
+
+class Reporter:
+    """
+    Base class for objects that receive the progress messages and warnings
+    emitted by the generator pipeline. Reporters are installed with
+    `reporting()`.
+    """
+
+    def stage(self, name: str):
+        "Called when a pipeline stage starts."
+
+    def message(self, text: str):
+        "Called with a progress message."
+
+    def warning(self, text: str):
+        "Called with a warning about the input or configuration of a run."
+
+
+class ConsoleReporter(Reporter):
+    """
+    Prints messages and warnings to a text stream, or to the current
+    `sys.stdout` if no stream is provided.
+    """
+
+    stream: IO[str] | None
+
+    def __init__(self, stream: IO[str] | None = None):
+        self.stream = stream
+
+    def stage(self, name: str):
+        print(f"{ConsoleColor.YELLOW('•')}", name, file=self._stream())
+
+    def message(self, text: str):
+        print(text, file=self._stream())
+
+    def warning(self, text: str):
+        print(ConsoleColor.YELLOW(text), file=self._stream())
+
+    def _stream(self) -> IO[str]:
+        return self.stream if self.stream is not None else sys.stdout
+
+
+class RecordingReporter(Reporter):
+    """
+    Records messages and warnings, optionally forwarding them to another
+    reporter as well.
+    """
+
+    messages: list[str]
+    "Progress messages, including stage names, in the order they were reported."
+
+    warnings: list[str]
+    "Warnings, in the order they were reported."
+
+    forward_to: Reporter | None
+
+    def __init__(self, forward_to: Reporter | None = None):
+        self.messages = []
+        self.warnings = []
+        self.forward_to = forward_to
+
+    def stage(self, name: str):
+        self.messages.append(name)
+        if self.forward_to is not None:
+            self.forward_to.stage(name)
+
+    def message(self, text: str):
+        self.messages.append(text)
+        if self.forward_to is not None:
+            self.forward_to.message(text)
+
+    def warning(self, text: str):
+        self.warnings.append(text)
+        if self.forward_to is not None:
+            self.forward_to.warning(text)
+
+
+class QuietReporter(Reporter):
+    """
+    Drops stage announcements and progress messages, forwarding only warnings
+    to another reporter.
+    """
+
+    forward_to: Reporter
+
+    def __init__(self, forward_to: Reporter):
+        self.forward_to = forward_to
+
+    def warning(self, text: str):
+        self.forward_to.warning(text)
+
+
+_active_reporter: ContextVar[Reporter] = ContextVar(
+    "reporter", default=ConsoleReporter()
+)
+"Reporter that receives messages emitted in the current context."
+
+
+def current_reporter() -> Reporter:
+    """
+    Returns the reporter installed in the current context, or a reporter that
+    prints to the console if none is.
+    """
+    return _active_reporter.get()
+
+
+@contextmanager
+def reporting(reporter: Reporter) -> Iterator[None]:
+    """
+    Installs a reporter for every message emitted in the current context until
+    the context manager exits. Other threads, and contexts created before the
+    call, keep their own reporters.
+
+    Messages are not forwarded across process boundaries: work performed by
+    worker processes, such as parallel parsing or rendering, reports to the
+    console.
+    """
+    token = _active_reporter.set(reporter)
+    try:
+        yield
+    finally:
+        _active_reporter.reset(token)
@@ -1,6 +1,18 @@
 from typing import TextIO
 from contextlib import contextmanager
 
+_INDENT_UNIT = "    "
+_CACHED_INDENTS = [_INDENT_UNIT * depth for depth in range(32)]
+"Pre-computed indentation prefixes, indexed by indentation depth."
+
+
+def indent_string(depth: int) -> str:
+    "Returns the indentation prefix for a given indentation depth."
+    if 0 <= depth < len(_CACHED_INDENTS):
+        return _CACHED_INDENTS[depth]
+
+    return _INDENT_UNIT * depth
+
 
 class SyntaxStream:
     def __init__(self, destination: TextIO):
@@ -15,7 +27,7 @@ class SyntaxStream:
         self.write(f"{text}\n")
 
     def indent_str(self) -> str:
-        return "    " * self.indent_depth
+        return indent_string(self.indent_depth)
 
     def line(self, text: str = ""):
         self.pre_line()
@@ -23,7 +35,7 @@ class SyntaxStream:
 
     def pre_line(self):
         "Prints the indentation for a line"
-        self.write(f"{self.indent_str()}")
+        self.write(self.indent_str())
 
     def indent(self):
         self.indent_depth += 1
@@ -31,6 +43,10 @@ class SyntaxStream:
     def unindent(self):
         self.indent_depth -= 1
 
+    def flush(self):
+        "Flushes any pending output to the destination of this stream."
+        pass
+
     @contextmanager
     def block(self, line: str):
         self.line(line)
@@ -50,3 +66,52 @@ class SyntaxStream:
 
         self.unindent()
         self.line(close_brace)
+
+
+class BufferedSyntaxStream(SyntaxStream):
+    """
+    A syntax stream that collects written fragments in an append-only buffer
+    instead of writing through to its destination. The buffered output can be
+    retrieved with `getvalue()`, or written to the destination, with a single
+    write call, by `flush()`.
+    """
+
+    _fragments: list[str]
+
+    def __init__(self, destination: TextIO | None = None):
+        super().__init__(destination)  # type: ignore
+        self._fragments = []
+
+    def write(self, text: str):
+        self._fragments.append(text)
+
+    def write_then_line(self, text: str = ""):
+        fragments = self._fragments
+        fragments.append(text)
+        fragments.append("\n")
+
+    def line(self, text: str = ""):
+        fragments = self._fragments
+        fragments.append(indent_string(self.indent_depth))
+        fragments.append(text)
+        fragments.append("\n")
+
+    def pre_line(self):
+        self._fragments.append(indent_string(self.indent_depth))
+
+    def getvalue(self) -> str:
+        "Returns the contents buffered so far."
+        if len(self._fragments) > 1:
+            self._fragments = ["".join(self._fragments)]
+
+        return self._fragments[0] if len(self._fragments) > 0 else ""
+
+    def flush(self):
+        if self.destination is None:
+            return
+
+        contents = self.getvalue()
+        self._fragments = []
+
+        if len(contents) > 0:
+            self.destination.write(contents)
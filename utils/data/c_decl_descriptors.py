@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING
+
+# The parser is only imported by the functions that describe C nodes, so
+# consumers of descriptors do not load it
+if TYPE_CHECKING:
+    from pycparser import c_ast
+
+class CFieldKind(Enum):
+    """
+    Represents the shape of a field of a C struct or union.
+    """
+
+    SCALAR = 0
+    "A named field that is not an array, including pointers and named structs."
+    ARRAY = 1
+    "A named array field."
+    STRUCT = 2
+    "An anonymous struct member, whose fields are accessed directly."
+    UNION = 3
+    "An anonymous union member, whose fields are accessed directly."
+
+
+@dataclass(slots=True)
+class CFieldDescriptor:
+    """
+    Compact description of a field of a C struct or union.
+    """
+
+    name: str | None
+    kind: CFieldKind
+
+    array_size: int | None = None
+    "Number of elements of an array field, if its dimension is a constant."
+
+    array_size_text: str | None = None
+    "Source text of the dimension of an array field, for diagnostics."
+
+    fields: list["CFieldDescriptor"] | None = None
+    "Fields of an anonymous struct or union member."
+
+    def is_constant(self) -> bool:
+        """
+        Returns True if this field can be resolved (in terms of type and size)
+        at the definition site, without parsing extra expressions (such as in
+        `type name[CONSTANT + 1]` field declarations).
+
+        Anonymous structs are constant if all of their fields are constant, and
+        anonymous unions if any of their fields is constant.
+        """
+        match self.kind:
+            case CFieldKind.ARRAY:
+                return self.array_size is not None and self.array_size != 0
+            case CFieldKind.STRUCT:
+                return all(f.is_constant() for f in self.fields or [])
+            case CFieldKind.UNION:
+                return any(f.is_constant() for f in self.fields or [])
+
+        return True
+
+
+@dataclass(slots=True)
+class CStructDescriptor:
+    """
+    Compact description of a C struct declaration.
+    """
+
+    name: str | None
+
+    fields: list[CFieldDescriptor] | None
+    "Fields of the struct, or None if the declaration has no body."
+
+
+@dataclass(slots=True)
+class CEnumeratorDescriptor:
+    """
+    Compact description of a C enumerator.
+    """
+
+    name: str
+
+    value: str | None
+    "Source text of the explicit value of the enumerator, if any."
+
+
+@dataclass(slots=True)
+class CEnumDescriptor:
+    """
+    Compact description of a C enum declaration.
+    """
+
+    name: str | None
+    values: list[CEnumeratorDescriptor]
+
+
+CDeclDescriptor = CStructDescriptor | CEnumDescriptor | CEnumeratorDescriptor
+"""
+Compact description of the C declaration that produced a Swift declaration,
+holding only what stages past declaration generation need, so the C syntax
+tree can be released once Swift declarations are generated.
+"""
+
+
+def describe_c_node(node: "c_ast.Node") -> CDeclDescriptor | None:
+    "Returns a compact description of a C struct, enum or enumerator node."
+    from pycparser import c_ast
+
+    match node:
+        case c_ast.Struct():
+            return describe_struct(node)
+        case c_ast.Enum():
+            return describe_enum(node)
+        case c_ast.Enumerator():
+            return describe_enumerator(node)
+
+    return None
+
+
+def describe_struct(node: "c_ast.Struct") -> CStructDescriptor:
+    fields = None if node.decls is None else list(map(describe_field, node.decls))
+
+    return CStructDescriptor(node.name, fields)
+
+
+def describe_enum(node: "c_ast.Enum") -> CEnumDescriptor:
+    values = []
+    if node.values is not None:
+        values = list(map(describe_enumerator, node.values.enumerators))
+
+    return CEnumDescriptor(node.name, values)
+
+
+def describe_enumerator(node: "c_ast.Enumerator") -> CEnumeratorDescriptor:
+    value = None if node.value is None else _c_source(node.value)
+
+    return CEnumeratorDescriptor(node.name, value)
+
+
+def describe_field(node: "c_ast.Decl") -> CFieldDescriptor:
+    from pycparser import c_ast
+
+    match node.type:
+        case c_ast.Struct():
+            fields = [] if node.type.decls is None else list(map(describe_field, node.type.decls))
+            return CFieldDescriptor(node.name, CFieldKind.STRUCT, fields=fields)
+
+        case c_ast.Union():
+            fields = [] if node.type.decls is None else list(map(describe_field, node.type.decls))
+            return CFieldDescriptor(node.name, CFieldKind.UNION, fields=fields)
+
+        case c_ast.ArrayDecl():
+            dim = node.type.dim
+            return CFieldDescriptor(
+                node.name,
+                CFieldKind.ARRAY,
+                array_size=_constant_int(dim),
+                array_size_text=None if dim is None else _c_source(dim),
+            )
+
+    return CFieldDescriptor(node.name, CFieldKind.SCALAR)
+
+
+def _c_source(node: "c_ast.Node") -> str:
+    from pycparser import c_generator
+
+    # Generators keep indentation state, so they are not shared between calls
+    return c_generator.CGenerator().visit(node)
+
+
+def _constant_int(node: "c_ast.Node | None") -> int | None:
+    from pycparser import c_ast
+
+    if not isinstance(node, c_ast.Constant):
+        return None
+
+    text = node.value.rstrip("uUlL")
+    try:
+        # Octal literals have a leading zero, which `int()` does not accept
+        if len(text) > 1 and text.startswith("0") and text.isdigit():
+            return int(text, 8)
+
+        return int(text, 0)
+    except ValueError:
+        return None
+
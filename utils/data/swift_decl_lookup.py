@@ -36,9 +36,17 @@ class SwiftDeclLookup:
 
     _cached_results: dict[str, str]
 
+    recorded_lookups: dict[str, str | None] | None
+    """
+    If not None, the result of every lookup is recorded here, keyed by the
+    lowercased C symbol name, so callers can tell which symbols the output of
+    an operation depended on.
+    """
+
     def __init__(self, decls: list[SwiftDecl]):
         self.decls = decls
         self._cached_results = dict()
+        self.recorded_lookups = None
 
         visitor = _PreCachingVisitor()
         walker = SwiftDeclWalker(visitor)
@@ -62,4 +70,22 @@ class SwiftDeclLookup:
         ```
         """
 
-        return self._cached_results.get(c_symbol.lower())
+        key = c_symbol.lower()
+        result = self._cached_results.get(key)
+
+        if self.recorded_lookups is not None:
+            self.recorded_lookups[key] = result
+
+        return result
+
+    def resolves_to(self, lookups: dict[str, str | None]) -> bool:
+        """
+        Returns True if every C symbol in a dictionary of recorded lookups
+        still resolves to the same Swift name.
+        """
+
+        for (key, result) in lookups.items():
+            if self._cached_results.get(key) != result:
+                return False
+
+        return True
@@ -3,10 +3,10 @@ from enum import Enum
 from typing import List
 from pathlib import Path
 
-from pycparser import c_ast
 from utils.converters.syntax_stream import SyntaxStream
 from utils.data.compound_symbol_name import CompoundSymbolName
 from utils.converters.backticked_term import backticked_term
+from utils.data.c_decl_descriptors import CDeclDescriptor
 from utils.data.swift_decl_visit_result import SwiftDeclVisitResult
 from utils.data.swift_decl_visitor import SwiftDeclVisitor
 from utils.doccomment.doccomment_block import DoccommentBlock
@@ -41,10 +41,10 @@ class SwiftDecl(object):
     original_name: CompoundSymbolName | None
     origin: SourceLocation | None
 
-    original_node: c_ast.Node | None
+    original_descriptor: CDeclDescriptor | None
     """
-    Original node that produced this declaration. Is None if this declaration
-    is synthesized instead.
+    Compact description of the original C node that produced this declaration.
+    Is None if this declaration is synthesized instead.
     """
 
     c_kind: CDeclKind
@@ -125,7 +125,7 @@ class SwiftMemberVarDecl(SwiftMemberDecl):
         return SwiftMemberVarDecl(
             name=self.name.copy(),
             original_name=self.original_name.copy(),
-            original_node=self.original_node,
+            original_descriptor=self.original_descriptor,
             origin=self.origin,
             c_kind=self.c_kind,
             doccomment=self.doccomment,
@@ -203,7 +203,7 @@ class SwiftMemberFunctionDecl(SwiftMemberDecl):
         return SwiftMemberFunctionDecl(
             name=self.name.copy(),
             original_name=self.original_name.copy(),
-            original_node=self.original_node,
+            original_descriptor=self.original_descriptor,
             origin=self.origin,
             c_kind=self.c_kind,
             doccomment=self.doccomment,
@@ -265,7 +265,7 @@ class SwiftExtensionDecl(SwiftDecl):
             name=self.name.copy(),
             original_name=self.original_name.copy(),
             origin=self.origin,
-            original_node=self.original_node,
+            original_descriptor=self.original_descriptor,
             c_kind=self.c_kind,
             doccomment=self.doccomment,
             members=list(map(lambda c: c.copy(), self.members)),
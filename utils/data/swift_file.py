@@ -3,6 +3,7 @@ from pathlib import Path
 
 from utils.converters.syntax_stream import SyntaxStream
 from utils.data.swift_decls import SwiftDecl
+from utils.profiling.pipeline_hooks import span
 
 
 @dataclass
@@ -22,16 +23,29 @@ class SwiftFile:
     def add_decl(self, decl: SwiftDecl):
         self.decls.append(decl)
 
-    def write(self, stream: SyntaxStream):
-        # Write required boilerplate
-        for line in self.header_lines:
-            stream.line(line)
-
-        if len(self.includes) > 0:
-            stream.line()
-            for include in self.includes:
-                stream.line(f"import {include}")
-
-        for decl in self.decls:
-            stream.line()
-            decl.write(stream)
+    def write(self, stream: SyntaxStream, rendered_decls: dict[str, str] | None = None):
+        """
+        Writes this file to a stream. Declarations whose name is a key of
+        `rendered_decls` are written from that pre-rendered text instead of
+        being rendered again.
+        """
+        with span("SwiftFile.write", "file", path=self.path.name, decls=len(self.decls)):
+            # Write required boilerplate
+            for line in self.header_lines:
+                stream.line(line)
+
+            if len(self.includes) > 0:
+                stream.line()
+                for include in self.includes:
+                    stream.line(f"import {include}")
+
+            for decl in self.decls:
+                stream.line()
+
+                if rendered_decls is not None:
+                    rendered = rendered_decls.get(decl.name.to_string())
+                    if rendered is not None:
+                        stream.write(rendered)
+                        continue
+
+                decl.write(stream)
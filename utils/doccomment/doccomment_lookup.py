@@ -1,11 +1,12 @@
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Sequence
+from typing import Iterable, Sequence
 from utils.data.swift_decl_visitor import SwiftDeclVisitor
 
 from utils.data.swift_decls import SwiftDecl, SwiftDeclWalker
 from utils.doccomment.doccomment_block import DoccommentBlock
+from utils.profiling.pipeline_hooks import span
 
 
 def _split_doccomment_lines(path: Path, text_file: str, doccomment_patterns: list[str]) -> list[DoccommentBlock]:
@@ -133,6 +134,25 @@ class DoccommentLookup:
             "/**",
         ]
     
+    def reuse_caches(self, other: "DoccommentLookup", stale_files: Iterable[Path] = ()):
+        """
+        Reuses the file contents and doc comments cached by another lookup,
+        except for those of files in `stale_files`. Doc comments are only
+        reused if both lookups recognize the same doc comment patterns.
+        """
+        stale = set(map(lambda p: p.resolve(), stale_files))
+
+        for (file_path, lines) in other.cached_files.items():
+            if file_path.resolve() not in stale:
+                self.cached_files.setdefault(file_path, lines)
+
+        if other.doccomment_patterns != self.doccomment_patterns:
+            return
+
+        for (file_path, comments) in other.cached_comments.items():
+            if file_path.resolve() not in stale:
+                self.cached_comments.setdefault(file_path, comments)
+
     def contents_for_file(self, file_path: Path) -> list[str] | None:
         cached = self.cached_files.get(file_path)
         if cached is not None:
@@ -170,8 +190,12 @@ class DoccommentLookup:
         return None
 
     def find_doccomment(self, decl: SwiftDecl) -> DoccommentBlock | None:
+        with span("DoccommentLookup.find_doccomment", "doccomment", decl=decl.name.to_string):
+            return self._find_doccomment(decl)
+
+    def _find_doccomment(self, decl: SwiftDecl) -> DoccommentBlock | None:
         # The original node is required for this lookup.
-        if decl.original_node is None or decl.origin is None:
+        if decl.original_descriptor is None or decl.origin is None:
             return None
 
         decl_file_path = decl.origin.file
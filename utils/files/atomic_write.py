@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+from pathlib import Path
+
+# Read the process' umask once, so atomically-written files get the same
+# permissions a plain open() would have given them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_bytes_atomic(path: Path, data: bytes):
+    """
+    Writes `data` to `path` by first writing to a temporary file in the same
+    directory and then renaming it over the destination, so readers never
+    observe a partially-written file.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    (fd, temp_path) = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=path.parent
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+
+        os.chmod(temp_path, 0o666 & ~_UMASK)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+
+        raise
+
+
+def write_text_atomic(path: Path, text: str, encoding: str = "utf-8"):
+    "Writes `text` to `path` atomically. See `write_bytes_atomic`."
+
+    write_bytes_atomic(path, text.encode(encoding))
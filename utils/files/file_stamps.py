@@ -0,0 +1,23 @@
+from pathlib import Path
+from typing import Iterable
+
+FileStamp = tuple[int, int]
+"Modification time, in nanoseconds, and size of a file."
+
+
+def stamp_files(files: Iterable[Path]) -> dict[Path, FileStamp | None]:
+    """
+    Returns the stamp of each of a list of files, or None for files that do
+    not exist or cannot be accessed. Comparing stamps is a cheap way to detect
+    files that changed on disk.
+    """
+    result: dict[Path, FileStamp | None] = dict()
+
+    for path in files:
+        try:
+            stat = path.stat()
+            result[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            result[path] = None
+
+    return result
@@ -0,0 +1,273 @@
+import dataclasses
+import io
+import os
+import subprocess
+import time
+import traceback
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from utils.cli.console_color import ConsoleColor
+from utils.cache.preprocessor_cache import PreprocessorCache
+from utils.cli.reporter import ConsoleReporter, reporting
+from utils.generator.type_generator import (
+    TypeGeneratorRequest,
+    generate_types,
+    run_c_preprocessor,
+)
+from utils.preprocessor.umbrella_header import write_umbrella_header
+from utils.profiling.stage_profiler import StageProfiler, StageTiming
+
+
+@dataclass
+class BatchTarget:
+    """
+    A header file to generate Swift types for as part of a batch.
+    """
+
+    header_file: Path
+    "Header file to preprocess and parse."
+
+    destination: Path
+    "Folder to write the generated files to."
+
+    slice_allowlist: list[Path] | None = None
+    """
+    Files and folders whose declarations are generated. Defaults to the header
+    file itself.
+    """
+
+
+@dataclass
+class BatchTargetResult:
+    """
+    Outcome of generating a single target of a batch.
+    """
+
+    target: BatchTarget
+
+    exit_code: int
+    "Value returned by `generate_types`, or 1 if generation raised an error."
+
+    wall_time: float
+    "Time spent generating the target, in seconds."
+
+    output: str
+    "Console output printed while generating the target."
+
+    error: str | None = None
+    "Formatted traceback of the error raised during generation, if any."
+
+    stages: list[StageTiming] = field(default_factory=list)
+    "Timings of the pipeline stages that ran for the target."
+
+    def file_count(self) -> int | None:
+        "Returns the number of files generated for the target, if any were."
+        for stage in reversed(self.stages):
+            if stage.file_count is not None:
+                return stage.file_count
+
+        return None
+
+
+BatchRequestFactory = Callable[[BatchTarget], TypeGeneratorRequest]
+"""
+Creates the generator request for a target of a batch. Must be picklable, e.g.
+a module-level function or a `functools.partial` of one, so it can be sent to
+worker processes.
+"""
+
+
+def preprocess_batch(
+    targets: list[BatchTarget], folder: Path, cache: PreprocessorCache | None = None
+) -> bytes:
+    """
+    Preprocesses the header files of every target of a batch with a single
+    invocation of the C preprocessor, through an umbrella header written to
+    `folder` that includes each of them, and returns the preprocessed output.
+
+    Includes shared by the targets are expanded once. The output is split
+    back into targets by `generate_batch`, which slices it with each target's
+    allowlist along the `#line` directives of the preprocessor. Since targets
+    share a translation unit, macros defined by a header are visible to the
+    headers of later targets, and headers already included by an earlier
+    target are not expanded again.
+
+    Raises `subprocess.CalledProcessError` if the preprocessor fails, e.g.
+    because headers of different targets conflict.
+    """
+
+    umbrella_path = write_umbrella_header([t.header_file for t in targets], folder)
+
+    return run_c_preprocessor(umbrella_path, cache)
+
+
+def generate_batch(
+    targets: list[BatchTarget],
+    request_factory: BatchRequestFactory,
+    jobs: int,
+    preprocessed_output: bytes | None = None,
+) -> list[BatchTargetResult]:
+    """
+    Generates Swift types for several targets, preprocessing, parsing and
+    generating each one in a pool of `jobs` worker processes. Returns one
+    result per target, in the order of `targets`.
+
+    If `preprocessed_output` is provided, e.g. by `preprocess_batch`, targets
+    parse their slice of it instead of preprocessing their header files.
+    Otherwise, header files shared by several targets, e.g. an umbrella header
+    whose targets generate declarations of different files, are preprocessed
+    once before the pool starts, and their output is passed to every target
+    that uses them.
+
+    Targets should share a cache folder so that caches of their common
+    includes are shared between workers and across runs; cache entries are
+    written atomically, so concurrent workers do not corrupt each other's
+    entries.
+    """
+
+    outputs: list[bytes | None]
+    if preprocessed_output is not None:
+        outputs = [preprocessed_output] * len(targets)
+    else:
+        shared = _preprocess_shared_headers(targets, request_factory)
+        outputs = [shared.get(_header_key(t.header_file)) for t in targets]
+
+    is_shared_unit = preprocessed_output is not None
+
+    if jobs <= 1 or len(targets) <= 1:
+        return [
+            _generate_target(request_factory, target, output, is_shared_unit)
+            for (target, output) in zip(targets, outputs)
+        ]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(targets))) as executor:
+        futures = [
+            executor.submit(_generate_target, request_factory, target, output, is_shared_unit)
+            for (target, output) in zip(targets, outputs)
+        ]
+
+        return [future.result() for future in futures]
+
+
+def print_batch_results(results: list[BatchTargetResult], verbose: bool = False):
+    """
+    Prints a summary line per target of a batch. The console output of failed
+    targets, or of every target if `verbose` is True, is printed as well.
+    """
+
+    for result in results:
+        if verbose or result.exit_code != 0:
+            print(result.output, end="")
+        if result.error is not None:
+            print(result.error, end="")
+
+    print(ConsoleColor.YELLOW("Batch results:"))
+
+    for result in results:
+        status = (
+            ConsoleColor.GREEN("ok")
+            if result.exit_code == 0
+            else ConsoleColor.RED("failed")
+        )
+        file_count = result.file_count()
+        files = "up to date" if file_count is None else f"{file_count} file(s)"
+
+        print(
+            f"  {status} {ConsoleColor.MAGENTA(result.target.header_file)} -> "
+            f"{ConsoleColor.MAGENTA(result.target.destination)}: "
+            f"{files} in {result.wall_time * 1000:.0f} ms"
+        )
+
+
+def _header_key(header_file: Path) -> str:
+    return os.path.abspath(header_file)
+
+
+def _preprocess_shared_headers(
+    targets: list[BatchTarget], request_factory: BatchRequestFactory
+) -> dict[str, bytes]:
+    """
+    Preprocesses the header files that more than one target of a batch uses,
+    returning their output keyed by `_header_key`. Headers that fail to
+    preprocess are left out, so their targets report the error themselves.
+    """
+
+    targets_by_header: dict[str, list[BatchTarget]] = dict()
+    for target in targets:
+        targets_by_header.setdefault(_header_key(target.header_file), []).append(target)
+
+    result: dict[str, bytes] = dict()
+    for (key, header_targets) in targets_by_header.items():
+        if len(header_targets) < 2:
+            continue
+
+        request = request_factory(header_targets[0])
+        cache = (
+            PreprocessorCache(request.cache_folder)
+            if request.cache_folder is not None
+            else None
+        )
+
+        try:
+            result[key] = run_c_preprocessor(request.header_file, cache)
+        except subprocess.CalledProcessError:
+            continue
+
+    return result
+
+
+def _generate_target(
+    request_factory: BatchRequestFactory,
+    target: BatchTarget,
+    preprocessed_output: bytes | None,
+    is_shared_unit: bool,
+) -> BatchTargetResult:
+    output = io.StringIO()
+    profiler = StageProfiler()
+    start = time.perf_counter()
+
+    exit_code = 1
+    error: str | None = None
+
+    # Reporters are scoped to the current context, so targets generated
+    # in-process do not interleave their output
+    with reporting(ConsoleReporter(output)):
+        try:
+            request = request_factory(target)
+            if preprocessed_output is not None:
+                request = dataclasses.replace(request, preprocessed_output=preprocessed_output)
+
+            if is_shared_unit:
+                # The shared output holds the declarations of every target;
+                # the allowlist slices this target's declarations out of it
+                request = dataclasses.replace(
+                    request,
+                    slice_allowlist=(
+                        request.slice_allowlist
+                        or target.slice_allowlist
+                        or [target.header_file]
+                    ),
+                )
+
+            if request.profiler is not None:
+                profiler = request.profiler
+            else:
+                request = dataclasses.replace(request, profiler=profiler)
+
+            exit_code = generate_types(request)
+        except Exception:
+            error = traceback.format_exc()
+
+    return BatchTargetResult(
+        target=target,
+        exit_code=exit_code,
+        wall_time=time.perf_counter() - start,
+        output=output.getvalue(),
+        error=error,
+        stages=profiler.stages,
+    )
@@ -0,0 +1,147 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from pycparser import c_ast, c_parser
+
+from utils.cli.reporter import current_reporter
+from utils.collection.collection_utils import flatten
+from utils.preprocessor.line_markers import line_directive
+from utils.preprocessor.top_level_decls import TopLevelDecl, split_top_level_decls
+
+MIN_CHUNK_SIZE = 64 * 1024
+"""
+Minimum size, in characters, of a chunk of a translation unit. Smaller inputs
+are not worth the overhead of spawning worker processes.
+"""
+
+CHUNKS_PER_JOB = 4
+"Number of chunks to split the translation unit in per worker process."
+
+STREAM_CHUNK_SIZE = 256 * 1024
+"Approximate size, in characters, of the chunks parsed by `iter_parse_chunks`."
+
+ParseChunk = tuple[str, str, int]
+"A chunk of a translation unit to parse, as (source, file name, prelude length)."
+
+_worker_parser: c_parser.CParser | None = None
+"Parser instance reused across chunks parsed by a worker process."
+
+
+def _parse_chunk(chunk: ParseChunk) -> list[c_ast.Node]:
+    global _worker_parser
+
+    if _worker_parser is None:
+        _worker_parser = c_parser.CParser()
+
+    (source, filename, prelude_length) = chunk
+    ast = _worker_parser.parse(source, filename)
+
+    # Drop the typedef prelude
+    return ast.ext[prelude_length:]
+
+
+def plan_chunks(
+    text: str, filename: str, decls: list[TopLevelDecl], chunk_count: int
+) -> list[ParseChunk]:
+    """
+    Groups a list of top-level declarations of a translation unit into at most
+    `chunk_count` contiguous chunks of roughly equal size that can be parsed
+    independently.
+
+    Each chunk is prefixed with a prelude that declares every typedef name
+    introduced by preceding chunks, so the parser can tell type names apart
+    from identifiers, followed by a `#line` directive and indentation that
+    restore the original coordinates of the chunk's first declaration.
+    """
+    if len(decls) == 0:
+        return []
+
+    target_size = max(1, len(text) // chunk_count)
+
+    result: list[ParseChunk] = []
+    typedef_names: list[str] = []
+
+    chunk_start = 0
+    for (index, decl) in enumerate(decls):
+        is_last = index == len(decls) - 1
+        first = decls[chunk_start]
+
+        if not is_last and decl.end - first.start < target_size:
+            continue
+
+        prelude = "".join(map(lambda name: f"typedef int {name};\n", typedef_names))
+        source = (
+            prelude
+            + line_directive(first.file, first.line)
+            + " " * first.column
+            + text[first.start : decl.end]
+        )
+        result.append((source, filename, len(typedef_names)))
+
+        for chunk_decl in decls[chunk_start : index + 1]:
+            typedef_names.extend(chunk_decl.typedef_names)
+
+        chunk_start = index + 1
+
+    return result
+
+
+def parse_chunked(text: str, filename: str, jobs: int) -> c_ast.FileAST:
+    """
+    Parses a preprocessed translation unit by splitting it at top-level
+    declaration boundaries and parsing the resulting chunks in a pool of
+    `jobs` worker processes.
+
+    Falls back to parsing the whole translation unit in-process if the input is
+    too small to benefit from parallelism, or if any chunk fails to parse on
+    its own.
+    """
+    chunk_count = min(jobs * CHUNKS_PER_JOB, len(text) // MIN_CHUNK_SIZE)
+
+    if jobs > 1 and chunk_count > 1:
+        chunks = plan_chunks(text, filename, split_top_level_decls(text), chunk_count)
+
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                ext = flatten(executor.map(_parse_chunk, chunks))
+
+            return c_ast.FileAST(ext)
+        except c_parser.ParseError as error:
+            current_reporter().warning(
+                f"Warning: Chunked parsing failed ({error}), falling back to sequential parsing."
+            )
+
+    return c_parser.CParser().parse(text, filename)
+
+
+def iter_parse_chunks(
+    text: str, filename: str, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[list[c_ast.Node]]:
+    """
+    Parses a preprocessed translation unit in-process, one chunk of top-level
+    declarations at a time, yielding the top-level nodes of each chunk in
+    order. As long as callers drop each list of nodes once consumed, only the
+    syntax tree of a single chunk is alive at a time.
+
+    If a chunk fails to parse on its own, the whole translation unit is parsed
+    instead, and the nodes that were not yielded yet are yielded at once.
+    """
+    chunk_count = max(1, len(text) // chunk_size)
+    chunks = plan_chunks(text, filename, split_top_level_decls(text), chunk_count)
+
+    yielded_count = 0
+    for chunk in chunks:
+        try:
+            nodes = _parse_chunk(chunk)
+        except c_parser.ParseError as error:
+            current_reporter().warning(
+                f"Warning: Chunked parsing failed ({error}), falling back to sequential parsing."
+            )
+
+            ast = c_parser.CParser().parse(text, filename)
+            yield ast.ext[yielded_count:]
+            return
+
+        yielded_count += len(nodes)
+        yield nodes
+
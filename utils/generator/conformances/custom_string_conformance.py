@@ -6,7 +6,7 @@ from utils.data.swift_decls import (
     SwiftMemberVarDecl,
 )
 from utils.generator.swift_conformance_generator import SwiftConformanceGenerator
-from pycparser import c_ast
+from utils.data.c_decl_descriptors import CDeclDescriptor, CStructDescriptor
 
 
 class SwiftCustomStringConvertibleConformance(SwiftConformanceGenerator):
@@ -39,36 +39,36 @@ class SwiftCustomStringConvertibleConformance(SwiftConformanceGenerator):
         self.protocol_name = "CustomStringConvertible"
 
     def generate_members(
-        self, decl: SwiftExtensionDecl, node: c_ast.Node
+        self, decl: SwiftExtensionDecl, descriptor: CDeclDescriptor
     ) -> list[SwiftMemberDecl]:
 
-        if not isinstance(node, c_ast.Struct):
+        if not isinstance(descriptor, CStructDescriptor):
             return []
 
         accessor: list[str] = list()
 
         fields: str = ""
-        if node.decls is not None:
+        if descriptor.fields is not None:
             fields = ", ".join(
                 # Add interpolation for field
                 map(
                     lambda field: f"{field}: \\({field})",
                     self.iterate_field_names(
-                        node.name,
-                        node.decls,
+                        descriptor.name,
+                        descriptor.fields,
                         ignore_non_constant_tuples=True,
                     ),
                 )
             )
 
-        accessor = [f'"{node.name}({fields})"']
+        accessor = [f'"{descriptor.name}({fields})"']
 
         return [
             SwiftMemberVarDecl(
                 name=CompoundSymbolName.from_string_list("description"),
                 original_name=None,
                 origin=None,
-                original_node=None,
+                original_descriptor=None,
                 c_kind=CDeclKind.NONE,
                 doccomment=None,
                 is_static=False,
@@ -6,7 +6,7 @@ from utils.data.swift_decls import (
     SwiftMemberFunctionDecl,
 )
 from utils.generator.swift_conformance_generator import SwiftConformanceGenerator
-from pycparser import c_ast
+from utils.data.c_decl_descriptors import CDeclDescriptor, CStructDescriptor
 
 
 class SwiftEquatableConformance(SwiftConformanceGenerator):
@@ -39,23 +39,23 @@ class SwiftEquatableConformance(SwiftConformanceGenerator):
         self.protocol_name = "Equatable"
 
     def generate_members(
-        self, decl: SwiftExtensionDecl, node: c_ast.Node
+        self, decl: SwiftExtensionDecl, descriptor: CDeclDescriptor
     ) -> list[SwiftMemberDecl]:
 
-        if not isinstance(node, c_ast.Struct):
+        if not isinstance(descriptor, CStructDescriptor):
             return []
 
         body: list[str] = list()
 
         field_comparisons: list[str] = list()
-        if node.decls is not None:
+        if descriptor.fields is not None:
             field_comparisons = list(
                 # Create equality expression for field
                 map(
                     lambda field: f"lhs.{field} == rhs.{field}",
                     self.iterate_field_names(
-                        node.name,
-                        node.decls,
+                        descriptor.name,
+                        descriptor.fields,
                         ignore_non_constant_tuples=True,
                         max_tuple_length=8,
                     ),
@@ -74,7 +74,7 @@ class SwiftEquatableConformance(SwiftConformanceGenerator):
                 ),
                 original_name=None,
                 origin=None,
-                original_node=None,
+                original_descriptor=None,
                 c_kind=CDeclKind.NONE,
                 doccomment=None,
                 is_static=True,
@@ -6,7 +6,7 @@ from utils.data.swift_decls import (
     SwiftMemberFunctionDecl,
 )
 from utils.generator.swift_conformance_generator import SwiftConformanceGenerator
-from pycparser import c_ast
+from utils.data.c_decl_descriptors import CDeclDescriptor, CStructDescriptor
 
 
 class SwiftHashableConformance(SwiftConformanceGenerator):
@@ -40,21 +40,21 @@ class SwiftHashableConformance(SwiftConformanceGenerator):
         self.protocol_name = "Hashable"
 
     def generate_members(
-        self, decl: SwiftExtensionDecl, node: c_ast.Node
+        self, decl: SwiftExtensionDecl, descriptor: CDeclDescriptor
     ) -> list[SwiftMemberDecl]:
 
-        if not isinstance(node, c_ast.Struct):
+        if not isinstance(descriptor, CStructDescriptor):
             return []
 
         body: list[str] = list()
 
         hash_combines: list[str] = list()
-        if node.decls is not None:
+        if descriptor.fields is not None:
             hash_combines = list(
                 # Create combine calls for field
                 map(
                     lambda field: f"hasher.combine({field})",
-                    self.iterate_field_names(node.name, node.decls, max_tuple_length=0),
+                    self.iterate_field_names(descriptor.name, descriptor.fields, max_tuple_length=0),
                 )
             )
 
@@ -68,7 +68,7 @@ class SwiftHashableConformance(SwiftConformanceGenerator):
                 CompoundSymbolName.from_string_list("hash"),
                 original_name=None,
                 origin=None,
-                original_node=None,
+                original_descriptor=None,
                 c_kind=CDeclKind.NONE,
                 doccomment=None,
                 arguments=[
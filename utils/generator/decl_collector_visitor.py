@@ -0,0 +1,29 @@
+from pycparser import c_ast
+
+
+# noinspection PyPep8Naming
+class DeclCollectorVisitor(c_ast.NodeVisitor):
+    decls: list[c_ast.Node]
+
+    def __init__(self, prefixes: list[str]):
+        self.prefixes = prefixes
+        self.decls = []
+
+    def should_include(self, decl_name: str) -> bool:
+        for prefix in self.prefixes:
+            if decl_name.startswith(prefix):
+                return True
+
+        return False
+    
+    def visit_Typedef(self, node: c_ast.Typedef):
+        if node.name is not None and self.should_include(node.name):
+            self.decls.append(node)
+
+    def visit_Struct(self, node: c_ast.Struct):
+        if node.name is not None and self.should_include(node.name):
+            self.decls.append(node)
+
+    def visit_Enum(self, node: c_ast.Enum):
+        if node.name is not None and self.should_include(node.name):
+            self.decls.append(node)
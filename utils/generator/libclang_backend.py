@@ -0,0 +1,372 @@
+import functools
+import os
+import shutil
+import subprocess
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from utils.generator.type_generator import (
+    CollectedCDecls,
+    ParserBackend,
+    ParserBackendError,
+    TypeGeneratorRequest,
+)
+from utils.paths import paths
+from utils.preprocessor.header_slicer import HeaderSlicer
+from utils.profiling.stage_profiler import StageProfiler
+
+# libclang is an optional dependency, and both it and pycparser are only
+# imported once headers are parsed
+if TYPE_CHECKING:
+    from clang import cindex
+    from pycparser import c_ast
+
+
+class LibclangBackend(ParserBackend):
+    """
+    Parses header files with libclang, through the `clang.cindex` bindings of
+    the optional `libclang` package, and converts the enum, struct and typedef
+    declarations it finds into the pycparser nodes that the pycparser backend
+    produces for them.
+
+    Headers are parsed directly instead of going through the preprocessor, so
+    no .i file is produced and the AST cache does not apply. The conversion
+    covers what `SwiftDeclGenerator` consumes: typedefs of enums and structs,
+    and standalone enum and struct declarations. Enumerator values are
+    converted to their evaluated constants, and struct fields to scalars,
+    arrays with their evaluated sizes, and anonymous struct and union members.
+    """
+
+    name = "libclang"
+
+    args: list[str]
+    "Extra command line arguments passed to libclang, e.g. include paths."
+
+    def __init__(self, args: list[str] | None = None):
+        self.args = list(args) if args is not None else []
+
+    def is_available(self) -> bool:
+        try:
+            from clang import cindex
+        except ImportError:
+            return False
+
+        try:
+            # Loads the shared library
+            cindex.conf.lib
+        except cindex.LibclangError:
+            return False
+
+        return True
+
+    def compiler_args(self) -> list[str]:
+        "Returns the command line arguments headers are parsed with."
+        return ["-std=c99", *_resource_dir_args(), *self.args]
+
+    def collect_c_decls(self, request: TypeGeneratorRequest, profiler: StageProfiler) -> CollectedCDecls:
+        from clang import cindex
+
+        # Parsed from an absolute path, so file names in coordinates match the
+        # ones the pycparser backend reports
+        header_path = os.path.abspath(request.header_file)
+
+        with profiler.stage("Parsing header file with libclang...") as stage:
+            try:
+                tu = cindex.Index.create().parse(header_path, args=self.compiler_args())
+            except cindex.TranslationUnitLoadError as error:
+                raise ParserBackendError(str(error)) from error
+
+            errors = [
+                d for d in tu.diagnostics if d.severity >= cindex.Diagnostic.Error
+            ]
+            if len(errors) > 0:
+                raise ParserBackendError(_format_diagnostic(errors[0]))
+
+            cursors = list(tu.cursor.get_children())
+            stage.decl_count = len(cursors)
+
+        with profiler.stage("Collecting C declarations...") as stage:
+            slicer = (
+                HeaderSlicer(request.slice_allowlist, paths.SCRIPTS_ROOT_PATH)
+                if request.slice_allowlist is not None
+                else None
+            )
+            converter = _CursorConverter(request.prefixes, slicer)
+            c_decls = converter.convert(cursors)
+
+            stage.decl_count = len(c_decls)
+
+        included_files = [Path(header_path)]
+        for include in tu.get_includes():
+            path = Path(include.include.name)
+            if path not in included_files:
+                included_files.append(path)
+
+        return CollectedCDecls(c_decls, included_files=included_files)
+
+
+class _CursorConverter:
+    """
+    Converts top-level libclang cursors into the pycparser nodes that
+    `DeclCollectorVisitor` collects from the equivalent pycparser AST.
+    """
+
+    prefixes: list[str]
+    slicer: HeaderSlicer | None
+
+    def __init__(self, prefixes: list[str], slicer: HeaderSlicer | None):
+        self.prefixes = prefixes
+        self.slicer = slicer
+
+    def should_include(self, cursor: "cindex.Cursor") -> bool:
+        if self.slicer is not None:
+            file = cursor.location.file
+            if file is None or not self.slicer.is_allowed_file(file.name):
+                return False
+
+        return any(cursor.spelling.startswith(prefix) for prefix in self.prefixes)
+
+    def convert(self, cursors: "list[cindex.Cursor]") -> "list[c_ast.Node]":
+        from clang.cindex import CursorKind
+
+        # Like pycparser, tag types defined inside a typedef are part of the
+        # typedef instead of standalone declarations
+        inline_tags = set()
+        for cursor in cursors:
+            if cursor.kind == CursorKind.TYPEDEF_DECL:
+                tag = _typedef_tag(cursor)
+                if tag is not None and _is_within(tag, cursor):
+                    inline_tags.add(_location_key(tag))
+
+        result: "list[c_ast.Node]" = []
+        for cursor in cursors:
+            if not self.should_include(cursor):
+                continue
+
+            match cursor.kind:
+                case CursorKind.TYPEDEF_DECL:
+                    node = self.convert_typedef(cursor)
+
+                case CursorKind.ENUM_DECL | CursorKind.STRUCT_DECL:
+                    if _is_anonymous(cursor) or _location_key(cursor) in inline_tags:
+                        continue
+
+                    node = self.convert_tag(cursor, include_body=True)
+
+                case _:
+                    node = None
+
+            if node is not None:
+                result.append(node)
+
+        return result
+
+    def convert_typedef(self, cursor: "cindex.Cursor") -> "c_ast.Typedef | None":
+        from pycparser import c_ast
+
+        tag = _typedef_tag(cursor)
+        if tag is None:
+            return None
+
+        coord = _coord(cursor.location)
+        tag_node = self.convert_tag(tag, include_body=_is_within(tag, cursor))
+
+        return c_ast.Typedef(
+            cursor.spelling,
+            [],
+            ["typedef"],
+            c_ast.TypeDecl(cursor.spelling, [], None, tag_node, coord),
+            coord,
+        )
+
+    def convert_tag(self, cursor: "cindex.Cursor", include_body: bool) -> "c_ast.Node":
+        "Converts an enum, struct or union declaration."
+        from clang.cindex import CursorKind
+        from pycparser import c_ast
+
+        name = None if _is_anonymous(cursor) else cursor.spelling
+        coord = _coord(cursor.extent.start)
+        has_body = include_body and cursor.is_definition()
+
+        match cursor.kind:
+            case CursorKind.ENUM_DECL:
+                values = None
+                if has_body:
+                    values = c_ast.EnumeratorList(
+                        [
+                            self.convert_enumerator(child)
+                            for child in cursor.get_children()
+                            if child.kind == CursorKind.ENUM_CONSTANT_DECL
+                        ],
+                        coord,
+                    )
+
+                return c_ast.Enum(name, values, coord)
+
+            case CursorKind.UNION_DECL:
+                decls = list(map(self.convert_field, cursor.type.get_fields())) if has_body else None
+                return c_ast.Union(name, decls, coord)
+
+            case _:
+                decls = list(map(self.convert_field, cursor.type.get_fields())) if has_body else None
+                return c_ast.Struct(name, decls, coord)
+
+    def convert_enumerator(self, cursor: "cindex.Cursor") -> "c_ast.Enumerator":
+        from pycparser import c_ast
+
+        coord = _coord(cursor.location)
+
+        # Enumerators with an explicit value have their initializer as a child
+        value = None
+        if any(True for _ in cursor.get_children()):
+            value = c_ast.Constant("int", str(cursor.enum_value), coord)
+
+        return c_ast.Enumerator(cursor.spelling, value, coord)
+
+    def convert_field(self, cursor: "cindex.Cursor") -> "c_ast.Decl":
+        from clang.cindex import CursorKind
+        from pycparser import c_ast
+
+        coord = _coord(cursor.location)
+
+        bitsize = None
+        if cursor.is_bitfield():
+            bitsize = c_ast.Constant("int", str(cursor.get_bitfield_width()), coord)
+
+        # Anonymous struct and union members are implicit fields located at
+        # their record's declaration
+        record = cursor.type.get_declaration()
+        if (
+            record.kind in (CursorKind.STRUCT_DECL, CursorKind.UNION_DECL)
+            and _location_key(record) == _location_key(cursor)
+        ):
+            tag_node = self.convert_tag(record, include_body=True)
+            return c_ast.Decl(None, [], [], [], [], tag_node, None, bitsize, coord)
+
+        return c_ast.Decl(
+            cursor.spelling,
+            [],
+            [],
+            [],
+            [],
+            _declarator(cursor.spelling, cursor.type, coord),
+            None,
+            bitsize,
+            coord,
+        )
+
+
+def _declarator(name: str, field_type: "cindex.Type", coord) -> "c_ast.Node":
+    """
+    Returns the declarator of a field: an array declarator for array types, or
+    a type declaration that names the type otherwise.
+    """
+    from clang.cindex import TypeKind
+    from pycparser import c_ast
+
+    match field_type.kind:
+        case TypeKind.CONSTANTARRAY:
+            return c_ast.ArrayDecl(
+                _declarator(name, field_type.element_type, coord),
+                c_ast.Constant("int", str(field_type.element_count), coord),
+                [],
+                coord,
+            )
+
+        case TypeKind.INCOMPLETEARRAY:
+            return c_ast.ArrayDecl(
+                _declarator(name, field_type.element_type, coord), None, [], coord
+            )
+
+    return c_ast.TypeDecl(
+        name, [], None, c_ast.IdentifierType([field_type.spelling], coord), coord
+    )
+
+
+def _typedef_tag(cursor: "cindex.Cursor") -> "cindex.Cursor | None":
+    """
+    Returns the enum or struct declaration a typedef names directly, as in
+    `typedef enum { ... } name;` or `typedef struct tag name;`, if any.
+    """
+    from clang.cindex import CursorKind, TypeKind
+
+    underlying = cursor.underlying_typedef_type
+    if underlying.kind != TypeKind.ELABORATED:
+        return None
+
+    tag = underlying.get_declaration()
+    if tag.kind not in (CursorKind.ENUM_DECL, CursorKind.STRUCT_DECL):
+        return None
+
+    return tag
+
+
+def _is_anonymous(cursor: "cindex.Cursor") -> bool:
+    # Named tags are located at their name, and anonymous ones at their keyword
+    return _location_key(cursor) == _location_key(cursor.extent.start)
+
+
+def _is_within(inner: "cindex.Cursor", outer: "cindex.Cursor") -> bool:
+    "Returns True if the source range of a cursor is contained in another's."
+    (inner_file, inner_start) = _location_key(inner.extent.start)
+    (outer_file, outer_start) = _location_key(outer.extent.start)
+
+    return (
+        inner_file == outer_file
+        and outer_start <= inner_start
+        and inner.extent.end.offset <= outer.extent.end.offset
+    )
+
+
+def _location_key(cursor_or_location) -> tuple[str | None, int]:
+    location = getattr(cursor_or_location, "location", cursor_or_location)
+    file = location.file
+
+    return (None if file is None else file.name, location.offset)
+
+
+def _coord(location: "cindex.SourceLocation"):
+    try:
+        from pycparser.c_parser import Coord
+    except ImportError:  # pycparser < 3
+        from pycparser.plyparser import Coord
+
+    file = "" if location.file is None else location.file.name
+
+    return Coord(file, location.line, location.column)
+
+
+def _format_diagnostic(diagnostic: "cindex.Diagnostic") -> str:
+    location = diagnostic.location
+    if location.file is None:
+        return diagnostic.spelling
+
+    return f"{location.file.name}:{location.line}:{location.column}: {diagnostic.spelling}"
+
+
+@functools.cache
+def _resource_dir_args() -> list[str]:
+    """
+    Returns arguments that point libclang to the builtin headers, such as
+    stdbool.h, of the clang compiler on the PATH, if there is one. Some libclang
+    packages do not ship builtin headers, and fail to parse headers that
+    include them otherwise.
+    """
+
+    clang = shutil.which("clang")
+    if clang is None:
+        return []
+
+    try:
+        process = subprocess.run(
+            [clang, "-print-resource-dir"], capture_output=True, text=True
+        )
+    except OSError:
+        return []
+
+    resource_dir = process.stdout.strip()
+    if process.returncode != 0 or not os.path.isdir(resource_dir):
+        return []
+
+    return ["-resource-dir", resource_dir]
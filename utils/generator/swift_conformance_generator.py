@@ -1,10 +1,10 @@
 from typing import Generator
-from utils.cli.console_color import ConsoleColor
+from utils.cli.reporter import current_reporter
+from utils.data.c_decl_descriptors import CDeclDescriptor, CFieldDescriptor, CFieldKind
 from utils.data.swift_decls import (
     SwiftExtensionDecl,
     SwiftMemberDecl,
 )
-from pycparser import c_ast
 
 
 class SwiftConformanceGenerator:
@@ -16,14 +16,14 @@ class SwiftConformanceGenerator:
     protocol_name: str
 
     def generate_members(
-        self, decl: SwiftExtensionDecl, node: c_ast.Node
+        self, decl: SwiftExtensionDecl, descriptor: CDeclDescriptor
     ) -> list[SwiftMemberDecl]:
         raise NotImplementedError()
 
     def iterate_field_names(
         self,
-        type_name: str,
-        fields: list[c_ast.Decl],
+        type_name: str | None,
+        fields: list[CFieldDescriptor],
         ignore_non_constant_tuples: bool = False,
         max_tuple_length: int = 8,
     ) -> Generator:
@@ -38,8 +38,8 @@ class SwiftConformanceGenerator:
 
     def _internal_iterate_field_names(
         self,
-        type_name: str,
-        field: c_ast.Decl,
+        type_name: str | None,
+        field: CFieldDescriptor,
         ignore_non_constant_tuples: bool = False,
         max_tuple_length: int = 8,
     ) -> Generator:
@@ -51,104 +51,48 @@ class SwiftConformanceGenerator:
         field within that union.
         """
 
-        if isinstance(field.type, c_ast.Struct):
-            for str_field in field.type.decls:
-                if not ignore_non_constant_tuples:
-                    if not self._is_constant_field_decl(str_field):
-                        continue
-                for f in self._internal_iterate_field_names(
-                    type_name,
-                    str_field,
-                    ignore_non_constant_tuples,
-                    max_tuple_length,
-                ):
-                    yield f
-        if isinstance(field.type, c_ast.Union):
-            for union_field in field.type.decls:
-                if not ignore_non_constant_tuples:
-                    if not self._is_constant_field_decl(union_field):
-                        continue
-                for f in self._internal_iterate_field_names(
-                    type_name,
-                    union_field,
-                    ignore_non_constant_tuples,
-                    max_tuple_length,
-                ):
-                    yield f
-                break  # Break after first valid union field
-        # For array declarations, ensure that at most 8 tuple fields are
-        # present, otherwise, emit an access for each tuple element.
-        elif isinstance(field.type, c_ast.ArrayDecl):
-            dims: int = 0
-            if isinstance(field.type.dim, c_ast.Constant):
-                dims = int(field.type.dim.value)
-            elif not ignore_non_constant_tuples:
-                print(
-                    ConsoleColor.YELLOW(
-                        f"Warning: Found non-constant dimension size {field.type.dim}\n"
-                        f"while iterating through fields of type {type_name}."
-                    )
-                )
-                return
-            if dims > max_tuple_length:
-                for i in range(dims):
-                    yield f"{field.name}.{i}"
-            elif field.name is not None:
-                yield field.name
-        elif isinstance(field, c_ast.ArrayDecl):
-            # TODO: Reduce duplication with elif above
-            if isinstance(field.type, c_ast.TypeDecl):
-                dims = 0
-                if isinstance(field.dim, c_ast.Constant):
-                    dims = int(field.dim.value)
+        match field.kind:
+            case CFieldKind.STRUCT | CFieldKind.UNION:
+                for nested_field in field.fields or []:
+                    if not ignore_non_constant_tuples:
+                        if not nested_field.is_constant():
+                            continue
+                    for f in self._internal_iterate_field_names(
+                        type_name,
+                        nested_field,
+                        ignore_non_constant_tuples,
+                        max_tuple_length,
+                    ):
+                        yield f
+                    if field.kind == CFieldKind.UNION:
+                        break  # Break after first valid union field
+
+            # For array declarations, ensure that at most 8 tuple fields are
+            # present, otherwise, emit an access for each tuple element.
+            case CFieldKind.ARRAY:
+                dims: int = 0
+                if field.array_size is not None:
+                    dims = field.array_size
                 elif not ignore_non_constant_tuples:
-                    print(
-                        ConsoleColor.YELLOW(
-                            f"Warning: Found non-constant dimension size {field.dim}\n"
-                            f"while iterating through fields of type {type_name}."
-                        )
+                    current_reporter().warning(
+                        f"Warning: Found non-constant dimension size {field.array_size_text}\n"
+                        f"while iterating through fields of type {type_name}."
                     )
                     return
                 if dims > max_tuple_length:
                     for i in range(dims):
-                        yield f"{field.type.declname}.{i}"
-                elif field.type.declname is not None:
-                    yield field.type.declname
-        elif field.name is not None:
-            yield field.name
-
-    def _is_constant_field_decl(self, field: c_ast.Decl) -> bool:
-        """
-        Returns true if the given field can be resolved (in terms of type and size)
-        at the definition site, without parsing extra expressions
-        (such as in `type name[CONSTANT + 1]` field declarations.).
-
-        If the field is a struct, returns true if all fields are constant fields,
-        and if the field is a union, returns true if any of the fields is constant.
-        """
-        if isinstance(field, c_ast.Decl):
-            return self._is_constant_field_decl(field.type)
-
-        if isinstance(field, c_ast.ArrayDecl):
-            if isinstance(field.dim, c_ast.Constant):
-                dims = int(field.dim.value)
-                return dims != 0
-            return False
-        if isinstance(field, c_ast.Struct):
-            return all(map(self._is_constant_field_decl, field.decls))
-        if isinstance(field, c_ast.Union):
-            return any(map(self._is_constant_field_decl, field.decls))
-        if isinstance(field.type, c_ast.TypeDecl):
-            if isinstance(field.dim, c_ast.Constant):
-                dims = int(field.dim.value)
-                return dims != 0
+                        yield f"{field.name}.{i}"
+                elif field.name is not None:
+                    yield field.name
 
-        return True
+            case _:
+                if field.name is not None:
+                    yield field.name
 
-    def _field_name(self, field: c_ast.Decl) -> str | None:
+    def _field_name(self, field: CFieldDescriptor) -> str | None:
         # For unions, choose the first named declaration inside.
-        if isinstance(field.type, c_ast.Union):
-            for union_field in field.type.decls:
+        if field.kind == CFieldKind.UNION:
+            for union_field in field.fields or []:
                 if union_name := self._field_name(union_field):
                     return union_name
 
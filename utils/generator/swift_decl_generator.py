@@ -1,6 +1,11 @@
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from pycparser import c_ast
+from utils.data.c_decl_descriptors import (
+    CEnumeratorDescriptor,
+    describe_c_node,
+    describe_enum,
+)
 from utils.data.compound_symbol_name import CompoundSymbolName
 from utils.data.swift_decls import (
     CDeclKind,
@@ -11,6 +16,10 @@ from utils.data.swift_decls import (
 )
 from utils.generator.symbol_generator_filter import SymbolGeneratorFilter
 from utils.generator.symbol_name_generator import SymbolNameGenerator
+from utils.profiling.pipeline_hooks import span
+
+if TYPE_CHECKING:
+    from pycparser import c_ast
 
 
 # Visitor / declaration collection
@@ -36,8 +45,14 @@ class SwiftDeclGenerator:
         self,
         enum_name: CompoundSymbolName,
         enum_original_name: str,
-        node: c_ast.Enumerator,
+        node: "c_ast.Enumerator",
+        descriptor: CEnumeratorDescriptor | None = None,
     ) -> SwiftMemberVarDecl | None:
+        """
+        Generates the declaration of an enum case. `descriptor` is the
+        enumerator's entry in the descriptor of its enum, if already built,
+        which is shared instead of describing the enumerator again.
+        """
 
         value = self.symbol_name_generator.generate_original_enum_case(node.name).to_string()
 
@@ -47,24 +62,30 @@ class SwiftDeclGenerator:
             ),
             self.symbol_name_generator.generate_original_enum_case(node.name),
             self.coord_to_location(node.coord),
-            original_node=node,
+            original_descriptor=descriptor if descriptor is not None else describe_c_node(node),
             c_kind=CDeclKind.ENUM_CASE,
             doccomment=None,
             is_static=True,
             initial_value=value
         )
 
-    def generate_enum(self, result: list[SwiftDecl], node: c_ast.Enum, suggested_name: str | None):
+    def generate_enum(self, result: list[SwiftDecl], node: "c_ast.Enum", suggested_name: str | None):
         decl_name = suggested_name if node.name is None else node.name
 
         enum_name = self.symbol_name_generator.generate_enum_name(
             decl_name
         )
 
+        # Enumerator values are rendered once, for the enum's descriptor, and
+        # its entries are shared with the generated cases
+        descriptor = describe_enum(node)
+
         members = []
         if node.values is not None:
-            for case_node in node.values:
-                case_decl = self.generate_enum_case(enum_name, decl_name, case_node)
+            for (case_node, case_descriptor) in zip(node.values, descriptor.values):
+                case_decl = self.generate_enum_case(
+                    enum_name, decl_name, case_node, case_descriptor
+                )
                 if case_decl is None:
                     continue
 
@@ -75,7 +96,7 @@ class SwiftDeclGenerator:
             enum_name,
             self.symbol_name_generator.generate_original_enum_name(decl_name),
             self.coord_to_location(node.coord),
-            original_node=node,
+            original_descriptor=descriptor,
             c_kind=CDeclKind.ENUM,
             doccomment=None,
             members=list(members),
@@ -87,7 +108,7 @@ class SwiftDeclGenerator:
 
     # Struct
 
-    def generate_struct(self, result: list[SwiftDecl], node: c_ast.Struct, suggested_name: str | None):
+    def generate_struct(self, result: list[SwiftDecl], node: "c_ast.Struct", suggested_name: str | None):
         decl_name = suggested_name if node.name is None else node.name
 
         struct_name = self.symbol_name_generator.generate_struct_name(
@@ -98,7 +119,7 @@ class SwiftDeclGenerator:
             struct_name,
             self.symbol_name_generator.generate_original_struct_name(decl_name),
             self.coord_to_location(node.coord),
-            original_node=node,
+            original_descriptor=describe_c_node(node),
             c_kind=CDeclKind.STRUCT,
             doccomment=None,
             members=[],
@@ -110,23 +131,33 @@ class SwiftDeclGenerator:
     
     #
 
-    def generate(self, result: list[SwiftDecl], node: c_ast.Node, suggested_name: str | None = None):
-        match node:
-            case c_ast.Typedef():
-                if isinstance(node.type, c_ast.TypeDecl):
-                    self.generate(
-                        result,
-                        node.type.type,
-                        suggested_name=node.name
-                    )
-            
-            case c_ast.Enum():
-                self.generate_enum(result, node, suggested_name)
-
-            case c_ast.Struct():
-                self.generate_struct(result, node, suggested_name)
-
-    def generate_from_list(self, nodes: list[c_ast.Node]) -> list[SwiftDecl]:
+    def generate(self, result: list[SwiftDecl], node: "c_ast.Node", suggested_name: str | None = None):
+        # Imported when generating, so configuring the generator does not load
+        # the parser
+        from pycparser import c_ast
+
+        with span(
+            "SwiftDeclGenerator.generate",
+            "decl",
+            node=type(node).__name__,
+            name=getattr(node, "name", None) or suggested_name,
+        ):
+            match node:
+                case c_ast.Typedef():
+                    if isinstance(node.type, c_ast.TypeDecl):
+                        self.generate(
+                            result,
+                            node.type.type,
+                            suggested_name=node.name
+                        )
+                
+                case c_ast.Enum():
+                    self.generate_enum(result, node, suggested_name)
+
+                case c_ast.Struct():
+                    self.generate_struct(result, node, suggested_name)
+
+    def generate_from_list(self, nodes: "list[c_ast.Node]") -> list[SwiftDecl]:
         result: list[SwiftDecl] = []
         for node in nodes:
             decl = self.generate(result, node)
@@ -2,20 +2,24 @@
 
 import sys
 import os
+import inspect
 import subprocess
 import shutil
+import dataclasses
 from dataclasses import dataclass
-from typing import Generator
-
-import pycparser
+from typing import TYPE_CHECKING, Callable, Generator, Iterable
 
 from pathlib import Path
-from pycparser import c_ast
 from contextlib import contextmanager
-from utils.cli.cli_printing import print_stage_name
+from utils.cache.decl_cache import DeclCache, fingerprint_decl
+from utils.cache.file_digest import digest_bytes, digest_files
+from utils.cache.preprocessor_cache import PreprocessorCache
+from utils.cache.run_cache import RunCache
 from utils.cli.console_color import ConsoleColor
+from utils.cli.reporter import QuietReporter, Reporter, RecordingReporter, current_reporter, reporting
 
-from utils.converters.syntax_stream import SyntaxStream
+from utils.converters.syntax_stream import BufferedSyntaxStream
+from utils.data.c_decl_descriptors import CDeclDescriptor, CStructDescriptor
 from utils.data.swift_decl_lookup import SwiftDeclLookup
 from utils.data.swift_decl_visitor import SwiftDeclVisitor
 from utils.doccomment.doccomment_block import DoccommentBlock
@@ -34,13 +38,24 @@ from utils.directory_structure.directory_structure_manager import (
 )
 from utils.data.swift_file import SwiftFile
 from utils.doccomment.doccomment_lookup import DoccommentLookup
+from utils.files.atomic_write import write_bytes_atomic, write_text_atomic
+from utils.profiling.pipeline_hooks import span
+from utils.profiling.stage_profiler import StageProfiler, StageTiming
+from utils.preprocessor.line_markers import include_closure
 
 # Utils
 from utils.paths import paths
 
+# The parser, and the stages that depend on it, are imported when they run,
+# so that runs skipped by the run cache, and tools that only build requests,
+# do not pay for loading them
+if TYPE_CHECKING:
+    from pycparser import c_ast
+    from utils.preprocessor.header_slicer import HeaderSlicer
 
-def run_cl(input_path: Path) -> bytes:
-    args: list[str | os.PathLike] = [
+
+def cl_args(input_path: Path) -> list[str | os.PathLike]:
+    return [
         "cl",
         "/E",
         "/Za",
@@ -48,11 +63,9 @@ def run_cl(input_path: Path) -> bytes:
         input_path,
     ]
 
-    return subprocess.check_output(args, cwd=paths.SCRIPTS_ROOT_PATH)
 
-
-def run_clang(input_path: Path) -> bytes:
-    args: list[str | os.PathLike] = [
+def clang_args(input_path: Path) -> list[str | os.PathLike]:
+    return [
         "clang",
         "-E",
         "-fuse-line-directives",
@@ -61,14 +74,41 @@ def run_clang(input_path: Path) -> bytes:
         input_path,
     ]
 
-    return subprocess.check_output(args, cwd=paths.SCRIPTS_ROOT_PATH)
 
-
-def run_c_preprocessor(input_path: Path) -> bytes:
+def c_preprocessor_args(input_path: Path) -> list[str | os.PathLike]:
     if sys.platform == "win32":
-        return run_cl(input_path)
+        return cl_args(input_path)
+
+    return clang_args(input_path)
+
+
+def run_cl(input_path: Path) -> bytes:
+    return subprocess.check_output(cl_args(input_path), cwd=paths.SCRIPTS_ROOT_PATH)
+
+
+def run_clang(input_path: Path) -> bytes:
+    return subprocess.check_output(clang_args(input_path), cwd=paths.SCRIPTS_ROOT_PATH)
+
+
+def run_c_preprocessor(input_path: Path, cache: PreprocessorCache | None = None) -> bytes:
+    """
+    Preprocesses a given header file with the platform's C compiler.
+
+    If a cache is provided, the compiler is only invoked if no cached output
+    exists for the same compiler, arguments and include closure contents.
+    """
+    args = c_preprocessor_args(input_path)
+
+    if cache is not None:
+        if (cached := cache.lookup(args, paths.SCRIPTS_ROOT_PATH)) is not None:
+            return cached
+
+    output = subprocess.check_output(args, cwd=paths.SCRIPTS_ROOT_PATH)
 
-    return run_clang(input_path)
+    if cache is not None:
+        cache.store(args, paths.SCRIPTS_ROOT_PATH, output)
+
+    return output
 
 
 class SwiftDeclMerger:
@@ -107,14 +147,16 @@ class SwiftDeclMerger:
         if isinstance(decl1, SwiftExtensionDecl) and isinstance(
             decl2, SwiftExtensionDecl
         ):
-            node = self.choose_nodes(decl1.original_node, decl2.original_node)
+            descriptor = self.choose_descriptors(
+                decl1.original_descriptor, decl2.original_descriptor
+            )
             
             return SwiftExtensionDecl(
                 name=decl1.name,
                 original_name=decl1.original_name,
                 members=decl1.members + decl2.members,
                 origin=decl1.origin,
-                original_node=node,
+                original_descriptor=descriptor,
                 c_kind=decl1.c_kind,
                 doccomment=DoccommentBlock.merge(decl1.doccomment, decl2.doccomment),
                 conformances=list(set(decl1.conformances + decl2.conformances)),
@@ -122,31 +164,50 @@ class SwiftDeclMerger:
 
         return None
     
-    def choose_nodes(self, node1: c_ast.Node | None, node2: c_ast.Node | None) -> c_ast.Node | None:
-        if node1 is None:
-            return node2
-        if node2 is None:
-            return node1
+    def choose_descriptors(
+        self, descriptor1: CDeclDescriptor | None, descriptor2: CDeclDescriptor | None
+    ) -> CDeclDescriptor | None:
+        if descriptor1 is None:
+            return descriptor2
+        if descriptor2 is None:
+            return descriptor1
         
-        # Choose the source node that has members, if possible
-        match (node1, node2):
-            case (c_ast.Struct(), c_ast.Struct()):
-                if node1.decls is None:
-                    return node2
-                if node2.decls is None:
-                    return node1
+        # Choose the source declaration that has members, if possible
+        match (descriptor1, descriptor2):
+            case (CStructDescriptor(), CStructDescriptor()):
+                if descriptor1.fields is None:
+                    return descriptor2
+                if descriptor2.fields is None:
+                    return descriptor1
         
-        return node1
+        return descriptor1
 
 
 class DeclGeneratorTarget:
     def prepare(self):
         pass
 
+    def supports_run_cache(self) -> bool:
+        """
+        Whether the output of this target persists between runs, allowing a
+        generator run whose inputs have not changed to be skipped.
+        """
+        return False
+
     @contextmanager
     def create_stream(self, _: Path) -> Generator:
         raise NotImplementedError("Must be overridden by subclasses.")
 
+    def write_file(self, path: Path, contents: str):
+        "Writes the already-rendered contents of a file to this target."
+
+        with self.create_stream(path) as stream:
+            stream.write(contents)
+
+    def finish(self):
+        "Called once all files have been generated."
+        pass
+
 
 class DeclFileGeneratorDiskTarget(DeclGeneratorTarget):
     def __init__(
@@ -159,7 +220,7 @@ class DeclFileGeneratorDiskTarget(DeclGeneratorTarget):
 
     def prepare(self):
         if self.verbose:
-            print(
+            current_reporter().message(
                 f"Generating .swift files to {ConsoleColor.MAGENTA(self.destination_folder)}..."
             )
 
@@ -167,21 +228,178 @@ class DeclFileGeneratorDiskTarget(DeclGeneratorTarget):
             shutil.rmtree(self.destination_folder)
             os.mkdir(self.destination_folder)
 
+    def supports_run_cache(self) -> bool:
+        return True
+
+    @contextmanager
+    def create_stream(self, path: Path) -> Generator:
+        stream = BufferedSyntaxStream()
+        yield stream
+
+        self.write_file(path, stream.getvalue())
+
+    def write_file(self, path: Path, contents: str):
+        write_text_atomic(path, contents)
+
+
+class DeclFileGeneratorIncrementalDiskTarget(DeclGeneratorTarget):
+    """
+    A disk target that renders each file in memory and only writes it if its
+    contents differ from the file already on disk, preserving the modification
+    time of unchanged files so build systems do not recompile them.
+
+    Once generation finishes, any '.swift' file in the destination folder that
+    was not generated by this run is deleted.
+    """
+
+    written_paths: list[Path]
+    "Files whose contents were written during this run."
+    unchanged_paths: list[Path]
+    "Files whose contents matched what was already on disk."
+    removed_paths: list[Path]
+    "Stale files that were deleted from the destination folder."
+
+    def __init__(self, destination_folder: Path, verbose: bool = True):
+        self.destination_folder = destination_folder
+        self.verbose = verbose
+        self.written_paths = []
+        self.unchanged_paths = []
+        self.removed_paths = []
+        self._existing_paths: set[str] = set()
+        self._generated_paths: set[str] = set()
+
+    def prepare(self):
+        if self.verbose:
+            current_reporter().message(
+                f"Generating .swift files to {ConsoleColor.MAGENTA(self.destination_folder)}..."
+            )
+
+        self.written_paths = []
+        self.unchanged_paths = []
+        self.removed_paths = []
+        self._generated_paths = set()
+        self._existing_paths = set(
+            map(os.path.abspath, self.destination_folder.rglob("*.swift"))
+        )
+
+    def supports_run_cache(self) -> bool:
+        return True
+
     @contextmanager
     def create_stream(self, path: Path) -> Generator:
-        path.parent.mkdir(parents=True, exist_ok=True)
+        stream = BufferedSyntaxStream()
+        yield stream
 
-        with open(path, "w", newline="\n") as file:
-            stream = SyntaxStream(file)
-            yield stream
+        self.write_file(path, stream.getvalue())
+
+    def write_file(self, path: Path, contents: str):
+        self.write_if_changed(path, contents)
+
+    def write_if_changed(self, path: Path, contents: str) -> bool:
+        """
+        Writes `contents` to `path`, unless the file already contains the same
+        contents. Returns True if the file was written.
+        """
+        self._generated_paths.add(os.path.abspath(path))
+
+        data = contents.encode("utf-8")
+        try:
+            with open(path, "rb") as file:
+                if file.read() == data:
+                    self.unchanged_paths.append(path)
+                    return False
+        except OSError:
+            pass
+
+        write_bytes_atomic(path, data)
+
+        self.written_paths.append(path)
+        return True
+
+    def finish(self):
+        for stale in sorted(self._existing_paths - self._generated_paths):
+            stale_path = Path(stale)
+            stale_path.unlink(missing_ok=True)
+            self.removed_paths.append(stale_path)
+
+            # Prune folders left empty by the removal
+            folder = stale_path.parent
+            while folder != self.destination_folder and folder.is_relative_to(self.destination_folder):
+                if any(folder.iterdir()):
+                    break
+                folder.rmdir()
+                folder = folder.parent
+
+        if self.verbose:
+            current_reporter().message(
+                f"Wrote {ConsoleColor.CYAN(len(self.written_paths))} file(s), "
+                f"{ConsoleColor.CYAN(len(self.unchanged_paths))} unchanged, "
+                f"removed {ConsoleColor.CYAN(len(self.removed_paths))} stale file(s)"
+            )
 
 
 class DeclFileGeneratorStdoutTarget(DeclGeneratorTarget):
     @contextmanager
     def create_stream(self, path: Path) -> Generator:
-        stream = SyntaxStream(sys.stdout)
+        stream = BufferedSyntaxStream(sys.stdout)
+        yield stream
+
+        stream.flush()
+
+
+class DeclFileGeneratorNullTarget(DeclGeneratorTarget):
+    """
+    A target that renders files and discards their contents. Useful for
+    benchmarking the generator without measuring I/O.
+    """
+
+    @contextmanager
+    def create_stream(self, path: Path) -> Generator:
+        yield BufferedSyntaxStream()
+
+    def write_file(self, path: Path, contents: str):
+        pass
+
+
+class DeclFileGeneratorMemoryTarget(DeclGeneratorTarget):
+    """
+    A target that keeps the rendered contents of generated files in memory.
+    """
+
+    files: dict[Path, str]
+    "Contents of generated files, keyed by path, in the order they were generated."
+
+    def __init__(self):
+        self.files = dict()
+
+    @contextmanager
+    def create_stream(self, path: Path) -> Generator:
+        stream = BufferedSyntaxStream()
         yield stream
 
+        self.write_file(path, stream.getvalue())
+
+    def write_file(self, path: Path, contents: str):
+        self.files[path] = contents
+
+
+def render_swift_file(file: SwiftFile, rendered_decls: dict[str, str] | None = None) -> str:
+    "Renders the contents of a Swift file into a string."
+
+    stream = BufferedSyntaxStream()
+    file.write(stream, rendered_decls)
+
+    return stream.getvalue()
+
+
+def render_swift_decl(decl: SwiftDecl) -> str:
+    "Renders a top-level Swift declaration into a string."
+
+    stream = BufferedSyntaxStream()
+    decl.write(stream)
+
+    return stream.getvalue()
+
 
 class DeclFileGenerator:
     def __init__(
@@ -192,6 +410,8 @@ class DeclFileGenerator:
         includes: list[str],
         directory_manager: DirectoryStructureManager | None = None,
         verbose: bool = False,
+        jobs: int = 1,
+        rendered_decls: dict[str, str] | None = None,
     ):
         if directory_manager is None:
             self.directory_manager = DirectoryStructureManager(destination_folder)
@@ -203,52 +423,89 @@ class DeclFileGenerator:
         self.decls = decls
         self.includes = includes
         self.verbose = verbose
+        self.jobs = jobs
+        self.rendered_decls = rendered_decls
 
     def generate_file(self, file: SwiftFile):
         with self.target.create_stream(file.path) as stream:
-            file.write(stream)
+            file.write(stream, self.rendered_decls)
+
+    def generate(self) -> list[SwiftFile]:
+        self.target.prepare()
+
+        files = self.directory_manager.make_declaration_files(self.decls)
 
-    def generate(self):
+        for file in files:
+            file.includes = self.includes
+
+        # Files whose declarations are all pre-rendered are only stitched
+        # together, which is not worth sending to worker processes; pending
+        # declarations are rendered on the pool by `_DeclPreparer.render`
+        if self.jobs > 1 and len(files) > 1 and self.rendered_decls is None:
+            self._generate_parallel(files)
+        else:
+            for file in files:
+                self.generate_file(file)
+                self._report_file(file)
+
+        self.target.finish()
+
+        return files
+
+    def generate_streaming(
+        self,
+        prepare_file: Callable[[SwiftFile], None],
+        release_file: Callable[[SwiftFile], None],
+    ) -> list[SwiftFile]:
+        """
+        Generates files one at a time, calling `prepare_file` right before a
+        file is rendered and `release_file` right after it is written. The
+        declarations of each file are released once it is written, so the
+        returned files are empty.
+        """
         self.target.prepare()
 
         files = self.directory_manager.make_declaration_files(self.decls)
+        # Files now hold the only references to the declarations
+        self.decls.clear()
 
         for file in files:
             file.includes = self.includes
+
+            prepare_file(file)
             self.generate_file(file)
+            self._report_file(file)
+            release_file(file)
 
-            if self.verbose:
-                rel_path = file.path.relative_to(self.destination_folder)
-                print(
-                    f"Generated {ConsoleColor.MAGENTA(rel_path)} with {ConsoleColor.CYAN(len(file.decls))} declaration(s)"
-                )
+            file.decls = []
 
+        self.target.finish()
 
-# noinspection PyPep8Naming
-class DeclCollectorVisitor(c_ast.NodeVisitor):
-    decls: list[c_ast.Node] = []
+        return files
 
-    def __init__(self, prefixes: list[str]):
-        self.prefixes = prefixes
+    def _generate_parallel(self, files: list[SwiftFile]):
+        """
+        Renders files in a pool of worker processes. Results are consumed, and
+        written to the target, in the original file order, which keeps output
+        deterministic while later files are still being rendered.
+        """
+        from concurrent.futures import ProcessPoolExecutor
 
-    def should_include(self, decl_name: str) -> bool:
-        for prefix in self.prefixes:
-            if decl_name.startswith(prefix):
-                return True
+        chunksize = max(1, len(files) // (self.jobs * 4))
 
-        return False
-    
-    def visit_Typedef(self, node: c_ast.Typedef):
-        if node.name is not None and self.should_include(node.name):
-            self.decls.append(node)
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            rendered = executor.map(render_swift_file, files, chunksize=chunksize)
 
-    def visit_Struct(self, node: c_ast.Struct):
-        if node.name is not None and self.should_include(node.name):
-            self.decls.append(node)
+            for (file, contents) in zip(files, rendered):
+                self.target.write_file(file.path, contents)
+                self._report_file(file)
 
-    def visit_Enum(self, node: c_ast.Enum):
-        if node.name is not None and self.should_include(node.name):
-            self.decls.append(node)
+    def _report_file(self, file: SwiftFile):
+        if self.verbose:
+            rel_path = file.path.relative_to(self.destination_folder)
+            current_reporter().message(
+                f"Generated {ConsoleColor.MAGENTA(rel_path)} with {ConsoleColor.CYAN(len(file.decls))} declaration(s)"
+            )
 
 
 class SwiftDoccommentFormatterVisitor(SwiftDeclVisitor):
@@ -257,13 +514,148 @@ class SwiftDoccommentFormatterVisitor(SwiftDeclVisitor):
         self.lookup = lookup
 
     def generic_visit(self, decl: SwiftDecl) -> SwiftDeclVisitResult:
-        decl.doccomment = self.formatter.format_doccomment(
-            decl.doccomment, decl, self.lookup
-        )
+        with span("DoccommentFormatter.format_doccomment", "doccomment", decl=decl.name.to_string):
+            decl.doccomment = self.formatter.format_doccomment(
+                decl.doccomment, decl, self.lookup
+            )
 
         return SwiftDeclVisitResult.VISIT_CHILDREN
 
 
+class _DeclPreparer:
+    """
+    Formats the doc comments of merged top-level declarations and renders
+    them, reusing the rendered text of declarations cached by a previous run,
+    if a declaration cache is provided.
+    """
+
+    rendered_decls: dict[str, str] | None
+    "Rendered text of top-level declarations, keyed by name, if caching."
+
+    def __init__(
+        self,
+        formatter: DoccommentFormatter | None,
+        lookup: SwiftDeclLookup,
+        decl_cache: DeclCache | None,
+    ):
+        self.formatter = formatter
+        self.lookup = lookup
+        self.decl_cache = decl_cache
+        self.rendered_decls = None if decl_cache is None else dict()
+        self._fingerprints: dict[str, str] = dict()
+        self._lookups: dict[str, dict[str, str | None]] = dict()
+
+    def reuse_cached(self, decls: list[SwiftDecl]) -> list[SwiftDecl]:
+        """
+        Fingerprints declarations, picking up the rendered text of the ones
+        that are unchanged since the previous run. Returns the declarations
+        that need to be formatted and rendered.
+        """
+        if self.decl_cache is None or self.rendered_decls is None:
+            return decls
+
+        pending: list[SwiftDecl] = []
+        for decl in decls:
+            name = decl.name.to_string()
+            fingerprint = fingerprint_decl(decl)
+            self._fingerprints[name] = fingerprint
+
+            if (text := self.decl_cache.lookup(fingerprint, self.lookup)) is not None:
+                self.rendered_decls[name] = text
+            else:
+                pending.append(decl)
+
+        return pending
+
+    def is_rendered(self, decl: SwiftDecl) -> bool:
+        return self.rendered_decls is not None and decl.name.to_string() in self.rendered_decls
+
+    def format(self, decls: list[SwiftDecl]):
+        "Formats the doc comments of a list of declarations and their members."
+        if self.formatter is None:
+            return
+
+        walker = SwiftDeclWalker(SwiftDoccommentFormatterVisitor(self.formatter, self.lookup))
+
+        for decl in decls:
+            if self.decl_cache is not None:
+                self.lookup.recorded_lookups = self._lookups.setdefault(decl.name.to_string(), dict())
+
+            walker.walk_decl(decl)
+
+        self.lookup.recorded_lookups = None
+
+    def render(self, decls: list[SwiftDecl], jobs: int = 1):
+        """
+        Renders formatted declarations and records them in the declaration
+        cache, in a pool of `jobs` worker processes if more than one
+        declaration needs rendering. Does nothing if not caching, in which case
+        files render their declarations themselves.
+        """
+        if self.decl_cache is None or self.rendered_decls is None:
+            return
+
+        rendered: Iterable[str]
+        if jobs > 1 and len(decls) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(decls) // (jobs * 4))
+
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                rendered = list(executor.map(render_swift_decl, decls, chunksize=chunksize))
+        else:
+            rendered = map(render_swift_decl, decls)
+
+        for (decl, text) in zip(decls, rendered):
+            name = decl.name.to_string()
+
+            self.rendered_decls[name] = text
+            self.decl_cache.store(self._fingerprints[name], text, self._lookups.get(name, dict()))
+
+    def prepare_file(self, file: SwiftFile):
+        "Formats and renders the declarations of a file that were not reused."
+        pending = [decl for decl in file.decls if not self.is_rendered(decl)]
+
+        self.format(pending)
+        self.render(pending)
+
+    def release_file(self, file: SwiftFile):
+        "Drops the rendered text of the declarations of a file that was written."
+        if self.rendered_decls is None:
+            return
+
+        for decl in file.decls:
+            self.rendered_decls.pop(decl.name.to_string(), None)
+
+
+class ParserBackendError(Exception):
+    """
+    Raised by parser backends when they cannot parse a header, e.g. because of
+    errors reported by the compiler, to fall back to the pycparser backend.
+    """
+
+
+class ParserBackend:
+    """
+    Front end of the generator: parses a request's header file into the C
+    declarations that Swift declarations are generated from, as pycparser
+    `c_ast` nodes that `SwiftDeclGenerator` consumes.
+    """
+
+    name: str = "parser"
+    "Name of the backend, as shown in messages."
+
+    def is_available(self) -> bool:
+        """
+        Returns False if the backend cannot run in the current environment, e.g.
+        because an optional dependency is not installed.
+        """
+        return True
+
+    def collect_c_decls(self, request: "TypeGeneratorRequest", profiler: StageProfiler) -> "CollectedCDecls":
+        raise NotImplementedError("Must be implemented by subclasses.")
+
+
 @dataclass
 class TypeGeneratorRequest:
     header_file: Path
@@ -277,29 +669,377 @@ class TypeGeneratorRequest:
     doccomment_lookup: DoccommentLookup | None
     doccomment_formatter: DoccommentFormatter | None
     directory_manager: DirectoryStructureManager | None
+    cache_folder: Path | None = None
+    "Folder to store generator caches in. Caching is disabled if None."
+    jobs: int = 1
+    "Number of worker processes that parallelizable stages may use."
+    slice_allowlist: list[Path] | None = None
+    """
+    List of files and folders whose declarations should be parsed. If provided,
+    declarations from any other file are dropped before parsing, except for the
+    typedefs and tagged types that the remaining declarations depend on.
+    """
+    profiler: StageProfiler | None = None
+    "Profiler used to announce and time pipeline stages."
+    write_preprocessed_file: bool = False
+    """
+    Whether to write the output of the preprocessor next to the header file, as
+    a .i file, for debugging purposes. The parser always reads the output from
+    memory.
+    """
+    streaming: bool = False
+    """
+    Whether to stream the pipeline to keep peak memory flat: the header is
+    parsed in chunks whose syntax trees are released once their declarations
+    are collected, and, past the merge of Swift declarations, each file is
+    formatted, rendered, written and released in turn.
+    """
+    reporter: Reporter | None = None
+    """
+    Reporter that receives progress messages and warnings. Defaults to the
+    reporter of the calling context, which prints to the console.
+    """
+    parser_backend: ParserBackend | None = None
+    """
+    Backend that parses the header file and collects C declarations. Defaults
+    to pycparser, which is also used if the backend is not available.
+    """
+    preprocessed_output: bytes | None = None
+    """
+    Output of the C preprocessor to parse instead of preprocessing the header
+    file, e.g. the output of an umbrella header shared by the targets of a
+    batch. Declarations of other headers in it are dropped by slicing it with
+    `slice_allowlist`. Only used by the pycparser backend.
+    """
 
 
-def generate_types(request: TypeGeneratorRequest) -> int:
-    print_stage_name("Generating header file...")
+def _generator_source_files(request: TypeGeneratorRequest) -> list[Path]:
+    """
+    Returns the source files of the generator that can influence the output of
+    a request: every script module, plus the modules that define the request's
+    customization objects.
+    """
 
-    output_file = run_c_preprocessor(request.header_file)
+    result = list(paths.SCRIPTS_ROOT_PATH.rglob("*.py"))
 
-    # Windows-specific fix to replace some page feeds that are present in the original system headers
-    if sys.platform == "win32":
-        output_file = output_file.replace(b"\x0c", b"")
+    for obj in (
+        request.target,
+        request.swift_decl_generator,
+        request.symbol_filter,
+        request.symbol_name_generator,
+        request.doccomment_lookup,
+        request.doccomment_formatter,
+        request.directory_manager,
+        request.parser_backend,
+    ):
+        if obj is None:
+            continue
+
+        try:
+            source_file = inspect.getsourcefile(type(obj))
+        except TypeError:
+            source_file = None
+
+        if source_file is not None:
+            result.append(Path(source_file))
+
+    return result
+
+
+def _type_name(obj: object) -> str:
+    return f"{type(obj).__module__}.{type(obj).__qualname__}"
+
+
+def _request_configuration(request: TypeGeneratorRequest) -> list[str]:
+    """
+    Returns a description of the configuration of a request that influences
+    the contents of generated files. The first two entries are the paths of
+    the header file and destination folder.
+    """
+
+    return [
+        str(request.header_file.resolve()),
+        str(request.destination.resolve()),
+        sys.platform,
+        ",".join(request.prefixes),
+        ",".join(request.includes),
+        _type_name(request.swift_decl_generator),
+        _type_name(request.symbol_filter),
+        _type_name(request.symbol_name_generator),
+        _type_name(request.doccomment_lookup),
+        _type_name(request.doccomment_formatter),
+        _type_name(request.directory_manager),
+        _type_name(request.parser_backend),
+        ",".join(map(str, request.slice_allowlist or [])),
+        # Shared preprocessor output, e.g. of a batch's umbrella header, which
+        # can change without changing the request's own header file
+        "" if request.preprocessed_output is None else digest_bytes(request.preprocessed_output),
+    ]
+
+
+def _run_cache_for_request(request: TypeGeneratorRequest) -> RunCache | None:
+    if request.cache_folder is None or not request.target.supports_run_cache():
+        return None
+
+    configuration = _request_configuration(request)
+    configuration.append(_type_name(request.target))
+
+    return RunCache(
+        request.cache_folder,
+        key=f"{configuration[0]}|{configuration[1]}",
+        configuration=configuration,
+        source_files=_generator_source_files(request),
+        output_folder=request.destination,
+        output_pattern="*.swift",
+    )
+
+
+def _reporter_for_request(request: TypeGeneratorRequest) -> Reporter:
+    return request.reporter if request.reporter is not None else current_reporter()
+
+
+def _decl_cache_for_request(request: TypeGeneratorRequest) -> DeclCache | None:
+    if request.cache_folder is None:
+        return None
+
+    configuration = _request_configuration(request)
+
+    return DeclCache(
+        request.cache_folder,
+        key=f"{configuration[0]}|{configuration[1]}",
+        static_fingerprint=digest_files(
+            configuration, sorted(set(_generator_source_files(request)))
+        ),
+    )
+
+
+@dataclass
+class CollectedCDecls:
+    """
+    Result of the front end of the generator: the C declarations that Swift
+    declarations are generated from, and the files they were read from.
+    """
+
+    decls: "list[c_ast.Node]"
+    "C declarations whose names match the request's prefixes."
+
+    preprocessed_output: bytes | None = None
+    """
+    Raw output of the C preprocessor for the request's header file, for parser
+    backends that parse preprocessed text.
+    """
+
+    included_files: list[Path] | None = None
+    """
+    Files that contributed to the translation unit, for parser backends that
+    do not produce preprocessed text.
+    """
+
+    def include_closure(self) -> list[Path]:
+        "Returns the list of files that contributed to the parsed header."
+        if self.included_files is not None:
+            return list(self.included_files)
+
+        if self.preprocessed_output is None:
+            return []
+
+        return include_closure(
+            self.preprocessed_output.decode("utf-8", errors="replace"),
+            paths.SCRIPTS_ROOT_PATH,
+        )
+
+
+def collect_c_decls(request: TypeGeneratorRequest, profiler: StageProfiler) -> CollectedCDecls:
+    """
+    Runs the front end of the generator: parses the request's header file with
+    the request's parser backend, and collects the C declarations to generate
+    Swift declarations from.
+
+    Requests fall back to the pycparser backend if their backend is not
+    available, or fails to parse the header.
+    """
+
+    backend = request.parser_backend
+    if backend is None:
+        backend = PycparserBackend()
+    if isinstance(backend, PycparserBackend):
+        return backend.collect_c_decls(request, profiler)
+
+    reporter = current_reporter()
+
+    if not backend.is_available():
+        reporter.warning(
+            f"Warning: The {backend.name} parser backend is not available; falling back to pycparser."
+        )
+        return PycparserBackend().collect_c_decls(request, profiler)
+
+    try:
+        return backend.collect_c_decls(request, profiler)
+    except ParserBackendError as error:
+        reporter.warning(
+            f"Warning: The {backend.name} parser backend failed ({error}); falling back to pycparser."
+        )
+        return PycparserBackend().collect_c_decls(request, profiler)
+
+
+class PycparserBackend(ParserBackend):
+    """
+    Parses the output of the C preprocessor with pycparser. This is the default
+    backend, and the one other backends fall back to.
+    """
+
+    name = "pycparser"
+
+    def collection_source_files(self) -> list[Path]:
+        """
+        Returns the source files of the modules that shape the collected
+        declarations, which key the AST cache along with the preprocessed text.
+        """
+        from utils.cache import ast_cache
+        from utils.generator import chunked_parser, decl_collector_visitor
+        from utils.preprocessor import header_slicer, line_markers, top_level_decls
+
+        modules = [
+            sys.modules[__name__],
+            ast_cache,
+            chunked_parser,
+            decl_collector_visitor,
+            header_slicer,
+            line_markers,
+            top_level_decls,
+        ]
+
+        return [Path(inspect.getfile(module)) for module in modules]
+
+    def collect_c_decls(self, request: TypeGeneratorRequest, profiler: StageProfiler) -> CollectedCDecls:
+        from pycparser import c_parser
+
+        from utils.cache.ast_cache import AstCache
+        from utils.generator.chunked_parser import iter_parse_chunks, parse_chunked
+        from utils.generator.decl_collector_visitor import DeclCollectorVisitor
+        from utils.preprocessor.header_slicer import HeaderSlicer
+
+        stage_name = (
+            "Generating header file..."
+            if request.preprocessed_output is None
+            else "Using shared preprocessed header file..."
+        )
+        with profiler.stage(stage_name):
+            if request.preprocessed_output is not None:
+                output_file = request.preprocessed_output
+            else:
+                preprocessor_cache = (
+                    PreprocessorCache(request.cache_folder)
+                    if request.cache_folder is not None
+                    else None
+                )
+                output_file = run_c_preprocessor(request.header_file, preprocessor_cache)
+
+            # Windows-specific fix to replace some page feeds that are present in the original system headers
+            if sys.platform == "win32":
+                output_file = output_file.replace(b"\x0c", b"")
+
+            # Name of the translation unit, as reported by the parser
+            output_path = request.header_file.with_suffix(".i")
+            if request.write_preprocessed_file:
+                with open(output_path, "wb") as f:
+                    f.write(output_file)
+
+        ast_cache = (
+            AstCache(request.cache_folder, self.collection_source_files())
+            if request.cache_folder is not None
+            else None
+        )
+        output_digest = digest_bytes(output_file)
+        collection_key = list(request.prefixes)
+        if request.slice_allowlist is not None:
+            collection_key.extend(map(str, request.slice_allowlist))
+
+        if ast_cache is not None:
+            if (c_decls := ast_cache.lookup(output_digest, collection_key)) is not None:
+                with profiler.stage("Collecting C declarations (cached)...") as stage:
+                    stage.decl_count = len(c_decls)
+
+                return CollectedCDecls(c_decls, preprocessed_output=output_file)
+
+        # Decode in-memory, normalizing line breaks like reading the file in
+        # text mode would
+        text = output_file.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+        slicer = None
+        if request.slice_allowlist is not None:
+            with profiler.stage("Slicing generated header file..."):
+                slicer = HeaderSlicer(request.slice_allowlist, paths.SCRIPTS_ROOT_PATH)
+                text = slicer.slice(text)
+
+        if request.streaming:
+            with profiler.stage("Parsing and collecting C declarations (streaming)...") as stage:
+                visitor = DeclCollectorVisitor(prefixes=request.prefixes)
+
+                for nodes in iter_parse_chunks(text, str(output_path)):
+                    for node in nodes:
+                        visitor.visit(node)
+
+                c_decls = _allowed_decls(visitor.decls, slicer)
+
+                if ast_cache is not None:
+                    ast_cache.store(output_digest, collection_key, c_decls)
+
+                stage.decl_count = len(c_decls)
+        else:
+            with profiler.stage("Parsing generated header file...") as stage:
+                if request.jobs > 1:
+                    ast = parse_chunked(text, str(output_path), request.jobs)
+                else:
+                    ast = c_parser.CParser().parse(text, str(output_path))
+
+                stage.decl_count = len(ast.ext)
+
+            with profiler.stage("Collecting C declarations...") as stage:
+                visitor = DeclCollectorVisitor(prefixes=request.prefixes)
+                visitor.visit(ast)
+                c_decls = _allowed_decls(visitor.decls, slicer)
+
+                if ast_cache is not None:
+                    ast_cache.store(output_digest, collection_key, c_decls)
+
+                stage.decl_count = len(c_decls)
+
+        return CollectedCDecls(c_decls, preprocessed_output=output_file)
+
+
+def _allowed_decls(c_decls: "list[c_ast.Node]", slicer: "HeaderSlicer | None") -> "list[c_ast.Node]":
+    """
+    Returns the declarations of a list that originate from the allowlist of a
+    header slicer. The slicer keeps the typedefs and tags that allowed
+    declarations depend on from other files so the sliced header parses, but
+    those are not generated.
+    """
 
-    output_path = request.header_file.with_suffix(".i")
-    with open(output_path, "wb") as f:
-        f.write(output_file)
+    if slicer is None:
+        return c_decls
 
-    print_stage_name("Parsing generated header file...")
+    return [
+        decl for decl in c_decls
+        if decl.coord is None or slicer.is_allowed_file(decl.coord.file)
+    ]
 
-    ast = pycparser.parse_file(output_path, use_cpp=False)
 
-    print_stage_name("Collecting Swift type candidates...")
+def generate_from_c_decls(
+    request: TypeGeneratorRequest,
+    c_decls: "list[c_ast.Node]",
+    profiler: StageProfiler,
+    release_c_decls: bool = False,
+) -> list[SwiftFile]:
+    """
+    Runs the back end of the generator: generates, documents and merges Swift
+    declarations from a list of collected C declarations, and writes them to
+    the request's target. Returns the list of generated files.
 
-    visitor = DeclCollectorVisitor(prefixes=request.prefixes)
-    visitor.visit(ast)
+    If `release_c_decls` is True, `c_decls` is cleared once Swift declarations
+    are generated, releasing the C syntax tree for the rest of the run. Callers
+    that reuse the list across runs must leave it off.
+    """
 
     if request.swift_decl_generator is not None:
         converter = request.swift_decl_generator
@@ -310,37 +1050,46 @@ def generate_types(request: TypeGeneratorRequest) -> int:
             symbol_name_generator=request.symbol_name_generator,
         )
 
-    swift_decls = converter.generate_from_list(visitor.decls)
+    with profiler.stage("Collecting Swift type candidates...") as stage:
+        swift_decls = converter.generate_from_list(c_decls)
+        stage.decl_count = len(swift_decls)
 
-    print(f"Found {ConsoleColor.CYAN(len(swift_decls))} potential declarations")
+        if release_c_decls:
+            # Swift declarations only keep compact descriptors of their C
+            # nodes, so this releases what is left of the syntax tree
+            c_decls.clear()
 
-    print_stage_name("Generating doc comments...")
+    current_reporter().message(f"Found {ConsoleColor.CYAN(len(swift_decls))} potential declarations")
 
-    doccomment_lookup = request.doccomment_lookup if request.doccomment_lookup is not None else DoccommentLookup()
-    swift_decls = doccomment_lookup.populate_doc_comments(swift_decls)
+    with profiler.stage("Generating doc comments...") as stage:
+        doccomment_lookup = request.doccomment_lookup if request.doccomment_lookup is not None else DoccommentLookup()
+        swift_decls = doccomment_lookup.populate_doc_comments(swift_decls)
+        stage.decl_count = len(swift_decls)
 
-    print_stage_name("Merging generated Swift type declarations...")
+    with profiler.stage("Merging generated Swift type declarations...") as stage:
+        merger = SwiftDeclMerger()
+        swift_decls = merger.merge(swift_decls)
 
-    merger = SwiftDeclMerger()
-    swift_decls = merger.merge(swift_decls)
+        current_reporter().message(f"Merged down to {ConsoleColor.CYAN(len(swift_decls))} declarations")
 
-    print(f"Merged down to {ConsoleColor.CYAN(len(swift_decls))} declarations")
+        swift_decls = converter.post_merge(swift_decls)
+        stage.decl_count = len(swift_decls)
 
-    swift_decls = converter.post_merge(swift_decls)
+    decl_cache = _decl_cache_for_request(request)
+    preparer = _DeclPreparer(
+        request.doccomment_formatter, SwiftDeclLookup(swift_decls), decl_cache
+    )
+    pending_decls = swift_decls
 
-    if request.doccomment_formatter is not None:
-        print_stage_name("Formatting doc comments...")
+    if decl_cache is not None:
+        with profiler.stage("Fingerprinting declarations...") as stage:
+            pending_decls = preparer.reuse_cached(swift_decls)
+            stage.decl_count = len(swift_decls)
 
-        lookup = SwiftDeclLookup(swift_decls)
-        doc_visitor = SwiftDoccommentFormatterVisitor(
-            request.doccomment_formatter, lookup
+        current_reporter().message(
+            f"Reusing {ConsoleColor.CYAN(decl_cache.reused_count)} unchanged declaration(s), "
+            f"rendering {ConsoleColor.CYAN(len(pending_decls))}"
         )
-        walker = SwiftDeclWalker(doc_visitor)
-
-        for decl in swift_decls:
-            walker.walk_decl(decl)
-
-    print_stage_name("Generating files...")
 
     generator = DeclFileGenerator(
         request.destination,
@@ -349,9 +1098,227 @@ def generate_types(request: TypeGeneratorRequest) -> int:
         request.includes,
         request.directory_manager,
         verbose=True,
+        jobs=request.jobs,
+        rendered_decls=preparer.rendered_decls,
     )
-    generator.generate()
 
-    print(ConsoleColor.GREEN("Success!"))
+    if request.streaming:
+        # Declarations are final once merged, so files are formatted,
+        # rendered and released one at a time from here on
+        pending_count = len(pending_decls)
+        del swift_decls, pending_decls
+
+        with profiler.stage("Generating files (streaming)...") as stage:
+            files = generator.generate_streaming(preparer.prepare_file, preparer.release_file)
+
+            stage.decl_count = pending_count
+            stage.file_count = len(files)
+    else:
+        if request.doccomment_formatter is not None:
+            with profiler.stage("Formatting doc comments...") as stage:
+                preparer.format(pending_decls)
+                stage.decl_count = len(pending_decls)
+
+        with profiler.stage("Generating files...") as stage:
+            preparer.render(pending_decls, jobs=request.jobs)
+            files = generator.generate()
+
+            stage.decl_count = len(pending_decls)
+            stage.file_count = len(files)
+
+    if decl_cache is not None:
+        decl_cache.save()
+
+    return files
+
+
+@dataclass
+class TypeGeneratorResult:
+    """
+    Result of running the generator for a request in-process.
+    """
+
+    decls: list[SwiftDecl]
+    """
+    Merged top-level Swift declarations, in the order they were generated.
+    Empty if the run was skipped, or if the request was streamed, in which case
+    declarations are released as their files are written.
+    """
+
+    files: list[SwiftFile]
+    "Generated files. Empty if the run was skipped."
+
+    rendered_files: dict[Path, str] | None
+    """
+    Contents of generated files, keyed by path, if the request's target is a
+    `DeclFileGeneratorMemoryTarget`.
+    """
+
+    stages: list[StageTiming]
+    "Timings of the pipeline stages that ran."
+
+    messages: list[str]
+    "Progress messages reported during the run, including stage names."
+
+    warnings: list[str]
+    "Warnings reported during the run."
+
+    is_cached: bool
+    """
+    Whether the run was skipped because the inputs and outputs of the last
+    recorded run are unchanged.
+    """
+
+
+def run_type_generator(request: TypeGeneratorRequest) -> TypeGeneratorResult:
+    """
+    Runs the generator for a request and returns the generated declarations
+    and files, along with the timings and messages of the run.
+
+    The generator keeps no state between calls: every run creates its own
+    parser, visitors and caches, and messages are reported to the reporter of
+    the request or of the calling context. Runs can be repeated in the same
+    process, or made concurrently from several threads, as long as concurrent
+    requests write to different destinations and do not share customization
+    objects, such as doc comment lookups.
+    """
+    profiler = request.profiler if request.profiler is not None else StageProfiler()
+    first_stage = len(profiler.stages)
+
+    recorder = RecordingReporter(forward_to=_reporter_for_request(request))
+
+    def make_result(files: list[SwiftFile], is_cached: bool) -> TypeGeneratorResult:
+        rendered_files = None
+        if isinstance(request.target, DeclFileGeneratorMemoryTarget):
+            rendered_files = dict(request.target.files)
+
+        return TypeGeneratorResult(
+            decls=[decl for file in files for decl in file.decls],
+            files=files,
+            rendered_files=rendered_files,
+            stages=profiler.stages[first_stage:],
+            messages=recorder.messages,
+            warnings=recorder.warnings,
+            is_cached=is_cached,
+        )
+
+    with reporting(recorder):
+        run_cache = _run_cache_for_request(request)
+        if run_cache is not None:
+            with profiler.stage("Checking for changes...", announce=False):
+                is_up_to_date = run_cache.is_up_to_date()
+
+            if is_up_to_date:
+                return make_result([], is_cached=True)
+
+            run_cache.invalidate()
+
+        collected = collect_c_decls(request, profiler)
+        inputs = collected.include_closure() if run_cache is not None else []
+        c_decls = collected.decls
+
+        # Only the collected declarations are needed past this point
+        del collected
+
+        files = generate_from_c_decls(request, c_decls, profiler, release_c_decls=True)
+
+        if run_cache is not None:
+            run_cache.store(inputs, [file.path for file in files])
+
+    return make_result(files, is_cached=False)
+
+
+def generate_types(request: TypeGeneratorRequest) -> int:
+    result = run_type_generator(request)
+    reporter = _reporter_for_request(request)
+
+    if result.is_cached:
+        reporter.message(ConsoleColor.GREEN("Up to date!"))
+    else:
+        reporter.message(ConsoleColor.GREEN("Success!"))
+
+    if request.profiler is not None:
+        request.profiler.print_summary()
 
     return 0
+
+
+@dataclass
+class TypeGeneratorCheckResult:
+    """
+    Result of comparing the files a request would generate against the files
+    in its destination folder.
+    """
+
+    stale_paths: list[Path]
+    "Files whose contents on disk differ from the generated contents."
+
+    missing_paths: list[Path]
+    "Files that would be generated, but do not exist on disk."
+
+    extra_paths: list[Path]
+    "'.swift' files in the destination folder that would not be generated."
+
+    is_cached: bool
+    """
+    Whether the files were verified against the record of the last run,
+    without generating them.
+    """
+
+    def is_up_to_date(self) -> bool:
+        return (
+            len(self.stale_paths) == 0
+            and len(self.missing_paths) == 0
+            and len(self.extra_paths) == 0
+        )
+
+
+def check_types(request: TypeGeneratorRequest) -> TypeGeneratorCheckResult:
+    """
+    Verifies that the files in the request's destination folder match what the
+    request would generate, without writing to the destination folder.
+
+    If the inputs and outputs of the last recorded run are unchanged, the check
+    completes without running the generator. Otherwise, files are generated in
+    memory and compared to the files on disk.
+    """
+    profiler = request.profiler if request.profiler is not None else StageProfiler()
+
+    run_cache = _run_cache_for_request(request)
+    if run_cache is not None:
+        with profiler.stage("Checking for changes...", announce=False):
+            if run_cache.is_up_to_date():
+                return TypeGeneratorCheckResult([], [], [], is_cached=True)
+
+    target = DeclFileGeneratorMemoryTarget()
+    memory_request = dataclasses.replace(request, target=target)
+
+    # Nothing is written, so only warnings are reported; callers report the
+    # stale, missing and extra files
+    with reporting(QuietReporter(_reporter_for_request(request))):
+        collected = collect_c_decls(memory_request, profiler)
+        generate_from_c_decls(memory_request, collected.decls, profiler, release_c_decls=True)
+
+        with profiler.stage("Comparing generated files..."):
+            result = TypeGeneratorCheckResult([], [], [], is_cached=False)
+
+            generated_paths = set(map(os.path.abspath, target.files.keys()))
+            for path in sorted(request.destination.rglob("*.swift")):
+                if os.path.abspath(path) not in generated_paths:
+                    result.extra_paths.append(path)
+
+            for (path, contents) in target.files.items():
+                try:
+                    with open(path, "rb") as file:
+                        if file.read() != contents.encode("utf-8"):
+                            result.stale_paths.append(path)
+                except FileNotFoundError:
+                    result.missing_paths.append(path)
+
+    # Record the run, so following checks and generator runs can be skipped
+    # until the inputs or outputs change
+    if run_cache is not None and result.is_up_to_date():
+        run_cache.store(collected.include_closure(), list(target.files.keys()))
+
+    return result
+
@@ -0,0 +1,121 @@
+import json
+import socket
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+OUTPUT_MODES = ["files", "diff", "write"]
+"""
+Supported values of the 'output' field of 'generate' requests:
+
+- 'files': returns the contents of every generated file;
+- 'diff': returns a unified diff of the destination folder against the
+generated files, along with the list of files that differ;
+- 'write': writes changed files to the destination folder, removes stale ones,
+and returns the list of written and removed files.
+"""
+
+
+@dataclass(frozen=True)
+class GeneratorJob:
+    """
+    Parameters of a 'generate' request that override the corresponding fields
+    of the request the server is configured with. Fields that are None keep
+    their configured values.
+
+    In messages, paths should be absolute; relative paths are resolved against
+    the working directory of the server.
+    """
+
+    header_file: Path | None = None
+    "Header file to preprocess and parse. Sent as 'header'."
+
+    destination: Path | None = None
+    "Folder generated files are written to, or compared against. Sent as 'destination'."
+
+    prefixes: tuple[str, ...] | None = None
+    "Prefixes of the C declarations to generate Swift declarations for. Sent as 'prefixes'."
+
+    includes: tuple[str, ...] | None = None
+    "Modules imported by generated files. Sent as 'includes'."
+
+    slice_allowlist: tuple[Path, ...] | None = None
+    "Files and folders whose declarations are parsed. Sent as 'allowlist'."
+
+    def to_message(self) -> dict[str, Any]:
+        "Returns the fields of a 'generate' message that describe this job."
+
+        result: dict[str, Any] = dict()
+        if self.header_file is not None:
+            result["header"] = str(self.header_file)
+        if self.destination is not None:
+            result["destination"] = str(self.destination)
+        if self.prefixes is not None:
+            result["prefixes"] = list(self.prefixes)
+        if self.includes is not None:
+            result["includes"] = list(self.includes)
+        if self.slice_allowlist is not None:
+            result["allowlist"] = list(map(str, self.slice_allowlist))
+
+        return result
+
+    @staticmethod
+    def from_message(message: dict[str, Any]) -> "GeneratorJob":
+        """
+        Reads a job from the fields of a 'generate' message, raising a
+        `ValueError` if a field has an unexpected type.
+        """
+
+        def path(field: str) -> Path | None:
+            value = message.get(field)
+            if value is None:
+                return None
+            if not isinstance(value, str):
+                raise ValueError(f"Expected '{field}' to be a string.")
+
+            return Path(value).resolve()
+
+        def strings(field: str) -> tuple[str, ...] | None:
+            value = message.get(field)
+            if value is None:
+                return None
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f"Expected '{field}' to be a list of strings.")
+
+            return tuple(value)
+
+        allowlist = strings("allowlist")
+
+        return GeneratorJob(
+            header_file=path("header"),
+            destination=path("destination"),
+            prefixes=strings("prefixes"),
+            includes=strings("includes"),
+            slice_allowlist=(
+                None if allowlist is None else tuple(Path(p).resolve() for p in allowlist)
+            ),
+        )
+
+
+def send_request(socket_path: Path, message: dict[str, Any]) -> dict[str, Any]:
+    """
+    Sends a request to a running generator server and returns its reply.
+
+    Clients only depend on this module, so they do not pay for importing the
+    generator.
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(message).encode("utf-8") + b"\n")
+            stream.flush()
+
+            line = stream.readline()
+
+    if len(line) == 0:
+        raise ConnectionError("The generator server closed the connection without replying.")
+
+    return json.loads(line)
@@ -0,0 +1,344 @@
+import dataclasses
+import difflib
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+import traceback
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from utils.cli.console_color import ConsoleColor
+from utils.files.file_stamps import FileStamp, stamp_files
+from utils.generator.type_generator import (
+    CollectedCDecls,
+    DeclFileGeneratorIncrementalDiskTarget,
+    DeclFileGeneratorMemoryTarget,
+    TypeGeneratorRequest,
+    _request_configuration,
+    collect_c_decls,
+    generate_from_c_decls,
+)
+from utils.generator.type_generator_client import OUTPUT_MODES, GeneratorJob
+from utils.profiling.stage_profiler import StageProfiler
+
+
+@dataclass
+class _WarmState:
+    """
+    Parsed headers and generated files kept in memory for one request
+    configuration of a server.
+    """
+
+    request: TypeGeneratorRequest | None = None
+    "Request of the last run, whose doc comment caches are reused."
+
+    collected: CollectedCDecls | None = None
+
+    header_stamps: dict[Path, FileStamp | None] = field(default_factory=dict)
+    "Stamps of the include closure of the header file, as of the last run."
+
+    output: dict[Path, str] | None = None
+    "Contents of the generated files, keyed by path, or None if stale."
+
+
+class TypeGeneratorServer:
+    """
+    Serves generator requests over a Unix domain socket, keeping preprocessed
+    and parsed headers, doc comments and generated files in memory between
+    requests.
+
+    The protocol is line-based: clients send one JSON object per line, and the
+    server replies to each with one JSON object per line. Supported requests
+    are:
+
+    - `{"command": "generate", "output": "files" | "diff" | "write", ...}`,
+    optionally with the `"header"`, `"destination"`, `"prefixes"`,
+    `"includes"` and `"allowlist"` fields of a `GeneratorJob`;
+    - `{"command": "ping"}`;
+    - `{"command": "shutdown"}`.
+
+    Replies contain an `"ok"` field, and an `"error"` message when `"ok"` is
+    false.
+
+    Generation is configured by `request_factory`, which creates the request
+    for a job and is expected to reload the configuration files. Parsed
+    headers and outputs are kept per request configuration, so clients
+    alternating between jobs keep their warm state, and outputs are reused as
+    long as none of the header files, configuration files or generator
+    modules changed. Changes to files in `restart_files`, such as the
+    generator's own modules, restart the server process instead, after
+    failing the request that noticed them.
+    """
+
+    socket_path: Path
+    request_factory: Callable[[GeneratorJob], TypeGeneratorRequest]
+    config_files: list[Path]
+    restart_files: list[Path]
+
+    def __init__(
+        self,
+        socket_path: Path,
+        request_factory: Callable[[GeneratorJob], TypeGeneratorRequest],
+        config_files: list[Path],
+        restart_files: list[Path],
+    ):
+        self.socket_path = socket_path
+        self.request_factory = request_factory
+        self.config_files = config_files
+        self.restart_files = restart_files
+
+        self._config_stamps: dict[Path, FileStamp | None] = dict()
+        self._restart_stamps = stamp_files(restart_files)
+        self._states: dict[tuple[str, ...], _WarmState] = dict()
+        self._job_configurations: dict[GeneratorJob, tuple[str, ...]] = dict()
+        self._is_running = False
+        self._needs_restart = False
+
+    def serve(self):
+        "Serves requests until a 'shutdown' request is received."
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not supported on this platform.")
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+
+        server = self
+        self._is_running = True
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if len(line.strip()) == 0:
+                        continue
+
+                    response = server.handle_line(line)
+
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+                    if not server._is_running:
+                        break
+
+        with socketserver.UnixStreamServer(str(self.socket_path), Handler) as unix_server:
+            print(f"Listening on {ConsoleColor.MAGENTA(self.socket_path)}...")
+
+            try:
+                while self._is_running:
+                    unix_server.handle_request()
+
+                    if self._needs_restart:
+                        print(ConsoleColor.YELLOW("Generator sources changed; restarting..."))
+                        sys.stdout.flush()
+                        unix_server.server_close()
+                        self.socket_path.unlink(missing_ok=True)
+
+                        os.execv(sys.executable, [sys.executable] + sys.argv)
+            finally:
+                self.socket_path.unlink(missing_ok=True)
+
+    def handle_line(self, line: bytes) -> dict[str, Any]:
+        "Handles a single JSON request line, returning the JSON reply."
+
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("Expected a JSON object.")
+
+            return self.handle(message)
+        except Exception as error:
+            traceback.print_exc()
+            return {"ok": False, "error": f"{type(error).__name__}: {error}"}
+
+    def handle(self, message: dict[str, Any]) -> dict[str, Any]:
+        match message.get("command"):
+            case "ping":
+                return {"ok": True}
+
+            case "shutdown":
+                self._is_running = False
+                return {"ok": True}
+
+            case "generate":
+                output = message.get("output", "files")
+                if output not in OUTPUT_MODES:
+                    raise ValueError(f"Unknown output mode '{output}', expected one of {OUTPUT_MODES}.")
+
+                return self.generate(output, GeneratorJob.from_message(message))
+
+            case command:
+                raise ValueError(f"Unknown command '{command}'.")
+
+    def generate(self, output: str, job: GeneratorJob = GeneratorJob()) -> dict[str, Any]:
+        start = time.perf_counter()
+
+        if stamp_files(self.restart_files) != self._restart_stamps:
+            self._needs_restart = True
+            self._is_running = False
+            return {"ok": False, "error": "Generator sources changed; the server is restarting, retry the request."}
+
+        (files, destination, is_cached) = self._generated_files(job)
+
+        result: dict[str, Any] = {"ok": True, "cached": is_cached}
+
+        match output:
+            case "files":
+                result["files"] = {
+                    _relative_path(path, destination): contents
+                    for (path, contents) in files.items()
+                }
+
+            case "diff":
+                (diff, changed) = _diff_against_disk(destination, files)
+                result["diff"] = diff
+                result["changed"] = changed
+
+            case "write":
+                target = DeclFileGeneratorIncrementalDiskTarget(destination, verbose=False)
+                target.prepare()
+                for (path, contents) in files.items():
+                    target.write_file(path, contents)
+                target.finish()
+
+                result["written"] = [_relative_path(p, destination) for p in target.written_paths]
+                result["removed"] = [_relative_path(p, destination) for p in target.removed_paths]
+                result["unchanged"] = len(target.unchanged_paths)
+
+        result["elapsed_ms"] = (time.perf_counter() - start) * 1000
+
+        return result
+
+    def _generated_files(self, job: GeneratorJob) -> tuple[dict[Path, str], Path, bool]:
+        """
+        Returns the contents of the generated files for a job, keyed by path,
+        for the current state of the input files, along with the destination
+        folder of the job and whether the files were reused from a previous
+        request.
+        """
+
+        config_stamps = stamp_files(self.config_files)
+        if config_stamps != self._config_stamps:
+            # Configuration changes can change the output of, and the
+            # configuration created for, every job. Stamps are taken before
+            # generating, so changes made during generation are picked up by
+            # the next request.
+            self._config_stamps = config_stamps
+            self._job_configurations.clear()
+            for warm in self._states.values():
+                warm.output = None
+
+        # Jobs are mapped to their request configuration once per
+        # configuration change, so reused outputs do not pay for reloading
+        # the configuration files
+        configuration = self._job_configurations.get(job)
+        state = self._states.get(configuration) if configuration is not None else None
+
+        if state is not None and state.output is not None and state.request is not None:
+            stamps = stamp_files(state.header_stamps.keys())
+            if stamps == state.header_stamps:
+                return (state.output, state.request.destination, True)
+
+        target = DeclFileGeneratorMemoryTarget()
+        request = dataclasses.replace(self.request_factory(job), target=target)
+        profiler = request.profiler if request.profiler is not None else StageProfiler()
+
+        configuration = tuple(_request_configuration(request))
+        self._job_configurations[job] = configuration
+        state = self._states.setdefault(configuration, _WarmState())
+
+        stamps = stamp_files(state.header_stamps.keys())
+        changed_headers = [
+            path for (path, stamp) in stamps.items() if state.header_stamps.get(path) != stamp
+        ]
+
+        if (
+            state.output is not None
+            and state.request is not None
+            and len(changed_headers) == 0
+        ):
+            return (state.output, state.request.destination, True)
+
+        state.output = None
+
+        previous = state.request
+        if (
+            previous is not None
+            and previous.doccomment_lookup is not None
+            and request.doccomment_lookup is not None
+        ):
+            request.doccomment_lookup.reuse_caches(
+                previous.doccomment_lookup, stale_files=changed_headers
+            )
+
+        if state.collected is None or len(changed_headers) > 0:
+            state.collected = collect_c_decls(request, profiler)
+
+            headers = state.collected.include_closure()
+            stamps.update(stamp_files(p for p in headers if p not in stamps))
+            stamps = {p: stamps[p] for p in headers}
+
+        generate_from_c_decls(request, state.collected.decls, profiler)
+
+        state.request = request
+        state.header_stamps = stamps
+        state.output = target.files
+
+        return (state.output, request.destination, False)
+
+
+def _relative_path(path: Path, destination: Path) -> str:
+    try:
+        return path.relative_to(destination).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _diff_against_disk(destination: Path, files: dict[Path, str]) -> tuple[str, list[str]]:
+    diff: list[str] = []
+    changed: list[str] = []
+
+    generated_paths = set(map(os.path.abspath, files.keys()))
+    stale_paths = sorted(
+        path
+        for path in destination.rglob("*.swift")
+        if os.path.abspath(path) not in generated_paths
+    )
+
+    for (path, contents) in files.items():
+        try:
+            existing = path.read_text(encoding="utf-8")
+        except OSError:
+            existing = None
+
+        if existing == contents:
+            continue
+
+        name = _relative_path(path, destination)
+        changed.append(name)
+        diff.extend(
+            difflib.unified_diff(
+                [] if existing is None else existing.splitlines(keepends=True),
+                contents.splitlines(keepends=True),
+                fromfile="/dev/null" if existing is None else f"a/{name}",
+                tofile=f"b/{name}",
+            )
+        )
+
+    for path in stale_paths:
+        name = _relative_path(path, destination)
+        changed.append(name)
+        diff.extend(
+            difflib.unified_diff(
+                path.read_text(encoding="utf-8").splitlines(keepends=True),
+                [],
+                fromfile=f"a/{name}",
+                tofile="/dev/null",
+            )
+        )
+
+    return ("".join(diff), changed)
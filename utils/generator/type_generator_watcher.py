@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import traceback
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from utils.cli.console_color import ConsoleColor
+from utils.files.file_stamps import FileStamp, stamp_files
+from utils.generator.type_generator import (
+    CollectedCDecls,
+    TypeGeneratorRequest,
+    collect_c_decls,
+    generate_from_c_decls,
+)
+from utils.profiling.stage_profiler import StageProfiler
+
+
+@dataclass
+class WatchedChanges:
+    """
+    Files that changed between two polls of a `TypeGeneratorWatcher`.
+    """
+
+    headers: list[Path]
+    "Changed files from the include closure of the header file."
+
+    config_files: list[Path]
+    "Changed generator configuration files."
+
+    restart_files: list[Path]
+    "Changed files that require the process to restart."
+
+    def is_empty(self) -> bool:
+        return (
+            len(self.headers) == 0
+            and len(self.config_files) == 0
+            and len(self.restart_files) == 0
+        )
+
+
+class TypeGeneratorWatcher:
+    """
+    Regenerates types whenever the include closure of a header file, or the
+    generator's configuration, changes on disk.
+
+    The C declarations collected by the front end of the generator and the
+    file contents cached by the doc comment lookup are kept in memory between
+    runs: edits to configuration files only rerun the back end, while edits to
+    headers rerun the whole pipeline but keep doc comments of unchanged
+    headers.
+
+    A new request is obtained from `request_factory` before every run, which
+    is expected to reload the configuration files. Changes to files in
+    `restart_files`, such as the generator's own modules, cannot be reloaded
+    in-process and restart the process with the same arguments instead.
+    """
+
+    request_factory: Callable[[], TypeGeneratorRequest]
+    config_files: list[Path]
+    restart_files: list[Path]
+    interval: float
+
+    def __init__(
+        self,
+        request_factory: Callable[[], TypeGeneratorRequest],
+        config_files: list[Path],
+        restart_files: list[Path],
+        interval: float = 0.25,
+    ):
+        self.request_factory = request_factory
+        self.config_files = config_files
+        self.restart_files = restart_files
+        self.interval = interval
+
+        self._collected: CollectedCDecls | None = None
+        self._headers: list[Path] = []
+        self._previous_request: TypeGeneratorRequest | None = None
+        self._stamps: dict[Path, FileStamp | None] = dict()
+
+    def run(self):
+        "Generates types, then watches for changes until interrupted."
+
+        self._regenerate(WatchedChanges([], [], []))
+
+        while True:
+            print(ConsoleColor.YELLOW(f"Watching {len(self._stamps)} file(s) for changes..."))
+
+            changes = self._wait_for_changes()
+
+            if len(changes.restart_files) > 0:
+                self._print_changes("Generator sources changed", changes.restart_files)
+                print(ConsoleColor.YELLOW("Restarting..."))
+                sys.stdout.flush()
+
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+
+            if len(changes.headers) > 0:
+                self._print_changes("Headers changed", changes.headers)
+            if len(changes.config_files) > 0:
+                self._print_changes("Configuration changed", changes.config_files)
+
+            self._regenerate(changes)
+
+    def _regenerate(self, changes: WatchedChanges):
+        start = time.perf_counter()
+
+        # Stamp files before the run, so edits made during it are picked up by
+        # the next poll.
+        stamps = stamp_files(self._watched_files())
+
+        try:
+            request = self.request_factory()
+            profiler = request.profiler if request.profiler is not None else StageProfiler()
+
+            previous = self._previous_request
+            if (
+                previous is not None
+                and previous.doccomment_lookup is not None
+                and request.doccomment_lookup is not None
+            ):
+                request.doccomment_lookup.reuse_caches(
+                    previous.doccomment_lookup, stale_files=changes.headers
+                )
+
+            if self._collected is None or len(changes.headers) > 0:
+                self._collected = collect_c_decls(request, profiler)
+                self._headers = self._collected.include_closure()
+
+            generate_from_c_decls(request, self._collected.decls, profiler)
+
+            self._previous_request = request
+            profiler.print_summary()
+
+            elapsed = (time.perf_counter() - start) * 1000
+            print(ConsoleColor.GREEN(f"Success! ({elapsed:.0f} ms)"))
+        except Exception:
+            traceback.print_exc()
+            print(ConsoleColor.RED("Generation failed; waiting for further changes."))
+
+            # Collect declarations again on the next run, in case the failure
+            # happened halfway through collecting them.
+            if len(changes.headers) > 0:
+                self._collected = None
+
+        # Headers that were not part of the previous include closure
+        new_headers = [p for p in self._headers if p not in stamps]
+        stamps.update(stamp_files(new_headers))
+
+        self._stamps = stamps
+
+    def _watched_files(self) -> list[Path]:
+        return self._headers + self.config_files + self.restart_files
+
+    def _wait_for_changes(self) -> WatchedChanges:
+        while True:
+            time.sleep(self.interval)
+
+            stamps = stamp_files(self._stamps.keys())
+            changed = set(
+                path for (path, stamp) in stamps.items() if self._stamps.get(path) != stamp
+            )
+
+            if len(changed) == 0:
+                continue
+
+            self._stamps = stamps
+
+            changes = WatchedChanges(
+                headers=[p for p in self._headers if p in changed],
+                config_files=[p for p in self.config_files if p in changed],
+                restart_files=[p for p in self.restart_files if p in changed],
+            )
+            if not changes.is_empty():
+                return changes
+
+    def _print_changes(self, title: str, files: list[Path]):
+        names = ", ".join(map(lambda p: p.name, files))
+        print(f"{ConsoleColor.YELLOW(title)}: {ConsoleColor.MAGENTA(names)}")
@@ -0,0 +1,116 @@
+import os
+
+from pathlib import Path
+
+from utils.preprocessor.line_markers import line_directive
+from utils.preprocessor.top_level_decls import TopLevelDecl, split_top_level_decls
+
+
+class HeaderSlicer:
+    """
+    Slices a preprocessed translation unit down to the declarations that
+    originate from an allowlist of files and folders, along with the typedefs
+    and tagged type definitions from other files that those declarations
+    transitively depend on.
+
+    Declarations are attributed to files using the `#line` directives emitted by
+    the preprocessor, and every declaration that is kept is prefixed with a
+    `#line` directive so parsed coordinates match the original ones.
+    """
+
+    allowlist: list[str]
+    base_path: Path
+
+    def __init__(self, allowlist: list[Path], base_path: Path):
+        self.allowlist = list(map(lambda p: os.path.abspath(p), allowlist))
+        self.base_path = base_path
+        self._allowed_cache: dict[str, bool] = dict()
+
+    def is_allowed_file(self, file: str) -> bool:
+        "Returns True if declarations from a given `#line` file name are kept unconditionally."
+        cached = self._allowed_cache.get(file)
+        if cached is not None:
+            return cached
+
+        path = os.path.abspath(self.base_path.joinpath(file))
+        result = False
+        for entry in self.allowlist:
+            if path == entry or path.startswith(entry + os.sep):
+                result = True
+                break
+
+        self._allowed_cache[file] = result
+
+        return result
+
+    def kept_decls(self, decls: list[TopLevelDecl]) -> list[TopLevelDecl]:
+        "Returns the subset of `decls` that should be kept, in their original order."
+
+        # Index declarations that provide type names and tag definitions
+        typedef_providers: dict[str, list[int]] = dict()
+        tag_providers: dict[tuple[str, str], list[int]] = dict()
+
+        for (index, decl) in enumerate(decls):
+            for name in decl.typedef_names:
+                typedef_providers.setdefault(name, []).append(index)
+            for tag in decl.defined_tags():
+                tag_providers.setdefault(tag, []).append(index)
+
+        kept: set[int] = set()
+        pending: list[int] = []
+
+        for (index, decl) in enumerate(decls):
+            if self.is_allowed_file(decl.file):
+                kept.add(index)
+                pending.append(index)
+
+        # Transitively keep the providers of every referenced type name and tag
+        while len(pending) > 0:
+            decl = decls[pending.pop()]
+            dependencies: list[int] = []
+
+            for identifier in decl.referenced_identifiers():
+                dependencies.extend(typedef_providers.get(identifier, []))
+            for tag in decl.referenced_tags():
+                dependencies.extend(tag_providers.get(tag, []))
+
+            for dependency in dependencies:
+                if dependency not in kept:
+                    kept.add(dependency)
+                    pending.append(dependency)
+
+        return [decls[index] for index in sorted(kept)]
+
+    def slice(self, text: str) -> str:
+        "Returns the sliced contents of a preprocessed translation unit."
+
+        decls = split_top_level_decls(text)
+        kept = self.kept_decls(decls)
+        result: list[str] = []
+
+        # Runs of declarations that are adjacent in the original translation
+        # unit are copied verbatim, along with their interleaved directives;
+        # a '#line' directive is only needed at the start of each run.
+        index_of = {id(decl): index for (index, decl) in enumerate(decls)}
+        run_start: TopLevelDecl | None = None
+        previous_index = -2
+
+        for decl in kept:
+            index = index_of[id(decl)]
+
+            if index != previous_index + 1:
+                if run_start is not None:
+                    result.append("\n")
+
+                result.append(line_directive(decl.file, decl.line))
+                result.append(" " * decl.column)
+                result.append(text[decl.start : decl.end])
+                run_start = decl
+            else:
+                result.append(text[decls[previous_index].end : decl.end])
+
+            previous_index = index
+
+        result.append("\n")
+
+        return "".join(result)
@@ -0,0 +1,85 @@
+import re
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+_LINE_MARKER_REGEX = re.compile(
+    r'^#[ \t]*(?:line[ \t]+)?(\d+)[ \t]+"((?:[^"\\\n]|\\.)*)"[^\n]*$', re.MULTILINE
+)
+"""
+Matches both `#line <n> "<file>"` directives (clang -fuse-line-directives and
+MSVC) and GCC-style `# <n> "<file>" <flags>` line markers.
+"""
+
+
+@dataclass(frozen=True)
+class LineMarker:
+    """
+    A `#line` directive found in the output of a C preprocessor.
+    """
+
+    line: int
+    "Line number the next line of the preprocessed output corresponds to."
+
+    file: str
+    "File name referenced by the directive, with escape sequences resolved."
+
+    start: int
+    "Index of the first character of the directive in the preprocessed output."
+
+    end: int
+    "Index one past the last character of the directive in the preprocessed output."
+
+    def is_pseudo_file(self) -> bool:
+        """
+        Returns True if this marker references a preprocessor pseudo-file, such
+        as `<built-in>` or `<command line>`, instead of a file on disk.
+        """
+        return self.file.startswith("<") and self.file.endswith(">")
+
+
+def _unescape(file_name: str) -> str:
+    return re.sub(r"\\(.)", r"\1", file_name)
+
+
+def line_directive(file: str, line: int) -> str:
+    "Returns a `#line` directive, terminated by a line break, for a given file and line."
+
+    escaped = file.replace("\\", "\\\\").replace('"', '\\"')
+
+    return f'#line {line} "{escaped}"\n'
+
+
+def iterate_line_markers(text: str) -> Iterator[LineMarker]:
+    "Iterates over every `#line` directive in a preprocessed translation unit."
+
+    for match in _LINE_MARKER_REGEX.finditer(text):
+        yield LineMarker(
+            line=int(match.group(1)),
+            file=_unescape(match.group(2)),
+            start=match.start(),
+            end=match.end(),
+        )
+
+
+def include_closure(text: str, base_path: Path) -> list[Path]:
+    """
+    Returns the list of files that contributed to a preprocessed translation
+    unit, in order of first appearance, as referenced by its `#line` directives.
+
+    Relative file names are resolved against `base_path`, which should be the
+    working directory the preprocessor was invoked from.
+    """
+
+    seen: set[str] = set()
+    result: list[Path] = []
+
+    for marker in iterate_line_markers(text):
+        if marker.file in seen or marker.is_pseudo_file():
+            continue
+
+        seen.add(marker.file)
+        result.append(base_path.joinpath(marker.file))
+
+    return result
@@ -0,0 +1,282 @@
+import bisect
+import re
+
+from dataclasses import dataclass, field
+
+from utils.preprocessor.line_markers import LineMarker, iterate_line_markers
+
+_TOKEN_REGEX = re.compile(
+    r"""
+    "(?:[^"\\\n]|\\.)*"         # String literals
+    | '(?:[^'\\\n]|\\.)*'       # Character literals
+    | ^[ \t]*\#[^\n]*           # Preprocessor directives (#line, #pragma)
+    | [{}();]
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+_IDENTIFIER_REGEX = re.compile(r"[A-Za-z_]\w*")
+_DIRECTIVE_REGEX = re.compile(r"^[ \t]*#[^\n]*", re.MULTILINE)
+_TAG_REFERENCE_REGEX = re.compile(r"\b(struct|union|enum)\s+([A-Za-z_]\w*)")
+_DECLARATOR_NOISE = {
+    "const",
+    "volatile",
+    "restrict",
+    "__restrict",
+    "__restrict__",
+    "__cdecl",
+    "__stdcall",
+    "__fastcall",
+}
+
+
+@dataclass
+class TopLevelDecl:
+    """
+    A top-level declaration (or function definition) in a preprocessed C
+    translation unit, along with the source location it originates from, as
+    indicated by the preceding `#line` directives.
+    """
+
+    start: int
+    "Index of the first character of this declaration in the translation unit."
+
+    end: int
+    "Index one past the terminating ';' or '}' of this declaration."
+
+    file: str
+    "File this declaration originates from, or an empty string if unknown."
+
+    line: int
+    "Line in `self.file` where this declaration starts."
+
+    column: int
+    "Zero-based column of `self.start` on its line of the translation unit."
+
+    text: str
+    "Source text of this declaration, including any interleaved directives."
+
+    typedef_names: list[str] = field(default_factory=list)
+    "List of type names declared by this declaration, if it is a typedef."
+
+    def code(self) -> str:
+        "Returns the text of this declaration, stripped of preprocessor directives."
+        return _DIRECTIVE_REGEX.sub("", self.text)
+
+    def is_typedef(self) -> bool:
+        return len(self.typedef_names) > 0
+
+    def referenced_identifiers(self) -> set[str]:
+        "Returns the set of identifiers referenced anywhere in this declaration."
+        return set(_IDENTIFIER_REGEX.findall(self.code()))
+
+    def referenced_tags(self) -> set[tuple[str, str]]:
+        "Returns the set of `(keyword, name)` struct, union and enum tags referenced by this declaration."
+        return set(_TAG_REFERENCE_REGEX.findall(self.code()))
+
+    def defined_tags(self) -> set[tuple[str, str]]:
+        """
+        Returns the set of `(keyword, name)` struct, union and enum tags whose
+        body is defined by this declaration.
+        """
+        code = self.code()
+        result = set()
+
+        for match in _TAG_REFERENCE_REGEX.finditer(code):
+            if code[match.end() :].lstrip().startswith("{"):
+                result.add((match.group(1), match.group(2)))
+
+        return result
+
+
+class LineMarkerIndex:
+    """
+    Maps character offsets of a preprocessed translation unit back to the
+    file and line they originate from.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.markers: list[LineMarker] = list(iterate_line_markers(text))
+        self._marker_starts = list(map(lambda m: m.start, self.markers))
+
+    def marker_at(self, offset: int) -> LineMarker | None:
+        "Returns the last line marker that precedes a given offset."
+        index = bisect.bisect_right(self._marker_starts, offset) - 1
+        if index < 0:
+            return None
+
+        return self.markers[index]
+
+    def location_at(self, offset: int) -> tuple[str, int]:
+        "Returns the `(file, line)` a given offset originates from."
+        marker = self.marker_at(offset)
+        if marker is None:
+            return ("", self.text.count("\n", 0, offset) + 1)
+
+        return (marker.file, marker.line + self.text.count("\n", marker.end, offset) - 1)
+
+
+def typedef_names_in(code: str) -> list[str]:
+    """
+    Returns the type names declared by a top-level declaration's code, if the
+    declaration is a typedef, otherwise returns an empty list.
+
+    This is a light-weight scan that does not require a full parse: bodies of
+    tagged types, array dimensions and parameter lists are skipped over, and
+    each remaining comma-separated declarator contributes its identifier.
+    """
+    head = code.split("{", 1)[0]
+    if "typedef" not in _IDENTIFIER_REGEX.findall(head):
+        return []
+
+    # Strip bracketed contents, keeping parenthesis to inspect declarators
+    flattened = _remove_nested(code, "{", "}")
+    flattened = _remove_nested(flattened, "[", "]")
+    flattened = flattened.rstrip().rstrip(";")
+
+    result = []
+    for declarator in _split_top_level_commas(flattened):
+        if name := _declarator_name(declarator):
+            result.append(name)
+
+    return result
+
+
+def split_top_level_decls(text: str) -> list[TopLevelDecl]:
+    """
+    Splits a preprocessed translation unit into its top-level declarations.
+
+    Declarations end at a ';' outside of any braces or parenthesis, or at the
+    closing brace of a function definition.
+    """
+    index = LineMarkerIndex(text)
+    result: list[TopLevelDecl] = []
+
+    brace_depth = 0
+    paren_depth = 0
+    start = 0
+    # Whether the last significant token before an opening brace at depth 0
+    # was a closing parenthesis, indicating a function body.
+    is_function_body = False
+    last_token = ""
+
+    def close(end: int):
+        nonlocal start
+
+        decl_start = _skip_blank_and_directives(text, start, end)
+        if decl_start < end:
+            (file, line) = index.location_at(decl_start)
+            column = decl_start - (text.rfind("\n", 0, decl_start) + 1)
+            decl_text = text[start:end]
+
+            result.append(
+                TopLevelDecl(
+                    start=decl_start,
+                    end=end,
+                    file=file,
+                    line=line,
+                    column=column,
+                    text=decl_text,
+                    typedef_names=typedef_names_in(_DIRECTIVE_REGEX.sub("", decl_text)),
+                )
+            )
+
+        start = end
+
+    for match in _TOKEN_REGEX.finditer(text):
+        token = match.group()
+        if token[0] in "\"'" or token.lstrip().startswith("#"):
+            continue
+
+        match token:
+            case "(":
+                paren_depth += 1
+            case ")":
+                paren_depth -= 1
+            case "{":
+                if brace_depth == 0:
+                    is_function_body = last_token == ")" and paren_depth == 0
+                brace_depth += 1
+            case "}":
+                brace_depth -= 1
+                if brace_depth == 0 and is_function_body:
+                    is_function_body = False
+                    close(match.end())
+            case ";":
+                if brace_depth == 0 and paren_depth == 0:
+                    close(match.end())
+
+        last_token = token
+
+    return result
+
+
+def _skip_blank_and_directives(text: str, start: int, end: int) -> int:
+    index = start
+    while index < end:
+        char = text[index]
+        if char.isspace():
+            index += 1
+        elif char == "#":
+            newline = text.find("\n", index, end)
+            index = end if newline == -1 else newline + 1
+        else:
+            break
+
+    return index
+
+
+def _remove_nested(text: str, open_char: str, close_char: str) -> str:
+    result = []
+    depth = 0
+    for char in text:
+        if char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+        elif depth == 0:
+            result.append(char)
+
+    return "".join(result)
+
+
+def _split_top_level_commas(text: str) -> list[str]:
+    result = []
+    depth = 0
+    current: list[str] = []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            result.append("".join(current))
+            current = []
+            continue
+
+        current.append(char)
+
+    result.append("".join(current))
+
+    return result
+
+
+def _declarator_name(declarator: str) -> str | None:
+    paren = declarator.find("(")
+    if paren == -1:
+        identifiers = _IDENTIFIER_REGEX.findall(declarator)
+        return identifiers[-1] if len(identifiers) > 0 else None
+
+    before = declarator[:paren].rstrip()
+    is_pointer_declarator = declarator[paren + 1 :].lstrip().startswith(("*", "^"))
+    if not is_pointer_declarator and len(before) > 0 and (before[-1].isalnum() or before[-1] == "_"):
+        # Function type declarator: 'typedef int name(args)'
+        return _IDENTIFIER_REGEX.findall(before)[-1]
+
+    # Parenthesized declarator: 'typedef int (*name)(args)'
+    for identifier in _IDENTIFIER_REGEX.findall(declarator[paren:]):
+        if identifier not in _DECLARATOR_NOISE:
+            return identifier
+
+    return None
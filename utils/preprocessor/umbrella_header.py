@@ -0,0 +1,55 @@
+import os
+
+from pathlib import Path
+
+from utils.cache.file_digest import digest_strings
+from utils.files.atomic_write import write_text_atomic
+
+
+def umbrella_header(headers: list[Path]) -> str:
+    """
+    Returns the contents of an umbrella header that includes every header in
+    `headers` by absolute path, in order, skipping repeated headers.
+
+    Headers are included by absolute path so that the `#line` directives of
+    the preprocessed umbrella header name files the same way as when each
+    header is preprocessed on its own.
+    """
+
+    seen: set[str] = set()
+    lines = ["// Umbrella header generated by generate_types.py --batch-preprocess\n"]
+
+    for header in headers:
+        path = os.path.abspath(header)
+        if path in seen:
+            continue
+
+        seen.add(path)
+        lines.append(f'#include "{path}"\n')
+
+    return "".join(lines)
+
+
+def write_umbrella_header(headers: list[Path], folder: Path) -> Path:
+    """
+    Writes an umbrella header for a list of headers to a folder, and returns
+    its path.
+
+    The file name is derived from the list of headers, and the file is only
+    rewritten if its contents change, so the preprocessor and run caches, which
+    record it as part of the include closure, stay valid across batches of the
+    same headers.
+    """
+
+    contents = umbrella_header(headers)
+    path = folder.joinpath(f"umbrella-{digest_strings([contents])[:16]}.h")
+
+    try:
+        if path.read_text(encoding="utf-8") == contents:
+            return path
+    except OSError:
+        pass
+
+    write_text_atomic(path, contents)
+
+    return path
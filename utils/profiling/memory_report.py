@@ -0,0 +1,209 @@
+import gc
+import sys
+import tracemalloc
+
+from collections import Counter
+from dataclasses import dataclass, field
+
+from pycparser import c_ast
+
+from utils.cli.console_color import ConsoleColor
+from utils.data.c_decl_descriptors import CFieldDescriptor
+from utils.data.compound_symbol_name import CompoundSymbolName
+from utils.data.swift_decls import SwiftDecl
+from utils.doccomment.doccomment_block import DoccommentBlock
+from utils.profiling.pipeline_hooks import PipelineHook, Span
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore
+
+TRACKED_TYPES: list[tuple[str, type]] = [
+    ("c_ast.Node", c_ast.Node),
+    ("CFieldDescriptor", CFieldDescriptor),
+    ("SwiftDecl", SwiftDecl),
+    ("CompoundSymbolName", CompoundSymbolName),
+    ("CompoundSymbolName.Component", CompoundSymbolName.Component),
+    ("DoccommentBlock", DoccommentBlock),
+]
+"Types whose live instances are counted at the end of every stage."
+
+
+@dataclass
+class StageMemory:
+    """
+    Memory usage recorded at the end of a pipeline stage.
+    """
+
+    name: str
+    "Name of the stage."
+
+    traced_size: int
+    "Size, in bytes, of memory blocks traced by tracemalloc at the end of the stage."
+
+    traced_peak: int
+    "Peak size, in bytes, of memory blocks traced by tracemalloc during the stage."
+
+    max_rss: int | None
+    """
+    Peak resident set size of the process so far, in bytes, or None if not
+    available on the current platform.
+    """
+
+    object_counts: dict[str, int] = field(default_factory=dict)
+    "Number of live instances of each of `TRACKED_TYPES`."
+
+
+class MemoryReport(PipelineHook):
+    """
+    Pipeline hook that records memory usage at every stage boundary, using
+    tracemalloc snapshots and the peak resident set size of the process.
+
+    Tracing allocations slows down the pipeline considerably, so this is only
+    meant to be enabled on demand.
+    """
+
+    stages: list[StageMemory]
+    top_count: int
+    frame_count: int
+
+    def __init__(self, top_count: int = 10, frame_count: int = 1):
+        self.stages = []
+        self.top_count = top_count
+        self.frame_count = frame_count
+        self._peak_snapshot: tracemalloc.Snapshot | None = None
+        self._peak_stage: str | None = None
+        self._peak_size = 0
+        self._started_tracing = False
+
+    def start(self):
+        "Starts tracing allocations, if they are not being traced already."
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frame_count)
+            self._started_tracing = True
+
+    def stop(self):
+        "Stops tracing allocations, if tracing was started by `self.start()`."
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def span_started(self, span: Span):
+        if span.category == "stage" and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def span_finished(self, span: Span):
+        if span.category != "stage" or not tracemalloc.is_tracing():
+            return
+
+        (size, peak) = tracemalloc.get_traced_memory()
+
+        self.stages.append(
+            StageMemory(
+                name=span.name,
+                traced_size=size,
+                traced_peak=peak,
+                max_rss=_max_rss(),
+                object_counts=_count_tracked_objects(),
+            )
+        )
+
+        # Keep the snapshot of the stage that ended with the most live memory,
+        # which is the one worth inspecting for allocation sites.
+        if size >= self._peak_size:
+            self._peak_size = size
+            self._peak_stage = span.name
+            self._peak_snapshot = tracemalloc.take_snapshot().filter_traces(
+                [
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+                ]
+            )
+
+    def print_summary(self):
+        "Prints a table of per-stage memory usage, followed by the top allocation sites."
+
+        rows = [("Stage", "Traced (MB)", "Peak (MB)", "Max RSS (MB)")]
+        rows.extend(
+            (
+                stage.name,
+                _megabytes(stage.traced_size),
+                _megabytes(stage.traced_peak),
+                "-" if stage.max_rss is None else _megabytes(stage.max_rss),
+            )
+            for stage in self.stages
+        )
+
+        print(ConsoleColor.YELLOW("Memory usage:"))
+        _print_table(rows)
+
+        if len(self.stages) > 0:
+            last = self.stages[-1]
+            names = list(map(lambda t: t[0], TRACKED_TYPES))
+            rows = [("Stage", *names)]
+            rows.extend(
+                (stage.name, *(str(stage.object_counts.get(n, 0)) for n in names))
+                for stage in self.stages
+            )
+
+            print(ConsoleColor.YELLOW("Live objects:"))
+            _print_table(rows)
+
+            if last.max_rss is not None:
+                print(f"Peak RSS: {ConsoleColor.CYAN(_megabytes(last.max_rss))} MB")
+
+        if self._peak_snapshot is not None:
+            print(
+                ConsoleColor.YELLOW(
+                    f"Top {self.top_count} allocation sites after '{self._peak_stage}':"
+                )
+            )
+            stats = self._peak_snapshot.statistics("lineno")
+            for stat in stats[: self.top_count]:
+                frame = stat.traceback[0]
+                print(
+                    f"{_megabytes(stat.size):>8} MB {stat.count:>8} blocks  "
+                    f"{ConsoleColor.MAGENTA(frame.filename)}:{frame.lineno}"
+                )
+
+
+def _max_rss() -> int | None:
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is reported in bytes on macOS, and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return max_rss
+
+    return max_rss * 1024
+
+
+def _count_tracked_objects() -> dict[str, int]:
+    counts: Counter[str] = Counter()
+    for obj in gc.get_objects():
+        for (name, tracked_type) in TRACKED_TYPES:
+            if isinstance(obj, tracked_type):
+                counts[name] += 1
+
+    return dict(counts)
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f}"
+
+
+def _print_table(rows: list[tuple[str, ...]]):
+    widths = [max(map(lambda r: len(r[i]), rows)) for i in range(len(rows[0]))]
+
+    def format_row(row: tuple[str, ...]) -> str:
+        cells = [row[0].ljust(widths[0])]
+        cells.extend(cell.rjust(width) for (cell, width) in zip(row[1:], widths[1:]))
+        return "  ".join(cells)
+
+    print(ConsoleColor.CYAN(format_row(rows[0])))
+    for row in rows[1:]:
+        print(format_row(row))
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from utils.files.atomic_write import write_text_atomic
+
+
+@dataclass
+class Span:
+    """
+    A timed region of work in the generator pipeline, such as a stage or the
+    processing of a single declaration.
+    """
+
+    name: str
+    "Name of the span."
+
+    category: str
+    "Category of the span, e.g. 'stage', 'decl', 'doccomment' or 'file'."
+
+    start: float
+    "Value of `time.perf_counter()` when the span started."
+
+    duration: float = 0.0
+    "Duration of the span, in seconds. Only valid once the span has finished."
+
+    args: dict[str, Any] = field(default_factory=dict)
+    """
+    Additional information attached to the span. Values may be zero-argument
+    callables, which are only evaluated by `Span.resolved_args()`.
+    """
+
+    def resolved_args(self) -> dict[str, Any]:
+        "Returns `self.args`, with callable values replaced by their results."
+        return {
+            key: value() if callable(value) else value
+            for (key, value) in self.args.items()
+        }
+
+
+class PipelineHook:
+    """
+    Base class for objects that subscribe to spans emitted by the generator
+    pipeline. Hooks are registered with `subscribed()`.
+    """
+
+    def span_started(self, span: Span):
+        "Called when a span starts, before the work it measures."
+
+    def span_finished(self, span: Span):
+        "Called when a span finishes, after `span.duration` has been recorded."
+
+
+_active_hooks: ContextVar[tuple[PipelineHook, ...]] = ContextVar(
+    "pipeline_hooks", default=()
+)
+"Hooks subscribed to spans emitted in the current context."
+
+
+@contextmanager
+def subscribed(*hooks: PipelineHook) -> Iterator[None]:
+    """
+    Subscribes a set of hooks to every span emitted in the current context
+    until the context manager exits.
+
+    Spans are not forwarded across process boundaries: work performed by
+    worker processes, such as parallel parsing or rendering, is not reported.
+    """
+    token = _active_hooks.set(_active_hooks.get() + hooks)
+    try:
+        yield
+    finally:
+        _active_hooks.reset(token)
+
+
+def is_tracing() -> bool:
+    "Returns True if any hook is subscribed to spans in the current context."
+    return len(_active_hooks.get()) > 0
+
+
+@contextmanager
+def span(name: str, category: str, /, **args: Any) -> Iterator[None]:
+    """
+    Emits a span covering the body of the context manager to every subscribed
+    hook. Does nothing but run the body if no hook is subscribed.
+
+    To avoid computing expensive arguments when nothing is subscribed, argument
+    values can be passed as zero-argument callables.
+    """
+    hooks = _active_hooks.get()
+    if len(hooks) == 0:
+        yield
+        return
+
+    result = Span(name, category, time.perf_counter(), args=args)
+    for hook in hooks:
+        hook.span_started(result)
+
+    try:
+        yield
+    finally:
+        result.duration = time.perf_counter() - result.start
+        for hook in hooks:
+            hook.span_finished(result)
+
+
+class ChromeTraceRecorder(PipelineHook):
+    """
+    Records finished spans as complete ('X') events of the Chrome trace-event
+    format, which can be viewed in Perfetto or chrome://tracing.
+    """
+
+    events: list[dict[str, Any]]
+
+    def __init__(self):
+        self.events = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def span_finished(self, span: Span):
+        event: dict[str, Any] = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (span.start - self._origin) * 1_000_000,
+            "dur": span.duration * 1_000_000,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        }
+
+        args = span.resolved_args()
+        if len(args) > 0:
+            event["args"] = {key: _json_value(value) for (key, value) in args.items()}
+
+        self.events.append(event)
+
+    def write(self, path: Path):
+        "Writes the recorded events to a JSON trace file at a given path."
+
+        # Parents must precede nested spans that start at the same timestamp.
+        events = sorted(self.events, key=lambda e: (e["ts"], -e["dur"]))
+
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        write_text_atomic(path, json.dumps(trace))
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    return str(value)
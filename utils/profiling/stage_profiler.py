@@ -0,0 +1,160 @@
+import cProfile
+import os
+import re
+import time
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from utils.cli.console_color import ConsoleColor
+from utils.cli.reporter import current_reporter
+from utils.profiling.pipeline_hooks import span
+
+
+@dataclass
+class StageTiming:
+    """
+    Timing and throughput information recorded for a pipeline stage.
+    """
+
+    name: str
+    "Name of the stage, as announced to the console."
+
+    wall_time: float = 0.0
+    "Wall-clock time spent in the stage, in seconds."
+
+    cpu_time: float = 0.0
+    """
+    CPU time spent in the stage, in seconds, including time spent by child
+    processes that were waited for during the stage.
+    """
+
+    decl_count: int | None = None
+    "Number of declarations handled by the stage, if applicable."
+
+    file_count: int | None = None
+    "Number of files handled by the stage, if applicable."
+
+
+def _cpu_time() -> float:
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class StageProfiler:
+    """
+    Announces the stages of a generator pipeline and records the time spent in
+    each one. Every stage is also emitted as a span to subscribed pipeline
+    hooks.
+
+    When enabled, a summary table can be printed once the pipeline finishes,
+    and, if a folder is provided, a cProfile `.pstats` file is dumped for every
+    stage.
+    """
+
+    enabled: bool
+    pstats_folder: Path | None
+    stages: list[StageTiming]
+
+    def __init__(self, enabled: bool = False, pstats_folder: Path | None = None):
+        self.enabled = enabled
+        self.pstats_folder = pstats_folder
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str, announce: bool = True) -> Iterator[StageTiming]:
+        """
+        Runs the body of the context as a pipeline stage with a given name.
+        The yielded `StageTiming` can be used to record the number of
+        declarations and files the stage handled.
+        """
+        if announce:
+            current_reporter().stage(name)
+
+        timing = StageTiming(name)
+
+        profile: cProfile.Profile | None = None
+        if self.enabled and self.pstats_folder is not None:
+            profile = cProfile.Profile()
+
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_time()
+
+        if profile is not None:
+            profile.enable()
+
+        try:
+            with span(name.rstrip("."), "stage"):
+                yield timing
+        finally:
+            if profile is not None:
+                profile.disable()
+
+            timing.wall_time = time.perf_counter() - wall_start
+            timing.cpu_time = _cpu_time() - cpu_start
+
+            self.stages.append(timing)
+
+            if profile is not None and self.pstats_folder is not None:
+                self.pstats_folder.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(self._pstats_path(len(self.stages), name))
+
+    def total_wall_time(self) -> float:
+        return sum(map(lambda s: s.wall_time, self.stages))
+
+    def total_cpu_time(self) -> float:
+        return sum(map(lambda s: s.cpu_time, self.stages))
+
+    def print_summary(self):
+        "Prints a table of the recorded stages, if this profiler is enabled."
+
+        if not self.enabled:
+            return
+
+        def count(value: int | None) -> str:
+            return "-" if value is None else str(value)
+
+        rows = [("Stage", "Wall (ms)", "CPU (ms)", "Decls", "Files")]
+        for stage in self.stages:
+            rows.append(
+                (
+                    stage.name.rstrip("."),
+                    f"{stage.wall_time * 1000:.1f}",
+                    f"{stage.cpu_time * 1000:.1f}",
+                    count(stage.decl_count),
+                    count(stage.file_count),
+                )
+            )
+        rows.append(
+            (
+                "Total",
+                f"{self.total_wall_time() * 1000:.1f}",
+                f"{self.total_cpu_time() * 1000:.1f}",
+                "",
+                "",
+            )
+        )
+
+        widths = [max(map(lambda r: len(r[i]), rows)) for i in range(len(rows[0]))]
+
+        def format_row(row: tuple[str, ...]) -> str:
+            cells = [row[0].ljust(widths[0])]
+            cells.extend(cell.rjust(width) for (cell, width) in zip(row[1:], widths[1:]))
+            return "  ".join(cells)
+
+        print(ConsoleColor.YELLOW("Stage timings:"))
+        print(ConsoleColor.CYAN(format_row(rows[0])))
+        for row in rows[1:-1]:
+            print(format_row(row))
+        print(ConsoleColor.CYAN(format_row(rows[-1])))
+
+        if self.pstats_folder is not None:
+            print(f"Wrote per-stage profiles to {ConsoleColor.MAGENTA(self.pstats_folder)}")
+
+    def _pstats_path(self, index: int, name: str) -> Path:
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+        assert self.pstats_folder is not None
+        return self.pstats_folder.joinpath(f"{index:02}-{slug}.pstats")
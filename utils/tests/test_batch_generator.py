@@ -0,0 +1,63 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from utils.paths import paths
+
+
+def run_batch(header: Path, allowlist: list[Path], destination: Path) -> subprocess.CompletedProcess:
+    "Runs `generate_types.py --batch` for a single target, uncached."
+    return subprocess.run(
+        [
+            sys.executable,
+            paths.srcroot_path("generate_types.py"),
+            "--no-cache",
+            "--batch",
+            header,
+            destination,
+            *allowlist,
+        ],
+        cwd=paths.srcroot_path(),
+        capture_output=True,
+        text=True,
+    )
+
+
+@unittest.skipUnless(
+    sys.platform == "win32" or shutil.which("clang") is not None,
+    "requires the C preprocessor",
+)
+class BatchGeneratorTests(unittest.TestCase):
+    def test_per_header_target_only_emits_its_own_types(self):
+        # z3_optimization.h depends on Z3_lbool from z3_api.h, which is kept
+        # for parsing but must not be generated
+        header = paths.scripts_path("z3.h")
+        allowlist = [paths.srcroot_path("Sources", "CZ3", "api", "z3_optimization.h")]
+
+        with tempfile.TemporaryDirectory() as destination:
+            process = run_batch(header, allowlist, Path(destination))
+
+            self.assertEqual(process.returncode, 0, process.stdout + process.stderr)
+            self.assertEqual(sorted(p.name for p in Path(destination).iterdir()), [])
+
+    def test_header_target_emits_types_declared_in_header(self):
+        header = paths.scripts_path("z3.h")
+        allowlist = [paths.srcroot_path("Sources", "CZ3", "api", "z3_api.h")]
+        expected = paths.srcroot_path("Sources", "SwiftZ3", "Generated")
+
+        with tempfile.TemporaryDirectory() as destination:
+            process = run_batch(header, allowlist, Path(destination))
+
+            self.assertEqual(process.returncode, 0, process.stdout + process.stderr)
+            self.assertEqual(
+                sorted(p.name for p in Path(destination).iterdir()),
+                sorted(p.name for p in expected.iterdir()),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()